@@ -1,4 +1,5 @@
 from .account import Account, Identity
+from .aio import AsyncAccount
 from .attachments import FileAttachment, ItemAttachment
 from .autodiscover import discover
 from .configuration import Configuration
@@ -30,10 +31,11 @@ from .items import (
     TentativelyAcceptItem,
 )
 from .properties import UID, Attendee, Body, DLMailbox, HTMLBody, ItemId, Mailbox, Room, RoomList
-from .protocol import BaseProtocol, FailFast, FaultTolerance, NoVerifyHTTPAdapter, TLSClientAuth
+from .protocol import BaseProtocol, FailFast, FaultTolerance, NoVerifyHTTPAdapter, RateLimiter, TLSClientAuth
 from .restriction import Q
 from .settings import OofSettings
 from .transport import BASIC, CBA, DIGEST, GSSAPI, NTLM, OAUTH2, SSPI
+from .util import InternPool
 from .version import Build, Version
 
 __version__ = "4.9.0"
@@ -42,6 +44,7 @@ __all__ = [
     "__version__",
     "AcceptItem",
     "Account",
+    "AsyncAccount",
     "Attendee",
     "BASIC",
     "BaseProtocol",
@@ -73,6 +76,7 @@ __all__ = [
     "HTMLBody",
     "IMPERSONATION",
     "Identity",
+    "InternPool",
     "ItemAttachment",
     "ItemId",
     "Mailbox",
@@ -87,6 +91,7 @@ __all__ = [
     "PostItem",
     "PostReplyItem",
     "Q",
+    "RateLimiter",
     "ReplyAllToItem",
     "ReplyToItem",
     "Room",
@@ -112,8 +117,10 @@ BaseProtocol.USERAGENT = f"{__name__}/{__version__} ({requests.utils.default_use
 
 
 def close_connections():
+    from .aio import close_connections as close_async_connections
     from .autodiscover import close_connections as close_autodiscover_connections
     from .protocol import close_connections as close_protocol_connections
 
+    close_async_connections()
     close_autodiscover_connections()
     close_protocol_connections()
@@ -3,12 +3,13 @@ from logging import getLogger
 
 from cached_property import threaded_cached_property
 
+from .attachments import AttachmentDownloader
 from .autodiscover import Autodiscovery
 from .configuration import Configuration
 from .credentials import ACCESS_TYPES, DELEGATE, IMPERSONATION
 from .errors import InvalidEnumValue, InvalidTypeError, UnknownTimeZone
 from .ewsdatetime import UTC, EWSTimeZone
-from .fields import FieldPath, TextField
+from .fields import TextField
 from .folders import (
     AdminAuditLogs,
     ArchiveDeletedItems,
@@ -184,6 +185,14 @@ class Account:
         # For maintaining affinity in e.g. subscriptions
         self.affinity_cookie = None
 
+        # Requests for accounts with a higher priority get a session first when the session pool of a shared protocol is
+        # exhausted. See BaseProtocol.get_session()
+        self.session_priority = 0
+
+        # Pools the string values that repeat across items in responses for this account, to save memory when holding
+        # many items. Disabled by default. See InternPool.
+        self.intern_pool = None
+
         # We may need to override the default server version on a per-account basis because Microsoft may report one
         # server version up-front but delegate account requests to an older backend server. Create a new instance to
         # avoid changing the protocol version.
@@ -387,7 +396,7 @@ class Account:
             mailbox=Mailbox(email_address=self.primary_smtp_address),
         )
 
-    def _consume_item_service(self, service_cls, items, chunk_size, kwargs):
+    def _consume_item_service(self, service_cls, items, chunk_size, kwargs, concurrency=None):
         if isinstance(items, QuerySet):
             # We just want an iterator over the results
             items = iter(items)
@@ -397,7 +406,7 @@ class Account:
             # empty 'ids' and return early.
             return
         kwargs["items"] = items
-        yield from service_cls(account=self, chunk_size=chunk_size).call(**kwargs)
+        yield from service_cls(account=self, chunk_size=chunk_size, concurrency=concurrency).call(**kwargs)
 
     def export(self, items, chunk_size=None):
         """Return export strings of the given items.
@@ -432,7 +441,13 @@ class Account:
         return list(self._consume_item_service(service_cls=UploadItems, items=items, chunk_size=chunk_size, kwargs={}))
 
     def bulk_create(
-        self, folder, items, message_disposition=SAVE_ONLY, send_meeting_invitations=SEND_TO_NONE, chunk_size=None
+        self,
+        folder,
+        items,
+        message_disposition=SAVE_ONLY,
+        send_meeting_invitations=SEND_TO_NONE,
+        chunk_size=None,
+        concurrency=None,
     ):
         """Create new items in 'folder'.
 
@@ -443,6 +458,8 @@ class Account:
         :param send_meeting_invitations: only applicable to CalendarItem items. Possible values are specified in
             SEND_MEETING_INVITATIONS_CHOICES (Default value = SEND_TO_NONE)
         :param chunk_size: The number of items to send to the server in a single request (Default value = None)
+        :param concurrency: The number of requests to send to the server concurrently. Limited by the size of the
+            session pool. (Default value = None)
 
         :return: a list of either BulkCreateResult or exception instances in the same order as the input. The returned
           BulkCreateResult objects are normal Item objects except they only contain the 'id' and 'changekey'
@@ -463,6 +480,7 @@ class Account:
                 service_cls=CreateItem,
                 items=items,
                 chunk_size=chunk_size,
+                concurrency=concurrency,
                 kwargs=dict(
                     folder=folder,
                     message_disposition=message_disposition,
@@ -479,6 +497,7 @@ class Account:
         send_meeting_invitations_or_cancellations=SEND_TO_NONE,
         suppress_read_receipts=True,
         chunk_size=None,
+        concurrency=None,
     ):
         """Bulk update existing items.
 
@@ -492,6 +511,8 @@ class Account:
             specified in SEND_MEETING_INVITATIONS_AND_CANCELLATIONS_CHOICES (Default value = SEND_TO_NONE)
         :param suppress_read_receipts: nly supported from Exchange 2013. True or False (Default value = True)
         :param chunk_size: The number of items to send to the server in a single request (Default value = None)
+        :param concurrency: The number of requests to send to the server concurrently. Limited by the size of the
+            session pool. (Default value = None)
 
         :return: a list of either (id, changekey) tuples or exception instances, in the same order as the input
         """
@@ -512,6 +533,7 @@ class Account:
                 service_cls=UpdateItem,
                 items=items,
                 chunk_size=chunk_size,
+                concurrency=concurrency,
                 kwargs=dict(
                     conflict_resolution=conflict_resolution,
                     message_disposition=message_disposition,
@@ -529,6 +551,7 @@ class Account:
         affected_task_occurrences=ALL_OCCURRENCES,
         suppress_read_receipts=True,
         chunk_size=None,
+        concurrency=None,
     ):
         """Bulk delete items.
 
@@ -541,6 +564,8 @@ class Account:
             AFFECTED_TASK_OCCURRENCES_CHOICES. (Default value = ALL_OCCURRENCES)
         :param suppress_read_receipts: only supported from Exchange 2013. True or False. (Default value = True)
         :param chunk_size: The number of items to send to the server in a single request (Default value = None)
+        :param concurrency: The number of requests to send to the server concurrently. Limited by the size of the
+            session pool. (Default value = None)
 
         :return: a list of either True or exception instances, in the same order as the input
         """
@@ -556,6 +581,7 @@ class Account:
                 service_cls=DeleteItem,
                 items=ids,
                 chunk_size=chunk_size,
+                concurrency=concurrency,
                 kwargs=dict(
                     delete_type=delete_type,
                     send_meeting_cancellations=send_meeting_cancellations,
@@ -565,13 +591,15 @@ class Account:
             )
         )
 
-    def bulk_send(self, ids, save_copy=True, copy_to_folder=None, chunk_size=None):
+    def bulk_send(self, ids, save_copy=True, copy_to_folder=None, chunk_size=None, concurrency=None):
         """Send existing draft messages. If requested, save a copy in 'copy_to_folder'.
 
         :param ids: an iterable of either (id, changekey) tuples or Item objects.
         :param save_copy: If true, saves a copy of the message (Default value = True)
         :param copy_to_folder: If requested, save a copy of the message in this folder. Default is the Sent folder
         :param chunk_size: The number of items to send to the server in a single request (Default value = None)
+        :param concurrency: The number of requests to send to the server concurrently. Limited by the size of the
+            session pool. (Default value = None)
 
         :return: Status for each send operation, in the same order as the input
         """
@@ -584,18 +612,21 @@ class Account:
                 service_cls=SendItem,
                 items=ids,
                 chunk_size=chunk_size,
+                concurrency=concurrency,
                 kwargs=dict(
                     saved_item_folder=copy_to_folder,
                 ),
             )
         )
 
-    def bulk_copy(self, ids, to_folder, chunk_size=None):
+    def bulk_copy(self, ids, to_folder, chunk_size=None, concurrency=None):
         """Copy items to another folder.
 
         :param ids: an iterable of either (id, changekey) tuples or Item objects.
         :param to_folder: The destination folder of the copy operation
         :param chunk_size: The number of items to send to the server in a single request (Default value = None)
+        :param concurrency: The number of requests to send to the server concurrently. Limited by the size of the
+            session pool. (Default value = None)
 
         :return: Status for each send operation, in the same order as the input
         """
@@ -604,18 +635,21 @@ class Account:
                 service_cls=CopyItem,
                 items=ids,
                 chunk_size=chunk_size,
+                concurrency=concurrency,
                 kwargs=dict(
                     to_folder=to_folder,
                 ),
             )
         )
 
-    def bulk_move(self, ids, to_folder, chunk_size=None):
+    def bulk_move(self, ids, to_folder, chunk_size=None, concurrency=None):
         """Move items to another folder.
 
         :param ids: an iterable of either (id, changekey) tuples or Item objects.
         :param to_folder: The destination folder of the copy operation
         :param chunk_size: The number of items to send to the server in a single request (Default value = None)
+        :param concurrency: The number of requests to send to the server concurrently. Limited by the size of the
+            session pool. (Default value = None)
 
         :return: The new IDs of the moved items, in the same order as the input. If 'to_folder' is a public folder or a
           folder in a different mailbox, an empty list is returned.
@@ -625,19 +659,22 @@ class Account:
                 service_cls=MoveItem,
                 items=ids,
                 chunk_size=chunk_size,
+                concurrency=concurrency,
                 kwargs=dict(
                     to_folder=to_folder,
                 ),
             )
         )
 
-    def bulk_archive(self, ids, to_folder, chunk_size=None):
+    def bulk_archive(self, ids, to_folder, chunk_size=None, concurrency=None):
         """Archive items to a folder in the archive mailbox. An archive mailbox must be enabled in order for this
         to work.
 
         :param ids: an iterable of either (id, changekey) tuples or Item objects.
         :param to_folder: The destination folder of the archive operation
         :param chunk_size: The number of items to send to the server in a single request (Default value = None)
+        :param concurrency: The number of requests to send to the server concurrently. Limited by the size of the
+            session pool. (Default value = None)
 
         :return: A list containing True or an exception instance in stable order of the requested items
         """
@@ -646,19 +683,22 @@ class Account:
                 service_cls=ArchiveItem,
                 items=ids,
                 chunk_size=chunk_size,
+                concurrency=concurrency,
                 kwargs=dict(
                     to_folder=to_folder,
                 ),
             )
         )
 
-    def bulk_mark_as_junk(self, ids, is_junk, move_item, chunk_size=None):
+    def bulk_mark_as_junk(self, ids, is_junk, move_item, chunk_size=None, concurrency=None):
         """Mark or un-mark message items as junk email and add or remove the sender from the blocked sender list.
 
         :param ids: an iterable of either (id, changekey) tuples or Item objects.
         :param is_junk: Whether the messages are junk or not
         :param move_item: Whether to move the messages to the junk folder or not
         :param chunk_size: The number of items to send to the server in a single request (Default value = None)
+        :param concurrency: The number of requests to send to the server concurrently. Limited by the size of the
+            session pool. (Default value = None)
 
         :return: A list containing the new IDs of the moved items, if items were moved, or True, or an exception
           instance, in stable order of the requested items.
@@ -668,6 +708,7 @@ class Account:
                 service_cls=MarkAsJunk,
                 items=ids,
                 chunk_size=chunk_size,
+                concurrency=concurrency,
                 kwargs=dict(
                     is_junk=is_junk,
                     move_item=move_item,
@@ -675,25 +716,40 @@ class Account:
             )
         )
 
-    def fetch(self, ids, folder=None, only_fields=None, chunk_size=None):
+    def fetch(self, ids, folder=None, only_fields=None, chunk_size=None, concurrency=None, lazy=False, projection=None):
         """Fetch items by ID.
 
         :param ids: an iterable of either (id, changekey) tuples or Item objects.
         :param folder: used for validating 'only_fields' (Default value = None)
         :param only_fields: A list of string or FieldPath items specifying the fields to fetch. Default to all fields
         :param chunk_size: The number of items to send to the server in a single request (Default value = None)
+        :param concurrency: The number of requests to send to the server concurrently. Limited by the size of the
+            session pool. (Default value = None)
+        :param lazy: If True, field values are read from the response when they are first accessed. This saves time
+            when only some of the fields are used. (Default value = False)
+        :param projection: If set, a list of FieldPath objects. Return a tuple of the values of these field paths for
+            each item, instead of an Item object. This is much faster than creating items. The fields must be
+            included in 'only_fields'. (Default value = None)
 
         :return: A generator of Item objects, in the same order as the input
         """
-        validation_folder = folder or Folder(root=self.root)  # Default to a folder type that supports all item types
         # 'ids' could be an unevaluated QuerySet, e.g. if we ended up here via `fetch(ids=some_folder.filter(...))`. In
         # that case, we want to use its iterator. Otherwise, peek() will start a count() which is wasteful because we
         # need the item IDs immediately afterwards. iterator() will only do the bare minimum.
+        yield from self._consume_item_service(
+            service_cls=GetItem,
+            items=ids,
+            chunk_size=chunk_size,
+            concurrency=concurrency,
+            kwargs=dict(self._fetch_kwargs(folder=folder, only_fields=only_fields), lazy=lazy, projection=projection),
+        )
+
+    def _fetch_kwargs(self, folder, only_fields):
+        """Return the GetItem arguments for a fetch() call, except the items to fetch."""
+        validation_folder = folder or Folder(root=self.root)  # Default to a folder type that supports all item types
         if only_fields is None:
             # We didn't restrict list of field paths. Get all fields from the server, including extended properties.
-            additional_fields = {
-                FieldPath(field=f) for f in validation_folder.allowed_item_fields(version=self.version)
-            }
+            additional_fields = validation_folder.allowed_item_field_paths(version=self.version)
         else:
             for field in only_fields:
                 validation_folder.validate_item_field(field=field, version=self.version)
@@ -702,15 +758,30 @@ class Account:
                 f for f in validation_folder.normalize_fields(fields=only_fields) if not f.field.is_attribute
             }
         # Always use IdOnly here, because AllProperties doesn't actually get *all* properties
-        yield from self._consume_item_service(
-            service_cls=GetItem,
-            items=ids,
-            chunk_size=chunk_size,
-            kwargs=dict(
-                additional_fields=additional_fields,
-                shape=ID_ONLY,
-            ),
-        )
+        return dict(additional_fields=additional_fields, shape=ID_ONLY)
+
+    def download_attachments(self, items, dest_dir, workers=None, include_inline=False, chunk_size=None):
+        """Download the file attachments of many items to a directory. Small attachments are fetched in batches, and
+        large attachments are streamed to disk. Requests are sent concurrently, but never on more connections than the
+        session pool allows. Item attachments are skipped.
+
+        :param items: an iterable of either (id, changekey) tuples or Item objects, e.g. a QuerySet
+        :param dest_dir: The directory to save the files in. Existing files are never overwritten. Attachments with the
+            same name are saved as 'name (1).ext', 'name (2).ext' etc.
+        :param workers: The number of requests to send to the server concurrently. Limited by the size of the session
+            pool. (Default value = None, meaning the size of the session pool)
+        :param include_inline: If True, also download inline attachments, e.g. images in HTML bodies (Default value =
+            False)
+        :param chunk_size: The number of items to fetch attachment metadata for in a single request (Default value =
+            None)
+
+        :return: A list of dicts, one per attachment, in the same order as the input. Each dict has the keys 'item_id',
+          'attachment_id', 'name', 'size', 'path' and 'error'. 'path' is None and 'error' is the exception if the
+          download failed. Items that could not be fetched get a single entry with 'attachment_id' set to None.
+        """
+        return AttachmentDownloader(
+            account=self, dest_dir=dest_dir, workers=workers, include_inline=include_inline
+        ).download(items=items, chunk_size=chunk_size)
 
     def fetch_personas(self, ids):
         """Fetch personas by ID.
@@ -0,0 +1,203 @@
+"""An asyncio API on top of the normal, blocking API.
+
+EWS requests are sent using the 'requests' package, which is blocking. Instead of re-implementing the whole transport
+layer on top of an async HTTP client, we run the blocking requests in a thread pool that is sized to the session pool
+of the protocol. The event loop can then await any number of in-flight requests, while the number of connections to
+the server is still limited by 'Configuration.max_connections'. All payload builders and response parsers are shared
+with the blocking API.
+
+Example:
+
+    async def main():
+        account = AsyncAccount(Account(...))
+        async for item in account.fetch(ids=...):
+            print(item.subject)
+        async for item in account.account.inbox.filter(subject="foo"):
+            print(item.subject)
+"""
+
+import asyncio
+import logging
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from threading import Lock
+
+from .errors import InvalidTypeError
+from .items import SAVE_ONLY, SEND_TO_NONE
+from .services import CreateItem, GetItem
+from .util import chunkify, peek
+
+log = logging.getLogger(__name__)
+
+
+def close_connections():
+    AsyncProtocol.clear_cache()
+
+
+class AsyncProtocol:
+    """Runs blocking calls against a Protocol in a thread pool and makes them awaitable. There is one AsyncProtocol
+    instance per Protocol instance, so all AsyncAccount objects sharing a Protocol also share the thread pool. The
+    AsyncProtocol and its thread pool live as long as the Protocol.
+    """
+
+    # The number of items to collect in a worker thread before handing them over to the event loop, when iterating
+    # over a blocking generator.
+    ITER_BATCH_SIZE = 100
+
+    _cache = weakref.WeakKeyDictionary()
+    _cache_lock = Lock()
+
+    def __init__(self, protocol):
+        # Don't keep the protocol alive. That would also keep this instance alive in the cache.
+        self._protocol_ref = weakref.ref(protocol)
+        # One worker per session. Work submitted while all workers are busy is queued by the executor, which makes the
+        # executor act as our async session pool.
+        self.max_workers = protocol._session_pool_maxsize
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="exchangelib-async")
+        # Stop the worker threads when the protocol is garbage collected
+        weakref.finalize(protocol, self._executor.shutdown, wait=False)
+
+    @property
+    def protocol(self):
+        return self._protocol_ref()
+
+    @classmethod
+    def from_protocol(cls, protocol):
+        """Return the AsyncProtocol instance for 'protocol', creating it if necessary."""
+        try:
+            return cls._cache[protocol]
+        except KeyError:
+            pass
+        with cls._cache_lock:
+            if protocol not in cls._cache:
+                cls._cache[protocol] = cls(protocol=protocol)
+            return cls._cache[protocol]
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._cache_lock:
+            for async_protocol in list(cls._cache.values()):
+                async_protocol.close()
+            cls._cache.clear()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking function in the thread pool and return the result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def get_session(self):
+        return await self.run(self.protocol.get_session)
+
+    def release_session(self, session):
+        # Releasing a session never blocks
+        self.protocol.release_session(session)
+
+    async def iterate(self, iterable, batch_size=None):
+        """Async generator over the results of a blocking iterable, e.g. a generator returned by a service call or a
+        QuerySet. Results are collected in batches in a worker thread, to avoid a thread hop for every single item.
+        """
+        batch_size = batch_size or self.ITER_BATCH_SIZE
+        iterator = await self.run(iter, iterable)
+        while True:
+            batch = await self.run(lambda: list(islice(iterator, batch_size)))
+            for elem in batch:
+                yield elem
+            if len(batch) < batch_size:
+                break
+
+    async def map_ordered(self, func, iterable, max_in_flight=None):
+        """Async generator that calls the blocking 'func' on each value in 'iterable' concurrently, and yields the
+        results in the same order as the input. At most 'max_in_flight' calls are pending at any time.
+        """
+        max_in_flight = max_in_flight or self.max_workers
+        pending = deque()
+        try:
+            for value in iterable:
+                pending.append(asyncio.ensure_future(self.run(func, value)))
+                if len(pending) >= max_in_flight:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # The consumer may have stopped iterating. Don't leave pending futures behind.
+            for fut in pending:
+                fut.cancel()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.protocol!r})"
+
+
+class AsyncAccount:
+    """An asyncio counterpart to Account. Wraps a normal Account object and offers awaitable versions of the bulk
+    methods. The wrapped account is available as 'self.account' for everything else.
+    """
+
+    def __init__(self, account):
+        from .account import Account
+
+        if not isinstance(account, Account):
+            raise InvalidTypeError("account", account, Account)
+        self.account = account
+        self.protocol = AsyncProtocol.from_protocol(account.protocol)
+
+    async def _consume_item_service(self, service_cls, items, chunk_size, kwargs):
+        """Async counterpart of Account._consume_item_service(). Chunks are sent concurrently, and results are
+        yielded in the same order as the input.
+        """
+        from .queryset import QuerySet
+
+        if isinstance(items, QuerySet):
+            # Iterating a QuerySet sends requests to the server. Don't do that in the event loop.
+            items = await self.protocol.run(list, items)
+        is_empty, items = peek(items)
+        if is_empty:
+            return
+        chunk_size = chunk_size or service_cls.CHUNK_SIZE
+
+        def call_chunk(chunk):
+            return list(service_cls(account=self.account, chunk_size=chunk_size).call(items=chunk, **kwargs))
+
+        async for res in self.protocol.map_ordered(call_chunk, chunkify(items, chunk_size)):
+            for elem in res:
+                yield elem
+
+    async def fetch(self, ids, folder=None, only_fields=None, chunk_size=None):
+        """Async counterpart of Account.fetch(). Returns an async generator of Item objects, in the same order as the
+        input.
+        """
+        kwargs = await self.protocol.run(self.account._fetch_kwargs, folder=folder, only_fields=only_fields)
+        async for item in self._consume_item_service(
+            service_cls=GetItem, items=ids, chunk_size=chunk_size, kwargs=kwargs
+        ):
+            yield item
+
+    async def bulk_create(
+        self, folder, items, message_disposition=SAVE_ONLY, send_meeting_invitations=SEND_TO_NONE, chunk_size=None
+    ):
+        """Async counterpart of Account.bulk_create()."""
+        from .queryset import QuerySet
+
+        if isinstance(items, QuerySet):
+            raise ValueError("Cannot bulk create items from a QuerySet")
+        return [
+            res
+            async for res in self._consume_item_service(
+                service_cls=CreateItem,
+                items=items,
+                chunk_size=chunk_size,
+                kwargs=dict(
+                    folder=folder,
+                    message_disposition=message_disposition,
+                    send_meeting_invitations=send_meeting_invitations,
+                ),
+            )
+        ]
+
+    def __str__(self):
+        return str(self.account)
@@ -1,6 +1,13 @@
 import io
 import logging
 import mimetypes
+import os
+from binascii import b2a_base64
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from uuid import uuid4
+from weakref import WeakValueDictionary
 
 from .errors import InvalidTypeError
 from .fields import (
@@ -8,7 +15,6 @@ from .fields import (
     BooleanField,
     DateTimeField,
     EWSElementField,
-    FieldPath,
     IdField,
     IntegerField,
     ItemField,
@@ -16,6 +22,7 @@ from .fields import (
     URIField,
 )
 from .properties import BaseItemId, EWSElement, EWSMeta
+from .util import create_element
 
 log = logging.getLogger(__name__)
 
@@ -106,16 +113,33 @@ class FileAttachment(Attachment):
     """MSDN: https://docs.microsoft.com/en-us/exchange/client-developer/web-service-reference/fileattachment"""
 
     ELEMENT_NAME = "FileAttachment"
+    CHUNK_SIZE = 2**16  # The default size of the chunks returned by iter_chunks()
 
     is_contact_photo = BooleanField(field_uri="IsContactPhoto")
     _content = Base64Field(field_uri="Content")
 
-    __slots__ = ("_fp",)
+    __slots__ = "_fp", "_source"
 
     def __init__(self, **kwargs):
         kwargs["_content"] = kwargs.pop("content", None)
         super().__init__(**kwargs)
         self._fp = None
+        self._source = None
+
+    @classmethod
+    def from_file(cls, path_or_fileobj, **kwargs):
+        """Create an attachment whose content is read from a file while the attachment is uploaded. The content is never
+        held in memory in full. The file must be available until the attachment has been created on the server.
+
+        :param path_or_fileobj: A file path, or a seekable file-like object opened for reading in binary mode. Reading
+          starts at the current position of the file object.
+        :param kwargs: Other attachment fields. 'name' defaults to the file name of the path.
+        """
+        if "name" not in kwargs and isinstance(path_or_fileobj, (str, os.PathLike)):
+            kwargs["name"] = os.path.basename(path_or_fileobj)
+        attachment = cls(**kwargs)
+        attachment._source = StreamedFileContent(path_or_fileobj)
+        return attachment
 
     @property
     def fp(self):
@@ -136,6 +160,8 @@ class FileAttachment(Attachment):
         """Return the attachment content. Stores a local copy of the content in case you want to upload the attachment
         again later.
         """
+        if self._content is None and self._source is not None:
+            return self._source.read()
         if self.attachment_id is None:
             return self._content
         if self._content is not None:
@@ -151,15 +177,60 @@ class FileAttachment(Attachment):
         if not isinstance(value, bytes):
             raise InvalidTypeError("value", value, bytes)
         self._content = value
+        self._source = None
+
+    def iter_chunks(self, size=None):
+        """Return the attachment content as a generator of chunks of at most 'size' bytes. If the content has not been
+        fetched yet, it is streamed from the server and never held in memory in full. The content is not stored locally.
+
+        :param size: The max size of each chunk (Default value = CHUNK_SIZE)
+        """
+        size = size or self.CHUNK_SIZE
+        if size < 1:
+            raise ValueError(f"'size' {size} must be a positive number")
+        if self._content is None and self._source is not None:
+            yield from self._source.iter_chunks(size=size)
+            return
+        if self.attachment_id is None or self._content is not None:
+            content = self._content or b""
+            for i in range(0, len(content), size):
+                yield content[i : i + size]
+            return
+        with self.fp as fp:
+            while True:
+                chunk = fp.read(size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def save(self, path_or_fileobj, chunk_size=None):
+        """Write the attachment content to a file without holding the full content in memory. See iter_chunks().
+
+        :param path_or_fileobj: A file path, or a file-like object opened for writing in binary mode
+        :param chunk_size: The max number of bytes to write at a time (Default value = CHUNK_SIZE)
+        """
+        if isinstance(path_or_fileobj, (str, os.PathLike)):
+            with open(path_or_fileobj, "wb") as f:
+                self.save(f, chunk_size=chunk_size)
+            return
+        for chunk in self.iter_chunks(size=chunk_size):
+            path_or_fileobj.write(chunk)
 
     @classmethod
     def from_xml(cls, elem, account):
-        kwargs = {f.name: f.from_xml(elem=elem, account=account) for f in cls.FIELDS}
+        kwargs = cls._kwargs_from_elem(elem=elem, account=account)
         kwargs["content"] = kwargs.pop("_content")
         cls._clear(elem)
         return cls(**kwargs)
 
     def to_xml(self, version):
+        if self._content is None and self._source is not None:
+            # Add a placeholder for the content. It is replaced by the file content when the request is sent.
+            elem = super().to_xml(version=version)
+            content = create_element(self.get_field_by_fieldname("_content").request_tag())
+            content.text = self._source.placeholder
+            elem.append(content)  # Content is the last element of FileAttachment
+            return elem
         self._content = self.content  # Make sure content is available, to avoid ErrorRequiredPropertyMissing
         return super().to_xml(version=version)
 
@@ -176,6 +247,126 @@ class FileAttachment(Attachment):
         self._fp = None
 
 
+class StreamedFileContent:
+    """The content of a FileAttachment that is read from a file while the request is sent. The XML of the request
+    contains a placeholder for the content. request_body() replaces the placeholder with the base64-encoded file
+    content, which is read and encoded in chunks while the request body is sent.
+    """
+
+    READ_SIZE = 3 * 2**15  # Must be a multiple of 3, so each chunk can be base64-encoded separately
+    PLACEHOLDER_PREFIX = "exchangelib-streamed-content-"
+
+    # Placeholder -> instance. Entries disappear when the attachment holding the instance is garbage-collected.
+    _instances = WeakValueDictionary()
+
+    def __init__(self, path_or_fileobj):
+        if isinstance(path_or_fileobj, (str, os.PathLike)):
+            self._path, self._fileobj, self._offset = path_or_fileobj, None, 0
+        else:
+            if not hasattr(path_or_fileobj, "read") or not path_or_fileobj.seekable():
+                raise ValueError(f"{path_or_fileobj!r} must be a file path or a seekable file-like object")
+            self._path, self._fileobj, self._offset = None, path_or_fileobj, path_or_fileobj.tell()
+        self.placeholder = f"{self.PLACEHOLDER_PREFIX}{uuid4().hex}"
+        self._instances[self.placeholder] = self
+
+    def __setstate__(self, state):
+        # Register copies under a new placeholder
+        self.__dict__.update(state)
+        self.placeholder = f"{self.PLACEHOLDER_PREFIX}{uuid4().hex}"
+        self._instances[self.placeholder] = self
+
+    @property
+    def size(self):
+        """The size of the file content, in bytes."""
+        if self._path is not None:
+            return os.path.getsize(self._path)
+        return self._fileobj.seek(0, io.SEEK_END) - self._offset
+
+    def encoded_size(self):
+        return 4 * ((self.size + 2) // 3)
+
+    def iter_chunks(self, size):
+        """Return the file content in chunks of at most 'size' bytes."""
+        if self._path is not None:
+            with open(self._path, "rb") as f:
+                yield from iter(lambda: f.read(size), b"")
+            return
+        self._fileobj.seek(self._offset)
+        yield from iter(lambda: self._fileobj.read(size), b"")
+
+    def read(self):
+        return b"".join(self.iter_chunks(size=self.READ_SIZE))
+
+    def iter_encoded(self):
+        """Return the base64-encoded file content in chunks."""
+        remainder = b""
+        for chunk in self.iter_chunks(size=self.READ_SIZE):
+            # File objects may return short reads. Only encode multiples of 3 bytes until the end of the file.
+            if remainder:
+                chunk = remainder + chunk
+            usable = len(chunk) - len(chunk) % 3
+            remainder = chunk[usable:]
+            if usable:
+                yield b2a_base64(chunk[:usable], newline=False)
+        if remainder:
+            yield b2a_base64(remainder, newline=False)
+
+    @classmethod
+    def request_body(cls, data):
+        """Replace any placeholders in the serialized request 'data'. Return 'data' unaltered if there are none, and
+        otherwise a StreamingRequestBody.
+        """
+        if not cls._instances:
+            # Fast path. No streamed attachments exist.
+            return data
+        prefix = cls.PLACEHOLDER_PREFIX.encode()
+        parts = []
+        start = 0
+        while True:
+            i = data.find(prefix, start)
+            if i == -1:
+                break
+            end = i + len(prefix) + 32  # The length of a UUID in hex
+            instance = cls._instances.get(data[i:end].decode())
+            if instance is None:
+                # Not one of ours
+                parts.append(data[start:end])
+            else:
+                parts.extend((data[start:i], instance))
+            start = end
+        if not parts:
+            return data
+        parts.append(data[start:])
+        return StreamingRequestBody(parts)
+
+
+class StreamingRequestBody:
+    """An HTTP request body consisting of bytes and StreamedFileContent parts. The body has a known length and can be
+    iterated more than once, so 'requests' sends it with a Content-Length header, and retries and auth handshakes can
+    resend it.
+    """
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def __len__(self):
+        return sum(len(p) if isinstance(p, bytes) else p.encoded_size() for p in self.parts)
+
+    def __iter__(self):
+        for p in self.parts:
+            if isinstance(p, bytes):
+                yield p
+            else:
+                yield from p.iter_encoded()
+
+    def __str__(self):
+        # Used in log messages. Don't log the file contents.
+        return "".join(
+            p.decode("utf-8") if isinstance(p, bytes) else f"[{p.encoded_size()} bytes of file content]"
+            for p in self.parts
+        )
+
+
 class ItemAttachment(Attachment):
     """MSDN: https://docs.microsoft.com/en-us/exchange/client-developer/web-service-reference/itemattachment"""
 
@@ -199,9 +390,7 @@ class ItemAttachment(Attachment):
         # We have an ID to the data but still haven't called GetAttachment to get the actual data. Do that now.
         if not self.parent_item or not self.parent_item.account:
             raise ValueError(f"{self.__class__.__name__} must have an account")
-        additional_fields = {
-            FieldPath(field=f) for f in BaseFolder.allowed_item_fields(version=self.parent_item.account.version)
-        }
+        additional_fields = BaseFolder.allowed_item_field_paths(version=self.parent_item.account.version)
         attachment = GetAttachment(account=self.parent_item.account).get(
             items=[self.attachment_id],
             include_mime_content=True,
@@ -222,7 +411,7 @@ class ItemAttachment(Attachment):
 
     @classmethod
     def from_xml(cls, elem, account):
-        kwargs = {f.name: f.from_xml(elem=elem, account=account) for f in cls.FIELDS}
+        kwargs = cls._kwargs_from_elem(elem=elem, account=account)
         kwargs["item"] = kwargs.pop("_item")
         cls._clear(elem)
         return cls(**kwargs)
@@ -246,7 +435,8 @@ class FileAttachmentIO(io.RawIOBase):
     def readinto(self, b):
         buf_size = len(b)  # We can't return more than l bytes
         try:
-            chunk = self._overflow or next(self._stream)
+            # Use a memoryview to avoid copying the remaining data of the chunk on each call
+            chunk = self._overflow or memoryview(next(self._stream))
         except StopIteration:
             return 0
         else:
@@ -266,3 +456,160 @@ class FileAttachmentIO(io.RawIOBase):
     def __exit__(self, *args, **kwargs):
         self._stream = None
         self._overflow = None
+
+
+class AttachmentDownloader:
+    """Downloads the file attachments of many items to a directory, using concurrent requests.
+
+    Attachment metadata is fetched with batched GetItem requests. Small attachments are fetched with GetAttachment
+    requests containing many attachment IDs. Large attachments, and attachments of unknown size, are streamed to disk
+    one at a time, so their content is never held in memory in full. Requests are sent from a thread pool that is
+    never larger than the session pool of the protocol.
+    """
+
+    # Attachments up to this size are fetched in batches
+    MAX_BATCH_ATTACHMENT_SIZE = 2**20
+    # The max total size of the attachments in a single batch
+    MAX_BATCH_SIZE = 8 * 2**20
+
+    def __init__(self, account, dest_dir, workers=None, include_inline=False):
+        if not os.path.isdir(dest_dir):
+            raise ValueError(f"'dest_dir' {dest_dir!r} must be an existing directory")
+        if workers is not None:
+            if not isinstance(workers, int):
+                raise InvalidTypeError("workers", workers, int)
+            if workers < 1:
+                raise ValueError(f"'workers' {workers} must be a positive number")
+        self.account = account
+        self.dest_dir = dest_dir
+        # There's no point in having more workers than sessions in the pool
+        self.workers = min(workers or account.protocol._session_pool_maxsize, account.protocol._session_pool_maxsize)
+        self.include_inline = include_inline
+        self._used_names = set()
+
+    def download(self, items, chunk_size=None):
+        """Download the attachments of 'items'. Return the manifest, a list of dicts with one entry per attachment, in
+        the same order as the input. See Account.download_attachments().
+        """
+        from .queryset import QuerySet
+
+        if isinstance(items, QuerySet):
+            # We only need the item IDs. Don't fetch all fields of the items, only to fetch them again.
+            items = items.values_list("id", "changekey")
+        manifest = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = []
+            for batch in self._batches(self._attachments(items, chunk_size, manifest, executor, futures)):
+                futures.append(executor.submit(self._download_batch, batch))
+            for f in futures:
+                f.result()
+        return manifest
+
+    def _attachments(self, items, chunk_size, manifest, executor, futures):
+        """Fetch attachment metadata for 'items' as they are consumed, and add entries to the manifest. Start
+        downloading large attachments right away, and yield the small attachments so they can be batched.
+        """
+        # fetch() returns results in the same order as the input, so we can pair each result with its input
+        pending = deque()
+
+        def item_ids():
+            for item_or_id in items:
+                pending.append(item_or_id)
+                yield item_or_id
+
+        fetched = self.account.fetch(
+            ids=item_ids(), only_fields=["attachments"], chunk_size=chunk_size, concurrency=self.workers
+        )
+        for item in fetched:
+            item_or_id = pending.popleft()
+            if isinstance(item, Exception):
+                item_id = getattr(item_or_id, "id", None) or item_or_id[0]
+                manifest.append(self._entry(item_id=item_id, attachment=None, error=item))
+                continue
+            for attachment in item.attachments:
+                if not isinstance(attachment, FileAttachment):
+                    continue
+                if attachment.is_inline and not self.include_inline:
+                    continue
+                entry = self._entry(item_id=item.id, attachment=attachment, path=self._unique_path(attachment.name))
+                manifest.append(entry)
+                if attachment.size is not None and attachment.size <= self.MAX_BATCH_ATTACHMENT_SIZE:
+                    yield entry, attachment
+                else:
+                    futures.append(executor.submit(self._download_large, entry, attachment))
+
+    @staticmethod
+    def _entry(item_id, attachment, path=None, error=None):
+        return dict(
+            item_id=item_id,
+            attachment_id=attachment.attachment_id.id if attachment else None,
+            name=attachment.name if attachment else None,
+            size=attachment.size if attachment else None,
+            path=path,
+            error=error,
+        )
+
+    def _batches(self, small):
+        from .services import GetAttachment
+
+        batch, batch_size = [], 0
+        max_len = GetAttachment.CHUNK_SIZE
+        for entry, attachment in small:
+            if batch and (batch_size + attachment.size > self.MAX_BATCH_SIZE or len(batch) >= max_len):
+                yield batch
+                batch, batch_size = [], 0
+            batch.append((entry, attachment))
+            batch_size += attachment.size
+        if batch:
+            yield batch
+
+    def _unique_path(self, name):
+        # Don't allow attachment names to point outside the destination directory. Attachment names are not unique,
+        # so add a counter to duplicate names. Never overwrite existing files.
+        name = os.path.basename((name or "").replace("\\", "/")).strip() or "attachment"
+        base, ext = os.path.splitext(name)
+        candidate, i = name, 0
+        while candidate.lower() in self._used_names or os.path.exists(os.path.join(self.dest_dir, candidate)):
+            i += 1
+            candidate = f"{base} ({i}){ext}"
+        self._used_names.add(candidate.lower())
+        return os.path.join(self.dest_dir, candidate)
+
+    def _download_batch(self, batch):
+        from .services import GetAttachment
+
+        try:
+            res = list(
+                GetAttachment(account=self.account, chunk_size=len(batch)).call(
+                    items=[attachment.attachment_id for _, attachment in batch],
+                    include_mime_content=False,
+                    body_type=None,
+                    filter_html_content=None,
+                    additional_fields=None,
+                )
+            )
+        except Exception as e:
+            for entry, _ in batch:
+                self._fail(entry, e)
+            return
+        for (entry, _), fetched in zip(batch, res):
+            if isinstance(fetched, Exception):
+                self._fail(entry, fetched)
+                continue
+            self._write(entry, lambda: fetched.save(entry["path"]))
+
+    def _download_large(self, entry, attachment):
+        self._write(entry, lambda: attachment.save(entry["path"]))
+
+    def _write(self, entry, func):
+        try:
+            func()
+        except Exception as e:
+            self._fail(entry, e)
+
+    @staticmethod
+    def _fail(entry, error):
+        log.warning("Could not download attachment %s: %s", entry["name"], error)
+        with suppress(FileNotFoundError):
+            os.remove(entry["path"])
+        entry.update(path=None, error=error)
@@ -4,7 +4,7 @@ from cached_property import threaded_cached_property
 
 from .credentials import BaseCredentials, BaseOAuth2Credentials
 from .errors import InvalidEnumValue, InvalidTypeError
-from .protocol import FailFast, RetryPolicy
+from .protocol import FailFast, RateLimiter, RetryPolicy
 from .transport import AUTH_TYPE_MAP, CREDENTIALS_REQUIRED, OAUTH2
 from .util import split_url
 from .version import Version
@@ -38,6 +38,10 @@ class Configuration:
 
     'max_connections' defines the max number of connections allowed for this server. This may be restricted by
     policies on the Exchange server.
+
+    You can use 'rate_limiter' to limit the rate of requests before the server starts throttling us:
+
+        config = Configuration(rate_limiter=RateLimiter(requests_per_second=10, max_concurrent_requests=4), ...)
     """
 
     def __init__(
@@ -49,6 +53,7 @@ class Configuration:
         version=None,
         retry_policy=None,
         max_connections=None,
+        rate_limiter=None,
     ):
         if not isinstance(credentials, (BaseCredentials, type(None))):
             raise InvalidTypeError("credentials", credentials, BaseCredentials)
@@ -69,6 +74,8 @@ class Configuration:
             raise InvalidTypeError("retry_policy", retry_policy, RetryPolicy)
         if not isinstance(max_connections, (int, type(None))):
             raise InvalidTypeError("max_connections", max_connections, int)
+        if not isinstance(rate_limiter, (RateLimiter, type(None))):
+            raise InvalidTypeError("rate_limiter", rate_limiter, RateLimiter)
         self._credentials = credentials
         if server:
             self.service_endpoint = f"https://{server}/EWS/Exchange.asmx"
@@ -78,6 +85,7 @@ class Configuration:
         self.version = version
         self.retry_policy = retry_policy
         self.max_connections = max_connections
+        self.rate_limiter = rate_limiter
 
     @property
     def credentials(self):
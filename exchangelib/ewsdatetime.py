@@ -14,6 +14,17 @@ from .winzone import IANA_TO_MS_TIMEZONE_MAP, MS_TIMEZONE_TO_IANA_MAP
 log = logging.getLogger(__name__)
 
 
+def _is_date(date_string):
+    # Return True if the string starts with a date in 'YYYY-MM-DD' format. Don't rely on fromisoformat() alone for
+    # validation. Newer Python versions accept many more formats.
+    return date_string[4] == "-" and date_string[7] == "-"
+
+
+def _is_datetime(date_string):
+    # Return True if the string starts with a datetime in 'YYYY-MM-DDTHH:MM:SS' format
+    return _is_date(date_string) and date_string[10] == "T" and date_string[13] == ":" and date_string[16] == ":"
+
+
 class EWSDate(datetime.date):
     """Extends the normal date implementation to satisfy EWS."""
 
@@ -58,6 +69,9 @@ class EWSDate(datetime.date):
 
     @classmethod
     def from_string(cls, date_string):
+        if len(date_string) == 10 and _is_date(date_string):
+            # The common case. This is much faster than strptime()
+            return cls.fromisoformat(date_string)
         # Sometimes, we'll receive a date string with time zone information. Not very useful.
         if date_string.endswith("Z"):
             date_fmt = "%Y-%m-%dZ"
@@ -156,7 +170,19 @@ class EWSDateTime(datetime.datetime):
 
     @classmethod
     def from_string(cls, date_string):
-        # Parses several common datetime formats and returns time zone aware EWSDateTime objects
+        # Parses several common datetime formats and returns time zone aware EWSDateTime objects. EWS almost always
+        # sends one of two fixed formats, e.g. '2009-01-15T13:45:56Z' and '2009-01-15T13:45:56+01:00'. Parse these with
+        # the much faster fromisoformat() instead of strptime(), and create the EWSDateTime directly.
+        if len(date_string) == 20 and date_string[19] == "Z" and _is_datetime(date_string):
+            t = datetime.datetime.fromisoformat(date_string[:19])
+            return datetime.datetime.__new__(cls, t.year, t.month, t.day, t.hour, t.minute, t.second, 0, UTC)
+        if len(date_string) == 25 and date_string[19] in "+-" and date_string[22] == ":" and _is_datetime(date_string):
+            offset = datetime.time.fromisoformat(date_string[20:])
+            offset = datetime.timedelta(hours=offset.hour, minutes=offset.minute)
+            if date_string[19] == "-":
+                offset = -offset
+            t = datetime.datetime.fromisoformat(date_string[:19]) - offset
+            return datetime.datetime.__new__(cls, t.year, t.month, t.day, t.hour, t.minute, t.second, 0, UTC)
         if date_string.endswith("Z"):
             # UTC datetime
             return super().strptime(date_string, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=UTC)
@@ -213,6 +239,12 @@ class EWSTimeZone(zoneinfo.ZoneInfo):
     IANA_TO_MS_MAP = IANA_TO_MS_TIMEZONE_MAP
     MS_TO_IANA_MAP = MS_TIMEZONE_TO_IANA_MAP
 
+    # ZoneInfo only keeps weak references to instances of subclasses, so an instance that is not referenced elsewhere
+    # would be rebuilt from the timezone database every time it's requested. Keep strong references to the instances
+    # by class and key, and by class and MS timezone ID. There is only a limited number of timezones.
+    _instances = {}
+    _ms_id_instances = {}
+
     def __new__(cls, *args, **kwargs):
         try:
             instance = super().__new__(cls, *args, **kwargs)
@@ -227,6 +259,7 @@ class EWSTimeZone(zoneinfo.ZoneInfo):
         # EWS happily accepts empty strings. For a full list of time zones supported by the target server, including
         # long-format names, see output of services.GetServerTimeZones(account.protocol).call()
         instance.ms_name = ""
+        cls._instances[cls, instance.key] = instance
         return instance
 
     def __eq__(self, other):
@@ -237,18 +270,38 @@ class EWSTimeZone(zoneinfo.ZoneInfo):
             return NotImplemented
         return self.ms_id == other.ms_id
 
+    @classmethod
+    def clear_cache(cls, *, only_keys=None):
+        super().clear_cache(only_keys=only_keys)
+        if only_keys is None:
+            cls._instances.clear()
+            cls._ms_id_instances.clear()
+            return
+        for key in only_keys:
+            cls._instances.pop((cls, key), None)
+        for (tz_cls, ms_id), tz in list(cls._ms_id_instances.items()):
+            if tz.key in only_keys:
+                cls._ms_id_instances.pop((tz_cls, ms_id), None)
+
     @classmethod
     def from_ms_id(cls, ms_id):
         # Create a time zone instance from a Microsoft time zone ID. This is lossy because there is not a 1:1
         # translation from MS time zone ID to IANA time zone.
         try:
-            return cls(cls.MS_TO_IANA_MAP[ms_id])
+            return cls._ms_id_instances[cls, ms_id]
+        except KeyError:
+            pass
+        try:
+            tz = cls(cls.MS_TO_IANA_MAP[ms_id])
         except KeyError:
             if "/" in ms_id:
                 # EWS sometimes returns an ID that has a region/location format, e.g. 'Europe/Copenhagen'. Try the
                 # string unaltered.
-                return cls(ms_id)
-            raise UnknownTimeZone(f"Windows timezone ID {ms_id!r} is unknown by CLDR")
+                tz = cls(ms_id)
+            else:
+                raise UnknownTimeZone(f"Windows timezone ID {ms_id!r} is unknown by CLDR")
+        cls._ms_id_instances[cls, ms_id] = tz
+        return tz
 
     @classmethod
     def from_pytz(cls, tz):
@@ -274,6 +327,11 @@ class EWSTimeZone(zoneinfo.ZoneInfo):
 
     @classmethod
     def from_timezone(cls, tz):
+        # Fast path for the most common types
+        if isinstance(tz, cls):
+            return tz
+        if type(tz) is zoneinfo.ZoneInfo:
+            return cls.from_zoneinfo(tz)
         # Support multiple tzinfo implementations. We could use isinstance(), but then we'd have to have pytz
         # and dateutil as dependencies for this package.
         tz_module = tz.__class__.__module__.split(".")[0]
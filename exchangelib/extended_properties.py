@@ -194,15 +194,36 @@ class ExtendedProperty(EWSElement):
                 raise TypeError(f"Field {self.__class__.__name__!r} value {self.value!r} must be of type {python_type}")
 
     @classmethod
-    def _normalize_obj(cls, obj):
+    def _match_key(
+        cls, distinguished_property_set_id, property_set_id, property_tag, property_name, property_id, property_type
+    ):
         # Sometimes, EWS will helpfully translate a 'distinguished_property_set_id' value to a 'property_set_id' value
-        # and vice versa. Align these values on an ExtendedFieldURI instance.
+        # and vice versa. Align these values before creating the key.
         try:
-            obj.property_set_id = cls.DISTINGUISHED_SET_NAME_TO_ID_MAP[obj.distinguished_property_set_id]
+            property_set_id = cls.DISTINGUISHED_SET_NAME_TO_ID_MAP[distinguished_property_set_id]
         except KeyError:
             with suppress(KeyError):
-                obj.distinguished_property_set_id = cls.DISTINGUISHED_SET_ID_TO_NAME_MAP[obj.property_set_id]
-        return obj
+                distinguished_property_set_id = cls.DISTINGUISHED_SET_ID_TO_NAME_MAP[property_set_id]
+        return distinguished_property_set_id, property_set_id, property_tag, property_name, property_id, property_type
+
+    @classmethod
+    def match_key(cls):
+        """Return a hashable key for the definition of this class. An 'ExtendedProperty' element is an instance of this
+        class if elem_match_key() returns the same key for the element.
+        """
+        cls_obj = cls.as_object()
+        return cls._match_key(**{f.name: getattr(cls_obj, f.name) for f in ExtendedFieldURI.FIELDS})
+
+    @classmethod
+    def elem_match_key(cls, elem):
+        """Return a hashable key for the definition of the property in an 'ExtendedProperty' element, or None if the
+        element has no definition. See match_key().
+        """
+        # We can't use ExtendedFieldURI.from_xml(). It clears the XML element, but we may not want to consume it here.
+        field_uri_elem = elem.find(ExtendedFieldURI.response_tag())
+        if field_uri_elem is None:
+            return None
+        return cls._match_key(**{f.name: field_uri_elem.get(f.field_uri) or None for f in ExtendedFieldURI.FIELDS})
 
     @classmethod
     def is_property_instance(cls, elem):
@@ -210,14 +231,7 @@ class ExtendedProperty(EWSElement):
         do not have a name, so we must match on the cls.property_* attributes to match a field in the request with a
         field in the response.
         """
-        # We can't use ExtendedFieldURI.from_xml(). It clears the XML element, but we may not want to consume it here.
-        kwargs = {
-            f.name: f.from_xml(elem=elem.find(ExtendedFieldURI.response_tag()), account=None)
-            for f in ExtendedFieldURI.FIELDS
-        }
-        xml_obj = ExtendedFieldURI(**kwargs)
-        cls_obj = cls.as_object()
-        return cls._normalize_obj(cls_obj) == cls._normalize_obj(xml_obj)
+        return cls.elem_match_key(elem) == cls.match_key()
 
     @classmethod
     def from_xml(cls, elem, account):
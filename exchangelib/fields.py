@@ -12,6 +12,7 @@ from .util import (
     create_element,
     get_xml_attr,
     get_xml_attrs,
+    intern_value,
     is_iterable,
     set_xml_value,
     value_to_xml_text,
@@ -180,16 +181,20 @@ class FieldPath:
         return cls(field=field, label=label, subfield=subfield)
 
     def get_value(self, item):
+        return self.resolve_value(getattr(item, self.field.name))
+
+    def resolve_value(self, value):
+        """Return the part of the value of the field that this field path points to"""
         # For indexed properties, get either the full property set, the property with matching label, or a particular
         # subfield.
         if self.label:
-            for sub_item in getattr(item, self.field.name):
+            for sub_item in value:
                 if sub_item.label == self.label:
                     if self.subfield:
                         return getattr(sub_item, self.subfield.name)
                     return sub_item
             return None  # No item with this label
-        return getattr(item, self.field.name)
+        return value
 
     def get_sort_value(self, item):
         # For fields that allow values of different types, we need to return a value that is
@@ -269,6 +274,45 @@ class FieldOrder:
         return field_order
 
 
+class SortKey:
+    """A composite sort key that compares a tuple of values from a list of FieldOrder instances in a single pass,
+    honoring the 'reverse' flag of each field. None values sort first.
+    """
+
+    __slots__ = "values", "reverse"
+
+    def __init__(self, values, reverse):
+        """
+
+        :param values: A tuple of sort values
+        :param reverse: A tuple of bools, one for each value
+        """
+        self.values = values
+        self.reverse = reverse
+
+    @classmethod
+    def from_item(cls, item, field_orders):
+        return cls(
+            tuple(f.field_path.get_sort_value(item) for f in field_orders), tuple(f.reverse for f in field_orders)
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, SortKey):
+            return NotImplemented
+        return self.values == other.values
+
+    __hash__ = None
+
+    def __lt__(self, other):
+        for a, b, reverse in zip(self.values, other.values, self.reverse):
+            if a == b:
+                continue
+            if a is None or b is None:
+                return (a is None) != reverse
+            return b < a if reverse else a < b
+        return False
+
+
 class Field(SupportedVersionInstanceMixIn, metaclass=abc.ABCMeta):
     """Holds information related to an item field."""
 
@@ -339,6 +383,15 @@ class Field(SupportedVersionInstanceMixIn, metaclass=abc.ABCMeta):
     def from_xml(self, elem, account):
         """Read a value from the given element"""
 
+    def field_elem_tag(self):
+        """Return the tag of the child element holding the value of this field, if the value can be read from the first
+        child element with that tag alone. Otherwise, return None, and the value is read with .from_xml().
+
+        Fields that return a tag must implement from_field_elem(field_elem, account), which reads the value from the
+        child element, or returns the default value if the element is missing.
+        """
+        return None
+
     @abc.abstractmethod
     def to_xml(self, value, version):
         """Convert this field to an XML element"""
@@ -377,13 +430,21 @@ class FieldURIField(Field):
         else:
             self.field_uri_postfix = self.field_uri
 
-    def _get_val_from_elem(self, elem):
+    def field_elem_tag(self):
         if self.is_attribute:
-            return elem.get(self.field_uri) or None
-        return get_xml_attr(elem, self.response_tag())
+            return None
+        return self.response_tag()
 
     def from_xml(self, elem, account):
-        val = self._get_val_from_elem(elem)
+        if self.is_attribute:
+            return self._from_val(val=elem.get(self.field_uri) or None, account=account)
+        return self.from_field_elem(field_elem=elem.find(self.field_elem_tag()), account=account)
+
+    def from_field_elem(self, field_elem, account):
+        val = None if field_elem is None else field_elem.text or None
+        return self._from_val(val=val, account=account)
+
+    def _from_val(self, val, account):
         if val is not None:
             try:
                 return xml_text_to_value(val, self.value_cls)
@@ -495,8 +556,7 @@ class EnumField(IntegerField):
             return [self.enum[v - 1] for v in sorted(value)]
         return self.enum[value - 1]
 
-    def from_xml(self, elem, account):
-        val = self._get_val_from_elem(elem)
+    def _from_val(self, val, account):
         if val is not None:
             try:
                 if self.is_list:
@@ -532,8 +592,8 @@ class WeekdaysField(EnumListField):
 class EnumAsIntField(EnumField):
     """Like EnumField, but communicates values with EWS in integers."""
 
-    def from_xml(self, elem, account):
-        return super(EnumField, self).from_xml(elem=elem, account=account)
+    def _from_val(self, val, account):
+        return super(EnumField, self)._from_val(val=val, account=account)
 
     def to_xml(self, value, version):
         field_elem = create_element(self.request_tag())
@@ -554,8 +614,8 @@ class AppointmentStateField(IntegerField):
         CANCELLED: 0x0004,
     }
 
-    def from_xml(self, elem, account):
-        val = super().from_xml(elem=elem, account=account)
+    def _from_val(self, val, account):
+        val = super()._from_val(val=val, account=account)
         if val is None:
             return val
         return tuple(name for name, mask in self.STATES.items() if bool(val & mask))
@@ -605,8 +665,7 @@ class DateTimeBackedDateField(DateField):
     def date_to_datetime(self, value):
         return self._datetime_field.value_cls.combine(value, self._default_time).replace(tzinfo=UTC)
 
-    def from_xml(self, elem, account):
-        val = self._get_val_from_elem(elem)
+    def _from_val(self, val, account):
         if val is not None and len(val) == 25:
             # This is a datetime string with timezone info, e.g. '2021-03-01T21:55:54+00:00'. We don't want to have
             # datetime values converted to UTC before converting to date. EWSDateTime.from_string() insists on
@@ -614,7 +673,7 @@ class DateTimeBackedDateField(DateField):
             # the string with .fromisoformat().
             return datetime.datetime.fromisoformat(val).date()
         # Revert to default parsing of datetime strings
-        res = self._datetime_field.from_xml(elem=elem, account=account)
+        res = self._datetime_field._from_val(val=val, account=account)
         if res is None:
             return res
         return res.date()
@@ -630,8 +689,7 @@ class TimeField(FieldURIField):
 
     value_cls = datetime.time
 
-    def from_xml(self, elem, account):
-        val = self._get_val_from_elem(elem)
+    def _from_val(self, val, account):
         if val is not None:
             with suppress(ValueError):
                 if ":" in val:
@@ -673,8 +731,7 @@ class DateTimeField(FieldURIField):
                 value = self.value_cls.from_datetime(value)
         return super().clean(value, version=version)
 
-    def from_xml(self, elem, account):
-        val = self._get_val_from_elem(elem)
+    def _from_val(self, val, account):
         if val is not None:
             try:
                 return self.value_cls.from_string(val)
@@ -717,12 +774,11 @@ class DateOrDateTimeField(DateTimeField):
             return self._date_field.clean(value=value, version=version)
         return super().clean(value=value, version=version)
 
-    def from_xml(self, elem, account):
-        val = self._get_val_from_elem(elem)
+    def _from_val(self, val, account):
         if val is not None and len(val) == 16:
             # This is a date format with timezone info, as sent by task recurrences. Eg: '2006-01-09+01:00'
-            return self._date_field.from_xml(elem=elem, account=account)
-        return super().from_xml(elem=elem, account=account)
+            return self._date_field._from_val(val=val, account=account)
+        return super()._from_val(val=val, account=account)
 
 
 class TimeZoneField(FieldURIField):
@@ -736,8 +792,7 @@ class TimeZoneField(FieldURIField):
             value = self.value_cls.from_timezone(value)
         return super().clean(value=value, version=version)
 
-    def from_xml(self, elem, account):
-        field_elem = elem.find(self.response_tag())
+    def from_field_elem(self, field_elem, account):
         if field_elem is not None:
             ms_id = field_elem.get("Id")
             ms_name = field_elem.get("Name")
@@ -782,10 +837,9 @@ class TextListField(TextField):
     def list_elem_response_tag(self):
         return f"{{{self.namespace}}}{self.list_elem_name}"
 
-    def from_xml(self, elem, account):
-        iter_elem = elem.find(self.response_tag())
-        if iter_elem is not None:
-            return get_xml_attrs(iter_elem, self.list_elem_response_tag())
+    def from_field_elem(self, field_elem, account):
+        if field_elem is not None:
+            return get_xml_attrs(field_elem, self.list_elem_response_tag())
         return self.default
 
     def to_xml(self, value, version):
@@ -800,11 +854,10 @@ class MessageField(TextField):
 
     INNER_ELEMENT_NAME = "Message"
 
-    def from_xml(self, elem, account):
-        reply = elem.find(self.response_tag())
-        if reply is None:
+    def from_field_elem(self, field_elem, account):
+        if field_elem is None:
             return None
-        message = reply.find(f"{{{TNS}}}{self.INNER_ELEMENT_NAME}")
+        message = field_elem.find(f"{{{TNS}}}{self.INNER_ELEMENT_NAME}")
         if message is None:
             return None
         return message.text
@@ -820,6 +873,8 @@ class CharField(TextField):
     """A field that stores a string value with a limited length."""
 
     is_complex = False
+    # Short values are likely to repeat across items. Pool them if the account has an intern pool.
+    is_interned = True
 
     def __init__(self, *args, **kwargs):
         self.max_length = kwargs.pop("max_length", 255)
@@ -828,6 +883,12 @@ class CharField(TextField):
             raise ValueError("'max_length' must be in the range 1-255")
         super().__init__(*args, **kwargs)
 
+    def _from_val(self, val, account):
+        val = super()._from_val(val=val, account=account)
+        if self.is_interned:
+            return intern_value(val, account)
+        return val
+
     def clean(self, value, version=None):
         value = super().clean(value, version=version)
         if value is not None and len(value) > self.max_length:
@@ -841,6 +902,8 @@ class IdField(CharField):
     https://docs.microsoft.com/en-us/exchange/client-developer/exchange-web-services/ews-identifiers-in-exchange
     """
 
+    is_interned = False  # Most IDs are unique
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.max_length = 512  # This is above the normal 255 limit, but this is actually an attribute, not a field
@@ -858,6 +921,12 @@ class CharListField(TextListField):
             raise ValueError("'max_length' must be in the range 1-255")
         super().__init__(*args, **kwargs)
 
+    def from_field_elem(self, field_elem, account):
+        value = super().from_field_elem(field_elem=field_elem, account=account)
+        if value is None or getattr(account, "intern_pool", None) is None:
+            return value
+        return [account.intern_pool.intern(v) for v in value]
+
     def clean(self, value, version=None):
         value = super().clean(value, version=version)
         if value is not None:
@@ -951,10 +1020,9 @@ class BodyField(TextField):
             value = self.value_cls(value)
         return super().clean(value, version=version)
 
-    def from_xml(self, elem, account):
+    def from_field_elem(self, field_elem, account):
         from .properties import Body, HTMLBody
 
-        field_elem = elem.find(self.response_tag())
         val = None if field_elem is None else field_elem.text or None
         if val is not None:
             body_type = field_elem.get("BodyType")
@@ -989,21 +1057,19 @@ class EWSElementField(FieldURIField):
             self._value_cls = getattr(import_module(self.__module__.split(".")[0]), self._value_cls)
         return self._value_cls
 
-    def from_xml(self, elem, account):
-        if self.is_list:
-            iter_elem = elem.find(self.response_tag())
-            if iter_elem is not None:
+    def field_elem_tag(self):
+        if self.field_uri is None and not self.is_list:
+            return self.value_cls.response_tag()
+        return self.response_tag()
+
+    def from_field_elem(self, field_elem, account):
+        if field_elem is not None:
+            if self.is_list:
                 return [
                     self.value_cls.from_xml(elem=e, account=account)
-                    for e in iter_elem.findall(self.value_cls.response_tag())
+                    for e in field_elem.findall(self.value_cls.response_tag())
                 ]
-        else:
-            if self.field_uri is None:
-                sub_elem = elem.find(self.value_cls.response_tag())
-            else:
-                sub_elem = elem.find(self.response_tag())
-            if sub_elem is not None:
-                return self.value_cls.from_xml(elem=sub_elem, account=account)
+            return self.value_cls.from_xml(elem=field_elem, account=account)
         return self.default
 
     def to_xml(self, value, version):
@@ -1027,11 +1093,21 @@ class TransitionListField(EWSElementListField):
         kwargs["value_cls"] = BaseTransition
         super().__init__(*args, **kwargs)
 
+    def field_elem_tag(self):
+        if self.field_uri is None:
+            # The transitions are direct children of the element
+            return None
+        return super().field_elem_tag()
+
     def from_xml(self, elem, account):
-        iter_elem = elem.find(self.response_tag()) if self.field_uri else elem
-        if iter_elem is not None:
+        if self.field_uri is None:
+            return self.from_field_elem(field_elem=elem, account=account)
+        return super().from_xml(elem=elem, account=account)
+
+    def from_field_elem(self, field_elem, account):
+        if field_elem is not None:
             return [
-                self.value_cls.transition_model_from_tag(e.tag).from_xml(elem=e, account=account) for e in iter_elem
+                self.value_cls.transition_model_from_tag(e.tag).from_xml(elem=e, account=account) for e in field_elem
             ]
         return self.default
 
@@ -1114,21 +1190,17 @@ class BaseEmailField(EWSElementField, metaclass=abc.ABCMeta):
             value = self.value_cls(email_address=value)
         return super().clean(value, version=version)
 
-    def from_xml(self, elem, account):
-        if self.field_uri is None:
-            sub_elem = elem.find(self.value_cls.response_tag())
-        else:
-            sub_elem = elem.find(self.response_tag())
-        if sub_elem is not None:
+    def from_field_elem(self, field_elem, account):
+        if field_elem is not None:
             if self.field_uri is not None:
                 # We want the nested Mailbox, not the wrapper element
-                nested_elem = sub_elem.find(self.value_cls.response_tag())
+                nested_elem = field_elem.find(self.value_cls.response_tag())
                 if nested_elem is None:
                     raise ValueError(
                         f"Expected XML element {self.value_cls.response_tag()!r} missing on field {self.name!r}"
                     )
                 return self.value_cls.from_xml(elem=nested_elem, account=account)
-            return self.value_cls.from_xml(elem=sub_elem, account=account)
+            return self.value_cls.from_xml(elem=field_elem, account=account)
         return self.default
 
 
@@ -1211,16 +1283,15 @@ class AttachmentField(EWSElementListField):
         kwargs["value_cls"] = Attachment
         super().__init__(*args, **kwargs)
 
-    def from_xml(self, elem, account):
+    def from_field_elem(self, field_elem, account):
         from .attachments import FileAttachment, ItemAttachment
 
-        iter_elem = elem.find(self.response_tag())
         # Look for both FileAttachment and ItemAttachment
-        if iter_elem is not None:
+        if field_elem is not None:
             attachments = []
             for att_type in (ItemAttachment, FileAttachment):
                 attachments.extend(
-                    [att_type.from_xml(elem=e, account=account) for e in iter_elem.findall(att_type.response_tag())]
+                    [att_type.from_xml(elem=e, account=account) for e in field_elem.findall(att_type.response_tag())]
                 )
             return attachments
         return self.default
@@ -1418,9 +1489,9 @@ class ExtendedPropertyField(Field):
         ).to_xml(version=None)
 
     def from_xml(self, elem, account):
-        extended_properties = elem.findall(self.value_cls.response_tag())
-        for extended_property in extended_properties:
-            if self.value_cls.is_property_instance(extended_property):
+        match_key = self.value_cls.match_key()
+        for extended_property in elem.iterchildren(self.value_cls.response_tag()):
+            if self.value_cls.elem_match_key(extended_property) == match_key:
                 return self.value_cls.from_xml(elem=extended_property, account=account)
         return self.default
 
@@ -1447,6 +1518,10 @@ class ItemField(FieldURIField):
 
         return Item
 
+    def field_elem_tag(self):
+        # The value may be contained in an element of any of the item types
+        return None
+
     def from_xml(self, elem, account):
         from .items import ITEM_CLASSES
 
@@ -1554,8 +1629,7 @@ class TypeValueField(FieldURIField):
             return self.default
         return value
 
-    def from_xml(self, elem, account):
-        field_elem = elem.find(self.response_tag())
+    def from_field_elem(self, field_elem, account):
         if field_elem is None:
             return self.default
         value_type_str = get_xml_attr(field_elem, f"{{{TNS}}}Type")
@@ -1588,14 +1662,13 @@ class TypeValueField(FieldURIField):
 class DictionaryField(FieldURIField):
     value_cls = dict
 
-    def from_xml(self, elem, account):
+    def from_field_elem(self, field_elem, account):
         from .properties import DictionaryEntry
 
-        iter_elem = elem.find(self.response_tag())
-        if iter_elem is not None:
+        if field_elem is not None:
             entries = [
                 DictionaryEntry.from_xml(elem=e, account=account)
-                for e in iter_elem.findall(DictionaryEntry.response_tag())
+                for e in field_elem.findall(DictionaryEntry.response_tag())
             ]
             return {e.key: e.value for e in entries}
         return self.default
@@ -1677,10 +1750,6 @@ class GenericEventListField(EWSElementField):
 
     is_list = True
 
-    @property
-    def _event_types_map(self):
-        return {v.response_tag(): v for v in self.value_classes}
-
     def __init__(self, *args, **kwargs):
         from .properties import (
             CopiedEvent,
@@ -1706,6 +1775,11 @@ class GenericEventListField(EWSElementField):
             StatusEvent,
             FreeBusyChangedEvent,
         )
+        self._event_types_map = {v.response_tag(): v for v in self.value_classes}
+
+    def field_elem_tag(self):
+        # The events are direct children of the element
+        return None
 
     def from_xml(self, elem, account):
         events = []
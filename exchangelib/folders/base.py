@@ -41,7 +41,14 @@ from ..properties import (
 from ..queryset import DoesNotExist, SearchableMixIn
 from ..util import TNS, is_iterable, require_id
 from ..version import EXCHANGE_2007_SP1, EXCHANGE_2010, SupportedVersionClassMixIn
-from .collections import FolderCollection, PullSubscription, PushSubscription, StreamingSubscription, SyncCompleted
+from .collections import (
+    FolderCollection,
+    PullSubscription,
+    PushSubscription,
+    StreamingSubscription,
+    SyncCompleted,
+    supported_item_fields,
+)
 from .queryset import DEEP as DEEP_FOLDERS
 from .queryset import MISSING_FOLDER_ERRORS
 from .queryset import SHALLOW as SHALLOW_FOLDERS
@@ -278,10 +285,14 @@ class BaseFolder(RegisterMixIn, SearchableMixIn, SupportedVersionClassMixIn, met
     @classmethod
     def allowed_item_fields(cls, version):
         # Return non-ID fields of all item classes allowed in this folder type
-        fields = set()
-        for item_model in cls.supported_item_models:
-            fields.update(set(item_model.supported_fields(version=version)))
-        return fields
+        fields, _ = supported_item_fields(item_models=cls.supported_item_models, version=version)
+        return set(fields)
+
+    @classmethod
+    def allowed_item_field_paths(cls, version):
+        # Like allowed_item_fields(), but return a FieldPath for each field
+        _, field_paths = supported_item_fields(item_models=cls.supported_item_models, version=version)
+        return set(field_paths)
 
     def validate_item_field(self, field, version):
         FolderCollection(account=self.account, folders=[self]).validate_item_field(field=field, version=version)
@@ -476,7 +487,7 @@ class BaseFolder(RegisterMixIn, SearchableMixIn, SupportedVersionClassMixIn, met
     def _kwargs_from_elem(cls, elem, account):
         # Check for 'DisplayName' element before collecting kwargs because that clears the elements
         has_name_elem = elem.find(cls.get_field_by_fieldname("name").response_tag()) is not None
-        kwargs = {f.name: f.from_xml(elem=elem, account=account) for f in cls.FIELDS}
+        kwargs = super()._kwargs_from_elem(elem=elem, account=account)
         if has_name_elem and not kwargs["name"]:
             # When we request the 'DisplayName' property, some folders may still be returned with an empty value.
             # Assign a default name to these folders.
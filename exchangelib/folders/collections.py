@@ -6,13 +6,36 @@ from cached_property import threaded_cached_property
 from ..errors import InvalidTypeError
 from ..fields import FieldPath, InvalidField
 from ..items import ID_ONLY, Persona
-from ..properties import CalendarView
+from ..properties import CalendarView, Fields
 from ..queryset import Q, QuerySet, SearchableMixIn
 from ..restriction import Restriction
 from ..util import require_account
 
 log = logging.getLogger(__name__)
 
+# (item models, server build) -> (fields generation, fields, field paths). See supported_item_fields()
+_item_fields_cache = {}
+
+
+def supported_item_fields(item_models, version):
+    """Return the fields supported by the given server version on any of the item models, and a FieldPath for each of
+    them, as two frozensets. The result is cached until fields are registered or deregistered on any model.
+    """
+    key = frozenset(item_models), version.build
+    # Read the generation before computing the fields. If fields change while we are working, our result is stale.
+    generation = Fields.generation
+    try:
+        cached_generation, fields, field_paths = _item_fields_cache[key]
+    except KeyError:
+        pass
+    else:
+        if cached_generation == generation:
+            return fields, field_paths
+    fields = frozenset(f for item_model in key[0] for f in item_model.supported_fields(version=version))
+    field_paths = frozenset(FieldPath(field=f) for f in fields)
+    _item_fields_cache[key] = generation, fields, field_paths
+    return fields, field_paths
+
 
 class SyncCompleted(Exception):
     """This is really misusing an exception to return the sync state."""
@@ -115,10 +138,13 @@ class FolderCollection(SearchableMixIn):
 
     def allowed_item_fields(self):
         # Return non-ID fields of all item classes allowed in this folder type
-        fields = set()
-        for item_model in self.supported_item_models:
-            fields.update(set(item_model.supported_fields(version=self.account.version)))
-        return fields
+        fields, _ = supported_item_fields(item_models=self.supported_item_models, version=self.account.version)
+        return set(fields)
+
+    def allowed_item_field_paths(self):
+        # Like allowed_item_fields(), but return a FieldPath for each field
+        _, field_paths = supported_item_fields(item_models=self.supported_item_models, version=self.account.version)
+        return set(field_paths)
 
     @property
     def supported_item_models(self):
@@ -168,6 +194,9 @@ class FolderCollection(SearchableMixIn):
         page_size=None,
         max_items=None,
         offset=0,
+        lazy=False,
+        projection=None,
+        concurrency=None,
     ):
         """Private method to call the FindItem service.
 
@@ -182,6 +211,12 @@ class FolderCollection(SearchableMixIn):
         :param page_size: the requested number of items per page (Default value = None)
         :param max_items: the max number of items to return (Default value = None)
         :param offset: the offset relative to the first item in the item collection (Default value = 0)
+        :param lazy: If True, item field values are read when they are first accessed (Default value = False)
+        :param projection: If set, a list of FieldPath objects. Return a tuple of the values of these field paths for
+          each item, instead of an item. This is much faster than creating items. (Default value = None)
+        :param concurrency: the number of folders to page through concurrently. If order_fields is set, the sorted
+          items of each folder are merged into one sorted stream. Limited by the size of the session pool.
+          (Default value = None)
 
         :return: a generator for the returned item IDs or items
         """
@@ -208,7 +243,7 @@ class FolderCollection(SearchableMixIn):
             additional_fields,
             restriction.q if restriction else None,
         )
-        yield from FindItem(account=self.account, page_size=page_size).call(
+        yield from FindItem(account=self.account, page_size=page_size, concurrency=concurrency).call(
             folders=self.folders,
             additional_fields=additional_fields,
             restriction=restriction,
@@ -219,7 +254,51 @@ class FolderCollection(SearchableMixIn):
             calendar_view=calendar_view,
             max_items=calendar_view.max_items if calendar_view else max_items,
             offset=offset,
+            lazy=lazy,
+            projection=projection,
+        )
+
+    def count_items(self, q, depth=None):
+        """Private method to count the items matching a query with the FindItem service, without fetching the items.
+        The server reports the number of matching items in each folder when we request a page with a single item.
+
+        :param q: a Q instance containing any restrictions
+        :param depth: controls the whether to count soft-deleted items or not. (Default value = None)
+
+        :return: a list of the number of matching items in each folder
+        """
+        from ..services import FindItem
+
+        if not self.folders:
+            log.debug("Folder list is empty")
+            return []
+        if q.is_never():
+            log.debug("Query will never return results")
+            return [0] * len(self.folders)
+        depth, restriction, query_string = self._rinse_args(
+            q=q, depth=depth, additional_fields=None, field_validator=self.validate_item_field
+        )
+        counts = FindItem(account=self.account).count(
+            folders=self.folders, restriction=restriction, query_string=query_string, depth=depth
         )
+        for count in counts:
+            if isinstance(count, Exception):
+                raise count
+        return counts
+
+    async def afind_items(self, q, **kwargs):
+        """Async counterpart of find_items(). Takes the same arguments and returns an async generator.
+
+        :param q: a Q instance containing any restrictions
+        :param kwargs: same as for find_items()
+
+        :return: an async generator for the returned item IDs or items
+        """
+        from ..aio import AsyncProtocol
+
+        async_protocol = AsyncProtocol.from_protocol(self.account.protocol)
+        async for item in async_protocol.iterate(self.find_items(q, **kwargs), batch_size=kwargs.get("page_size")):
+            yield item
 
     def _get_single_folder(self):
         if len(self.folders) > 1:
@@ -475,7 +554,7 @@ class FolderCollection(SearchableMixIn):
         folder = self._get_single_folder()
         if only_fields is None:
             # We didn't restrict list of field paths. Get all fields from the server, including extended properties.
-            additional_fields = {FieldPath(field=f) for f in folder.allowed_item_fields(version=self.account.version)}
+            additional_fields = folder.allowed_item_field_paths(version=self.account.version)
         else:
             for field in only_fields:
                 folder.validate_item_field(field=field, version=self.account.version)
@@ -1,4 +1,5 @@
 import logging
+from threading import RLock
 
 from ..errors import InvalidTypeError
 from ..extended_properties import ExtendedProperty
@@ -20,6 +21,9 @@ from ..version import EXCHANGE_2007_SP1
 
 log = logging.getLogger(__name__)
 
+# Protects the lazy state of items while a field value is read. Lazy reads are short, so one lock is enough.
+_lazy_read_lock = RLock()
+
 # Shape enums
 ID_ONLY = "IdOnly"
 DEFAULT = "Default"
@@ -137,7 +141,14 @@ class BaseItem(RegisterMixIn, metaclass=EWSMeta):
     ID_ELEMENT_CLS = ItemId
     _id = IdElementField(field_uri="item:ItemId", value_cls=ID_ELEMENT_CLS)
 
-    __slots__ = "account", "folder"
+    # Fields that are read by __init__() of this class or a subclass. They always have a value when the item is
+    # created, also on lazy items.
+    EAGER_FIELD_NAMES = ("attachments",)
+    # Fields whose values are adjusted by __init__() or from_xml() of this class or a subclass. values_from_xml() must
+    # create the item to get their values.
+    ADJUSTED_FIELD_NAMES = EAGER_FIELD_NAMES
+
+    __slots__ = "account", "folder", "_lazy_state"
 
     def __init__(self, **kwargs):
         """Pick out optional 'account' and 'folder' kwargs, and pass the rest to the parent class.
@@ -163,14 +174,129 @@ class BaseItem(RegisterMixIn, metaclass=EWSMeta):
                     if self.account != self.folder.account:
                         raise ValueError("'account' does not match 'folder.account'")
                 self.account = self.folder.account
+        # A (decoder, elem, field_elems, account, unread_field_names) tuple on items created with from_xml(lazy=True)
+        self._lazy_state = None
         super().__init__(**kwargs)
 
     @classmethod
-    def from_xml(cls, elem, account):
-        item = super().from_xml(elem=elem, account=account)
+    def from_xml(cls, elem, account, lazy=False):
+        """Create an item from an XML element.
+
+        :param elem: The XML element
+        :param account: The account the item belongs to
+        :param lazy: If True, field values are read from the XML element when they are first accessed. The item keeps
+          a reference to the element until all fields have been read. (Default value = False)
+        """
+        if lazy:
+            item = cls._lazy_from_xml(elem=elem, account=account)
+        else:
+            item = super().from_xml(elem=elem, account=account)
         item.account = account
         return item
 
+    @classmethod
+    def values_from_xml(cls, elem, account, field_paths):
+        """Return a tuple of the values of the given field paths, read from an XML element. Only the requested fields
+        are read, and no item is created unless one of the fields is in ADJUSTED_FIELD_NAMES. Field paths that point to
+        fields this class does not have get a None value.
+
+        :param elem: The XML element
+        :param account: The account the item belongs to
+        :param field_paths: A list of FieldPath objects
+        """
+        if any(f.field.name in cls.ADJUSTED_FIELD_NAMES for f in field_paths):
+            return cls.from_xml(elem=elem, account=account, lazy=True)._get_values(field_paths)
+        decoder = cls.FIELDS.decoder
+        field_elems = decoder.field_elems(elem)
+        # Each field can only be read once. Reading a field may clear the child element.
+        field_values = {}
+        values = []
+        for f in field_paths:
+            name = f.field.name
+            if name in ("id", "changekey"):
+                # These are attributes of the ID element
+                if "_id" not in field_values:
+                    field_values["_id"] = decoder.read_field("_id", elem=elem, field_elems=field_elems, account=account)
+                values.append(None if field_values["_id"] is None else getattr(field_values["_id"], name))
+                continue
+            if name not in cls.FIELDS:
+                values.append(None)
+                continue
+            if name not in field_values:
+                field_values[name] = decoder.read_field(name, elem=elem, field_elems=field_elems, account=account)
+            values.append(f.resolve_value(field_values[name]))
+        cls._clear(elem)
+        return tuple(values)
+
+    def _get_values(self, field_paths):
+        """Return a tuple of the values of the given field paths, like values_from_xml() does."""
+        values = []
+        for f in field_paths:
+            try:
+                values.append(f.get_value(self))
+            except AttributeError:
+                values.append(None)
+        return tuple(values)
+
+    @classmethod
+    def _lazy_from_xml(cls, elem, account):
+        decoder = cls.FIELDS.decoder
+        field_elems = decoder.field_elems(elem)
+        kwargs = {}
+        unread_field_names = set()
+        for f in cls.FIELDS:
+            if f.name in cls.EAGER_FIELD_NAMES:
+                kwargs[f.name] = decoder.read_field(f.name, elem=elem, field_elems=field_elems, account=account)
+            else:
+                unread_field_names.add(f.name)
+        # Detach the element from the tree, but don't clear it. We still need the child elements.
+        parent = elem.getparent()
+        if parent is not None:
+            parent.remove(elem)
+        item = cls(**kwargs)
+        # Unset the values that __init__() set, so the first access goes through __getattr__()
+        for name in unread_field_names:
+            delattr(item, name)
+        item._lazy_state = decoder, elem, field_elems, account, unread_field_names
+        return item
+
+    def __getattr__(self, name):
+        # Only called when normal attribute lookup fails, which is the case for fields of lazy items that have not
+        # been read yet.
+        if name == "_lazy_state":
+            raise AttributeError(name)
+        lazy_state = self._lazy_state
+        if lazy_state is None or name not in lazy_state[-1]:
+            raise AttributeError(f"{self.__class__.__name__!r} object has no attribute {name!r}")
+        with _lazy_read_lock:
+            lazy_state = self._lazy_state
+            if lazy_state is None or name not in lazy_state[-1]:
+                # Another thread read the field while we were waiting for the lock
+                return object.__getattribute__(self, name)
+            decoder, elem, field_elems, account, unread_field_names = lazy_state
+            # Each field can only be read once. Reading a field may clear the child element. Only mark the field as
+            # read when the value was decoded, so an error is raised again on the next access.
+            value = decoder.read_field(name, elem=elem, field_elems=field_elems, account=account)
+            setattr(self, name, value)
+            unread_field_names.discard(name)
+            if not unread_field_names:
+                self._lazy_state = None
+        return value
+
+    def _read_lazy_fields(self):
+        """Read all field values that have not been accessed yet, and release the XML element of a lazy item."""
+        if self._lazy_state is None:
+            return
+        for name in list(self._lazy_state[-1]):
+            getattr(self, name)
+        # Fields that were set before they were read are still in the list. Their values are already in place.
+        self._lazy_state = None
+
+    def __reduce_ex__(self, protocol):
+        # XML elements cannot be copied or pickled
+        self._read_lazy_fields()
+        return super().__reduce_ex__(protocol)
+
 
 class BaseReplyItem(EWSElement, metaclass=EWSMeta):
     """Base class for reply/forward elements that share the same fields."""
@@ -73,6 +73,8 @@ class CalendarItem(Item, AcceptDeclineMixIn):
     """MSDN: https://docs.microsoft.com/en-us/exchange/client-developer/web-service-reference/calendaritem"""
 
     ELEMENT_NAME = "CalendarItem"
+    # The values of 'start' and 'end' are converted to dates in from_xml() if this is an all-day item
+    ADJUSTED_FIELD_NAMES = Item.ADJUSTED_FIELD_NAMES + ("start", "end")
 
     uid = TextField(field_uri="calendar:UID", is_required_after_save=True, is_searchable=False)
     recurrence_id = DateTimeField(field_uri="calendar:RecurrenceId", is_read_only=True)
@@ -224,8 +226,8 @@ class CalendarItem(Item, AcceptDeclineMixIn):
         return update_fields
 
     @classmethod
-    def from_xml(cls, elem, account):
-        item = super().from_xml(elem=elem, account=account)
+    def from_xml(cls, elem, account, lazy=False):
+        item = super().from_xml(elem=elem, account=account, lazy=lazy)
         # EWS returns the start and end values as a datetime regardless of the is_all_day status. Convert to date if
         # applicable.
         if not item.is_all_day:
@@ -12,7 +12,6 @@ from ..fields import (
     DateTimeField,
     EffectiveRightsField,
     EWSElementField,
-    FieldPath,
     IntegerField,
     MessageHeaderField,
     MimeContentField,
@@ -242,9 +241,7 @@ class Item(BaseItem):
         from ..folders import Folder
         from ..services import GetItem
 
-        additional_fields = {
-            FieldPath(field=f) for f in Folder(root=self.account.root).allowed_item_fields(version=self.account.version)
-        }
+        additional_fields = Folder(root=self.account.root).allowed_item_field_paths(version=self.account.version)
         res = GetItem(account=self.account).get(items=[self], additional_fields=additional_fields, shape=ID_ONLY)
         if self.id != res.id and not isinstance(self._id, (OccurrenceItemId, RecurringMasterItemId)):
             # When we refresh an item with an OccurrenceItemId as ID, EWS returns the ID of the occurrence, so
@@ -5,6 +5,7 @@ import datetime
 import logging
 import struct
 from inspect import getmro
+from itertools import count
 from threading import Lock
 
 from .errors import (
@@ -61,13 +62,21 @@ from .version import EXCHANGE_2013, Build, Version
 
 log = logging.getLogger(__name__)
 
+_generations = count()
+
 
 class Fields(list):
     """A collection type for the FIELDS class attribute. Works like a list but supports fast lookup by name."""
 
+    # Changes every time the fields of any Fields instance change. Used to invalidate values that are computed from the
+    # fields of more than one class.
+    generation = next(_generations)
+
     def __init__(self, *fields):
         super().__init__(fields)
         self._dict = {}
+        self._decoder = None
+        self._supported_fields = {}
         for f in fields:
             # Check for duplicate field names
             if f.name in self._dict:
@@ -99,6 +108,33 @@ class Fields(list):
     def copy(self):
         return self.__class__(*self)
 
+    @property
+    def decoder(self):
+        """Return a FieldsDecoder for these fields. It is built on first access and rebuilt when fields change."""
+        if self._decoder is None:
+            self._decoder = FieldsDecoder(self)
+        return self._decoder
+
+    def supported_fields(self, version):
+        """Return the non-attribute fields supported by the given server version. The result is cached per server build
+        and cleared when fields change.
+        """
+        # Hold on to the cache we read from. If fields change while we are working, the cache is replaced, and our
+        # result is not stored in the new cache.
+        cache = self._supported_fields
+        key = None if version is None else version.build
+        try:
+            return cache[key]
+        except KeyError:
+            fields = tuple(f for f in self if not f.is_attribute and f.supports_version(version))
+            cache[key] = fields
+            return fields
+
+    def _fields_changed(self):
+        self._decoder = None
+        self._supported_fields = {}
+        Fields.generation = next(_generations)
+
     def index_by_name(self, field_name):
         for i, f in enumerate(self):
             if f.name == field_name:
@@ -110,14 +146,95 @@ class Fields(list):
             raise ValueError(f"Field {field!r} is a duplicate")
         super().insert(index, field)
         self._dict[field.name] = field
+        self._fields_changed()
 
     def remove(self, field):
         super().remove(field)
         del self._dict[field.name]
+        self._fields_changed()
 
     def append(self, field):
         super().append(field)
         self._dict[field.name] = field
+        self._fields_changed()
+
+
+class FieldsDecoder:
+    """Reads the values of a list of fields from an XML element. Calling .from_xml() on each field would search the
+    children of the element once per field. Instead, we visit the children once and dispatch on a precomputed table of
+    tags. Fields whose value cannot be read from a single child element are read with their own .from_xml() method.
+
+    Extended property fields all read from 'ExtendedProperty' elements. They are matched in a single pass over these
+    elements, by looking up the property definition of each element in a table of the definitions of the fields.
+    """
+
+    def __init__(self, fields):
+        extended_property_fields = [f for f in fields if isinstance(f, ExtendedPropertyField)]
+        fields = [f for f in fields if not isinstance(f, ExtendedPropertyField)]
+        tags = [self._field_elem_tag(f) for f in fields]
+        # Fields sharing a tag are read with .from_xml(). Reading one field may detach the child element from the tree,
+        # and the other field must see the same result as before.
+        duplicate_tags = {tag for tag in tags if tags.count(tag) > 1}
+        self.fields = tuple((f, None if tag in duplicate_tags else tag) for f, tag in zip(fields, tags))
+        # Bind the methods that read the field values up front. This saves a lot of attribute lookups.
+        self._readers = tuple(
+            (f.name, f.from_xml, None) if tag is None else (f.name, f.from_field_elem, tag) for f, tag in self.fields
+        )
+        self._readers_by_name = {name: (reader, tag) for name, reader, tag in self._readers}
+        # Property definition -> fields. More than one field may be registered with the same definition.
+        self._extended_properties = {}
+        for f in extended_property_fields:
+            self._extended_properties.setdefault(f.value_cls.match_key(), []).append(f)
+            self._readers_by_name[f.name] = f.from_xml, None
+        self._extended_property_fields = tuple(extended_property_fields)
+
+    @staticmethod
+    def _field_elem_tag(field):
+        try:
+            return field.field_elem_tag()
+        except ValueError:
+            # The field is missing information needed to find its element. Let .from_xml() raise, if it is ever called.
+            return None
+
+    @staticmethod
+    def field_elems(elem):
+        """Return a dict of the first child element for each tag"""
+        # Iterate in reverse so the first element wins. Don't read field values while iterating, because reading may
+        # detach child elements from the tree.
+        return {child.tag: child for child in elem.iterchildren(reversed=True)}
+
+    def read_field(self, name, elem, field_elems, account):
+        """Return the value of a single field. 'field_elems' is the output of .field_elems(elem)."""
+        reader, tag = self._readers_by_name[name]
+        if tag is None:
+            return reader(elem=elem, account=account)
+        return reader(field_elem=field_elems.get(tag), account=account)
+
+    def from_xml(self, elem, account):
+        """Return a dict of field names and values"""
+        field_elems = self.field_elems(elem)
+        kwargs = {}
+        for name, reader, tag in self._readers:
+            if tag is None:
+                kwargs[name] = reader(elem=elem, account=account)
+            else:
+                kwargs[name] = reader(field_elem=field_elems.get(tag), account=account)
+        if self._extended_property_fields:
+            kwargs.update(self._read_extended_properties(elem=elem, account=account))
+        return kwargs
+
+    def _read_extended_properties(self, elem, account):
+        values = {}
+        value_cls = self._extended_property_fields[0].value_cls
+        for extended_property in elem.iterchildren(value_cls.response_tag()):
+            for f in self._extended_properties.get(value_cls.elem_match_key(extended_property), ()):
+                # The first matching element wins
+                if f.name not in values:
+                    values[f.name] = f.value_cls.from_xml(elem=extended_property, account=account)
+        for f in self._extended_property_fields:
+            if f.name not in values:
+                values[f.name] = f.default
+        return values
 
 
 class Body(str):
@@ -195,6 +312,15 @@ def _mangle(field_name):
     return f"__{field_name}"
 
 
+def _intern_kwargs(kwargs, account):
+    """Replace the string values in a dict of field values with values from the intern pool of the account, if any"""
+    pool = getattr(account, "intern_pool", None)
+    if pool is not None:
+        for name, value in kwargs.items():
+            kwargs[name] = pool.intern(value)
+    return kwargs
+
+
 class EWSMeta(type, metaclass=abc.ABCMeta):
     def __new__(mcs, name, bases, kwargs):
         # Collect fields defined directly on the class
@@ -306,9 +432,13 @@ class EWSElement(metaclass=EWSMeta):
             return
         parent.remove(elem)
 
+    @classmethod
+    def _kwargs_from_elem(cls, elem, account):
+        return cls.FIELDS.decoder.from_xml(elem=elem, account=account)
+
     @classmethod
     def from_xml(cls, elem, account):
-        kwargs = {f.name: f.from_xml(elem=elem, account=account) for f in cls.FIELDS}
+        kwargs = cls._kwargs_from_elem(elem=elem, account=account)
         cls._clear(elem)
         return cls(**kwargs)
 
@@ -364,8 +494,7 @@ class EWSElement(metaclass=EWSMeta):
     @classmethod
     def supported_fields(cls, version):
         """Return the fields supported by the given server version."""
-
-        return tuple(f for f in cls.FIELDS if not f.is_attribute and f.supports_version(version))
+        return cls.FIELDS.supported_fields(version)
 
     @classmethod
     def get_field_by_fieldname(cls, fieldname):
@@ -523,6 +652,11 @@ class ParentFolderId(ItemId):
 
     ELEMENT_NAME = "ParentFolderId"
 
+    @classmethod
+    def _kwargs_from_elem(cls, elem, account):
+        # Items in a response usually share a few parent folders
+        return _intern_kwargs(super()._kwargs_from_elem(elem=elem, account=account), account=account)
+
 
 class ReferenceItemId(ItemId):
     """MSDN: https://docs.microsoft.com/en-us/exchange/client-developer/web-service-reference/referenceitemid"""
@@ -632,6 +766,11 @@ class Mailbox(EWSElement):
     mailbox_type = ChoiceField(field_uri="MailboxType", choices=MAILBOX_TYPE_CHOICES, default=MAILBOX)
     item_id = EWSElementField(value_cls=ItemId, is_read_only=True)
 
+    @classmethod
+    def _kwargs_from_elem(cls, elem, account):
+        # The same senders and recipients usually appear on many items in a response
+        return _intern_kwargs(super()._kwargs_from_elem(elem=elem, account=account), account=account)
+
     def clean(self, version=None):
         super().clean(version=version)
 
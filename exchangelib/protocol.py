@@ -8,9 +8,11 @@ import abc
 import datetime
 import logging
 import random
+import time
+from collections import deque
 from contextlib import suppress
 from queue import Empty, LifoQueue
-from threading import Lock
+from threading import Condition, Event, Lock
 
 import requests.adapters
 import requests.sessions
@@ -23,6 +25,7 @@ from .errors import (
     ErrorInternalServerTransientError,
     ErrorInvalidSchemaVersionForMailboxVersion,
     ErrorServerBusy,
+    InvalidEnumValue,
     InvalidTypeError,
     MalformedResponseError,
     RateLimitError,
@@ -81,6 +84,11 @@ class BaseProtocol:
     # The number of times a session may be reused before creating a new session object. 'None' means "infinite".
     # Discarding sessions after a certain number of usages may limit memory leaks in the Session object.
     MAX_SESSION_USAGE_COUNT = None
+    # When the server asks us to back off, the session pool size is lowered. It is raised again by one session after
+    # this many consecutive successful requests, if at least SESSION_POOL_COOLDOWN seconds have passed since the pool
+    # size was last lowered.
+    SESSION_POOL_RAMP_UP_COUNT = 100
+    SESSION_POOL_COOLDOWN = 60
     # Timeout for HTTP requests
     TIMEOUT = 120
     RETRY_WAIT = 10  # Seconds to wait before retry on connection errors
@@ -96,6 +104,11 @@ class BaseProtocol:
 
         self._session_pool_size = 0
         self._session_pool_maxsize = config.max_connections or self.SESSION_POOLSIZE
+        # The size that the session pool is currently allowed to grow to. This is lowered when the server asks us to
+        # back off, and raised again towards '_session_pool_maxsize' by .record_success(). 'None' means no limit.
+        self._session_pool_target_size = None
+        self._session_pool_success_count = 0
+        self._session_pool_decreased_at = None
 
         # Try to behave nicely with the remote server. We want to keep the connection open between requests.
         # We also want to re-use sessions, to avoid the NTLM auth handshake on every request. We must know the
@@ -103,6 +116,13 @@ class BaseProtocol:
         self._session_pool = LifoQueue()
         self._session_pool_lock = Lock()
 
+        # Chunk sizes learned from timeouts, per service class. See EWSService._chunked_get_elements()
+        self._chunk_size_controllers = {}
+        self._chunk_size_controllers_lock = Lock()
+
+        # Decides the order in which threads waiting for a session get one
+        self._session_scheduler = SessionScheduler()
+
     @property
     def service_endpoint(self):
         return self.config.service_endpoint
@@ -139,17 +159,23 @@ class BaseProtocol:
         return self.config.server
 
     def __getstate__(self):
-        # The session pool and lock cannot be pickled
+        # The session pool and locks cannot be pickled. Learned chunk sizes are not worth keeping.
         state = self.__dict__.copy()
         del state["_session_pool"]
         del state["_session_pool_lock"]
+        del state["_chunk_size_controllers"]
+        del state["_chunk_size_controllers_lock"]
+        del state["_session_scheduler"]
         return state
 
     def __setstate__(self, state):
-        # Restore the session pool and lock
+        # Restore the session pool and locks
         self.__dict__.update(state)
         self._session_pool = LifoQueue()
         self._session_pool_lock = Lock()
+        self._chunk_size_controllers = {}
+        self._chunk_size_controllers_lock = Lock()
+        self._session_scheduler = SessionScheduler()
 
     def __del__(self):
         # pylint: disable=bare-except
@@ -183,14 +209,20 @@ class BaseProtocol:
     def session_pool_size(self):
         return self._session_pool_size
 
+    @property
+    def session_pool_target_size(self):
+        if self._session_pool_target_size is None:
+            return self._session_pool_maxsize
+        return min(self._session_pool_target_size, self._session_pool_maxsize)
+
     def increase_poolsize(self):
         """Increases the session pool size. We increase by one session per call."""
         # Create a single session and insert it into the pool. We need to protect this with a lock while we are changing
-        # the pool size variable, to avoid race conditions. We must not exceed the pool size limit.
-        if self._session_pool_size >= self._session_pool_maxsize:
+        # the pool size variable, to avoid race conditions. We must not exceed the current target size.
+        if self._session_pool_size >= self.session_pool_target_size:
             raise SessionPoolMaxSizeReached("Session pool size cannot be increased further")
         with self._session_pool_lock:
-            if self._session_pool_size >= self._session_pool_maxsize:
+            if self._session_pool_size >= self.session_pool_target_size:
                 log.debug("Session pool size was increased in another thread")
                 return
             log.debug(
@@ -210,9 +242,18 @@ class BaseProtocol:
         # the pool size variable, to avoid race conditions. We must keep at least one session in the pool.
         if self._session_pool_size <= 1:
             raise SessionPoolMinSizeReached("Session pool size cannot be decreased further")
+        # Take the session directly from the pool, and before taking the lock. get_session() may queue us behind other
+        # threads or try to grow the pool, which would deadlock or block other threads while we hold the lock. Don't
+        # wait for a session if they are all in use. The next request that is rate-limited will try again.
+        try:
+            session = self._session_pool.get(block=False)
+        except Empty:
+            log.debug("Server %s: No idle sessions. Not decreasing session pool size", self.server)
+            return
         with self._session_pool_lock:
             if self._session_pool_size <= 1:
                 log.debug("Session pool size was decreased in another thread")
+                self._session_pool.put(session, block=False)
                 return
             log.warning(
                 "Server %s: Decreasing session pool size from %s to %s",
@@ -220,28 +261,94 @@ class BaseProtocol:
                 self._session_pool_size,
                 self._session_pool_size - 1,
             )
-            session = self.get_session()
             self.close_session(session)
             self._session_pool_size -= 1
+            # Don't grow back until the server has been happy with us for a while
+            self._session_pool_target_size = self._session_pool_size
+            self._session_pool_success_count = 0
+            self._session_pool_decreased_at = time.monotonic()
+
+    def record_success(self):
+        """Register a successful request. This slowly raises the target session pool size back towards the max size
+        after it was lowered by .decrease_poolsize(). We raise the target by one session after
+        SESSION_POOL_RAMP_UP_COUNT consecutive successful requests, and only if SESSION_POOL_COOLDOWN seconds have
+        passed since the pool size was last lowered. New sessions are created on demand by .get_session().
+        """
+        if self._session_pool_target_size is None:
+            # Nothing to do. Avoid taking the lock on every request.
+            return
+        with self._session_pool_lock:
+            if self._session_pool_target_size is None:
+                return
+            self._session_pool_success_count += 1
+            if self._session_pool_success_count < self.SESSION_POOL_RAMP_UP_COUNT:
+                return
+            if time.monotonic() - self._session_pool_decreased_at < self.SESSION_POOL_COOLDOWN:
+                return
+            log.info(
+                "Server %s: Increasing target session pool size from %s to %s",
+                self.server,
+                self._session_pool_target_size,
+                self._session_pool_target_size + 1,
+            )
+            self._session_pool_success_count = 0
+            self._session_pool_target_size += 1
+            if self._session_pool_target_size >= self._session_pool_maxsize:
+                self._session_pool_target_size = None
+
+    def get_chunk_size_controller(self, service_cls):
+        """Return the ChunkSizeController for 'service_cls', creating it if necessary. Controllers are shared by all
+        instances of the service class using this protocol, so later requests start out with a chunk size that works.
+        """
+        try:
+            return self._chunk_size_controllers[service_cls]
+        except KeyError:
+            pass
+        with self._chunk_size_controllers_lock:
+            if service_cls not in self._chunk_size_controllers:
+                self._chunk_size_controllers[service_cls] = ChunkSizeController(max_size=service_cls.CHUNK_SIZE)
+            return self._chunk_size_controllers[service_cls]
 
-    def get_session(self):
+    @property
+    def session_queue_stats(self):
+        """Return a dict of session queue statistics, keyed by the 'key' argument of .get_session()."""
+        return self._session_scheduler.stats()
+
+    def get_session(self, key=None, priority=0):
+        """Return a session from the pool.
+
+        :param key: Requests with the same key, e.g. the mailbox the request is for, are queued together when waiting
+            for a session. Keys take turns getting a session, so one key cannot starve the others.
+            (Default value = None)
+        :param priority: Waiting requests with a higher priority get a session first. (Default value = 0)
+        """
         # Try to get a session from the queue. If the queue is empty, try to add one more session to the queue. If the
         # queue is already at its max, wait until a session becomes available.
         _timeout = 60  # Rate-limit messages about session starvation
+        start = time.monotonic()
         try:
+            if not self._session_scheduler.is_idle:
+                # Don't jump the queue
+                raise Empty()
             session = self._session_pool.get(block=False)
             log.debug("Server %s: Got session immediately", self.server)
         except Empty:
             with suppress(SessionPoolMaxSizeReached):
                 self.increase_poolsize()
-            while True:
-                try:
-                    log.debug("Server %s: Waiting for session", self.server)
-                    session = self._session_pool.get(timeout=_timeout)
-                    break
-                except Empty:
-                    # This is normal when we have many worker threads starving for available sessions
-                    log.debug("Server %s: No sessions available for %s seconds", self.server, _timeout)
+            # Only the thread whose turn it is waits on the session pool. The others wait for their turn.
+            self._session_scheduler.wait_for_turn(key=key, priority=priority)
+            try:
+                while True:
+                    try:
+                        log.debug("Server %s: Waiting for session", self.server)
+                        session = self._session_pool.get(timeout=_timeout)
+                        break
+                    except Empty:
+                        # This is normal when we have many worker threads starving for available sessions
+                        log.debug("Server %s: No sessions available for %s seconds", self.server, _timeout)
+            finally:
+                self._session_scheduler.end_turn(key=key)
+        self._session_scheduler.add_wait(key=key, wait_time=time.monotonic() - start)
         log.debug("Server %s: Got session %s", self.server, session.session_id)
         session.usage_count += 1
         return session
@@ -639,6 +746,123 @@ class TLSClientAuth(requests.adapters.HTTPAdapter):
         return super().init_poolmanager(*args, **kwargs)
 
 
+class SessionScheduler:
+    """Decides the order in which threads get a session when the session pool is exhausted. Waiting threads are queued
+    by key, usually the mailbox that the request is for. Higher priorities are served first. Keys with the same
+    priority take turns in round-robin order, so one mailbox doing bulk work cannot starve requests for other mailboxes.
+    Requests with the same key and priority are served in FIFO order.
+
+    Only one thread at a time has the turn to wait for the next available session. When it gets one, the turn is passed
+    on to the next thread in line.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._has_turn = False  # True if some thread currently has the turn
+        self._queues = {}  # A dict of (priority, key) -> deque of waiting threads, in round-robin order
+        self._stats = {}  # A dict of key -> dict of statistics
+
+    @property
+    def is_idle(self):
+        return not self._has_turn
+
+    def wait_for_turn(self, key, priority):
+        with self._lock:
+            self._key_stats(key)["queued"] += 1
+            if not self._has_turn:
+                self._has_turn = True
+                return
+            event = Event()
+            # A key that already has waiters keeps its place in line. New keys are added to the back.
+            self._queues.setdefault((priority, key), deque()).append(event)
+        event.wait()
+
+    def end_turn(self, key):
+        with self._lock:
+            self._key_stats(key)["queued"] -= 1
+            if not self._queues:
+                self._has_turn = False
+                return
+            # Pick the first key in round-robin order with the highest priority
+            priority, key = max(self._queues, key=lambda k: k[0])
+            waiters = self._queues.pop((priority, key))
+            event = waiters.popleft()
+            if waiters:
+                # Move the key to the back of the line
+                self._queues[(priority, key)] = waiters
+        event.set()
+
+    def add_wait(self, key, wait_time):
+        with self._lock:
+            stats = self._key_stats(key)
+            stats["requests"] += 1
+            stats["wait_time"] += wait_time
+            stats["max_wait_time"] = max(stats["max_wait_time"], wait_time)
+
+    def _key_stats(self, key):
+        try:
+            return self._stats[key]
+        except KeyError:
+            self._stats[key] = dict(queued=0, requests=0, wait_time=0.0, max_wait_time=0.0)
+            return self._stats[key]
+
+    def stats(self):
+        """Return a copy of the statistics for each key. 'queued' is the number of requests currently waiting for a
+        session. 'requests' is the total number of sessions handed out, and 'wait_time' and 'max_wait_time' are the
+        total and longest time in seconds that requests have waited for a session.
+        """
+        with self._lock:
+            return {k: v.copy() for k, v in self._stats.items()}
+
+
+class ChunkSizeController:
+    """Adjusts the chunk size of a service using additive increase, multiplicative decrease (AIMD). When a chunk times
+    out, the limit is set to half the size of the failed chunk. Every chunk that succeeds at the current limit increases
+    the limit by 'INCREASE_STEP'. When the limit grows back to 'max_size', it is removed.
+    """
+
+    # The number of items to increase the limit by on every chunk that succeeds at the current limit
+    INCREASE_STEP = 1
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.limit = None  # 'None' means that we have not seen any timeouts, or have fully recovered since
+        self._lock = Lock()
+
+    def chunk_size(self, requested_size):
+        """Return the chunk size to use, given the chunk size requested by the caller."""
+        limit = self.limit
+        if limit is None:
+            return requested_size
+        return min(requested_size, limit)
+
+    def decrease(self, failed_size):
+        """Lower the limit after a chunk of size 'failed_size' timed out. Return the new limit."""
+        with self._lock:
+            new_limit = max(1, failed_size // 2)
+            if self.limit is None or new_limit < self.limit:
+                log.warning("Lowering chunk size limit from %s to %s", self.limit or failed_size, new_limit)
+                self.limit = new_limit
+            return self.limit
+
+    def increase(self, succeeded_size):
+        """Raise the limit after a chunk of size 'succeeded_size' succeeded."""
+        with self._lock:
+            if self.limit is None or succeeded_size < self.limit:
+                # Smaller chunks don't tell us anything about whether the current limit is too low
+                return
+            new_limit = self.limit + self.INCREASE_STEP
+            if new_limit >= self.max_size:
+                log.debug("Removing chunk size limit of %s", self.limit)
+                self.limit = None
+            else:
+                log.debug("Raising chunk size limit from %s to %s", self.limit, new_limit)
+                self.limit = new_limit
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(max_size={self.max_size!r}, limit={self.limit!r})"
+
+
 class RetryPolicy(metaclass=abc.ABCMeta):
     """Stores retry logic used when faced with errors from the server."""
 
@@ -804,3 +1028,185 @@ class FaultTolerance(RetryPolicy):
             if retry_after:
                 raise ErrorServerBusy(e.args[0], back_off=retry_after)
             raise
+
+
+class TokenBucket:
+    """A token bucket that limits both the rate and the number of concurrent requests. Tokens are added at a rate of
+    'rate' tokens per second, up to 'capacity' tokens. Every request consumes one token.
+    """
+
+    def __init__(self, rate=None, capacity=None, max_concurrent=None):
+        self.rate = rate
+        self.capacity = capacity or 1
+        self.max_concurrent = max_concurrent
+        self.tokens = float(self.capacity)
+        self.in_flight = 0
+        self._refilled_at = time.monotonic()
+        self._paused_until = None  # Set when the server asks us to back off
+        self._condition = Condition()
+
+    def _refill(self, now):
+        if self._paused_until:
+            if now < self._paused_until:
+                # No refills while we're backing off
+                self._refilled_at = now
+                return
+            # Start refilling from the end of the back off period
+            self._refilled_at = max(self._refilled_at, self._paused_until)
+            self._paused_until = None
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _wait_time(self, now):
+        # Return the number of seconds to wait before a request may be sent, 0 if it may be sent now, or None if we need
+        # to wait for a concurrent request to finish.
+        if self.max_concurrent and self.in_flight >= self.max_concurrent:
+            return None
+        if self._paused_until and now < self._paused_until:
+            return self._paused_until - now
+        if self.rate and self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        return 0
+
+    def acquire(self):
+        """Block until a request may be sent. Return the number of seconds we waited."""
+        start = time.monotonic()
+        waited = False
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(now)
+                if wait == 0:
+                    break
+                waited = True
+                self._condition.wait(timeout=wait)
+            if self.rate:
+                self.tokens -= 1
+            self.in_flight += 1
+        return time.monotonic() - start if waited else 0
+
+    def release(self):
+        """Register that a request acquired with .acquire() has finished."""
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def back_off(self, seconds):
+        """Empty the bucket and stop refilling it for 'seconds' seconds."""
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = 0.0
+            self._paused_until = max(self._paused_until or now, now + seconds)
+
+    def budget(self):
+        """Return the currently available budget."""
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            return dict(
+                tokens=self.tokens if self.rate else None,
+                in_flight=self.in_flight,
+                max_concurrent=self.max_concurrent,
+                paused_for=max(0.0, self._paused_until - now) if self._paused_until else 0.0,
+            )
+
+
+class RateLimiter:
+    """Limits the rate of requests sent to the server before the server starts to throttle us. Add an instance to
+    'Configuration.rate_limiter' to enable it. Instances can be shared between Configuration objects.
+
+    'requests_per_second' is the sustained rate of requests, and 'burst' the number of requests that may be sent at once
+    after a quiet period. 'max_concurrent_requests' is the max number of requests in flight at any time. 'scope'
+    decides what the limits apply to: all requests to the same endpoint, all requests using the same credentials on an
+    endpoint, or all requests for the same mailbox using the same credentials on an endpoint. When the server asks us to
+    back off, we stop sending requests in that scope for the requested time.
+    """
+
+    ENDPOINT = "endpoint"
+    CREDENTIALS = "credentials"
+    MAILBOX = "mailbox"
+    SCOPES = (ENDPOINT, CREDENTIALS, MAILBOX)
+
+    def __init__(self, requests_per_second=None, max_concurrent_requests=None, burst=None, scope=CREDENTIALS):
+        if requests_per_second is None and max_concurrent_requests is None:
+            raise ValueError("At least one of 'requests_per_second' and 'max_concurrent_requests' must be set")
+        if requests_per_second is not None:
+            if not isinstance(requests_per_second, (int, float)):
+                raise InvalidTypeError("requests_per_second", requests_per_second, float)
+            if requests_per_second <= 0:
+                raise ValueError(f"'requests_per_second' {requests_per_second} must be a positive number")
+        if max_concurrent_requests is not None:
+            if not isinstance(max_concurrent_requests, int):
+                raise InvalidTypeError("max_concurrent_requests", max_concurrent_requests, int)
+            if max_concurrent_requests < 1:
+                raise ValueError(f"'max_concurrent_requests' {max_concurrent_requests} must be a positive number")
+        if burst is not None:
+            if not isinstance(burst, int):
+                raise InvalidTypeError("burst", burst, int)
+            if burst < 1:
+                raise ValueError(f"'burst' {burst} must be a positive number")
+        if scope not in self.SCOPES:
+            raise InvalidEnumValue("scope", scope, self.SCOPES)
+        self.requests_per_second = requests_per_second
+        self.max_concurrent_requests = max_concurrent_requests
+        # Default to allowing bursts of up to one second worth of requests
+        self.burst = burst or max(1, int(requests_per_second or 1))
+        self.scope = scope
+        self._buckets = {}
+        self._buckets_lock = Lock()
+
+    def __getstate__(self):
+        # Locks cannot be pickled
+        state = self.__dict__.copy()
+        del state["_buckets"]
+        del state["_buckets_lock"]
+        return state
+
+    def __setstate__(self, state):
+        # Restore the buckets and lock
+        self.__dict__.update(state)
+        self._buckets = {}
+        self._buckets_lock = Lock()
+
+    def _scope_key(self, protocol, mailbox):
+        if self.scope == self.ENDPOINT:
+            return protocol.service_endpoint
+        if self.scope == self.CREDENTIALS:
+            return protocol.service_endpoint, protocol.credentials
+        return protocol.service_endpoint, protocol.credentials, mailbox
+
+    def get_bucket(self, protocol, mailbox=None):
+        """Return the TokenBucket for requests using 'protocol' for 'mailbox', creating it if necessary."""
+        key = self._scope_key(protocol=protocol, mailbox=mailbox)
+        try:
+            return self._buckets[key]
+        except KeyError:
+            pass
+        with self._buckets_lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(
+                    rate=self.requests_per_second, capacity=self.burst, max_concurrent=self.max_concurrent_requests
+                )
+            return self._buckets[key]
+
+    def back_off(self, protocol, mailbox, seconds):
+        """Stop sending requests in the scope of 'protocol' and 'mailbox' for 'seconds' seconds."""
+        self.get_bucket(protocol=protocol, mailbox=mailbox).back_off(seconds)
+
+    def budgets(self):
+        """Return the currently available budget of each scope, as a dict of scope key -> budget. The budget contains
+        the number of requests that may be sent right now, the number of requests in flight, the max number of
+        concurrent requests and the number of seconds left of a back off period requested by the server.
+        """
+        with self._buckets_lock:
+            buckets = self._buckets.copy()
+        return {k: v.budget() for k, v in buckets.items()}
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(requests_per_second={self.requests_per_second!r}, "
+            f"max_concurrent_requests={self.max_concurrent_requests!r}, burst={self.burst!r}, scope={self.scope!r})"
+        )
@@ -1,14 +1,19 @@
 import abc
+import heapq
 import logging
+import pickle  # nosec
+import tempfile
 from contextlib import suppress
 from copy import deepcopy
 from itertools import islice
+from operator import itemgetter
 
 from .errors import DoesNotExist, ErrorItemNotFound, InvalidEnumValue, InvalidTypeError, MultipleObjectsReturned
-from .fields import FieldOrder, FieldPath
+from .fields import FieldOrder, FieldPath, SortKey
 from .items import ID_ONLY, CalendarItem
 from .properties import InvalidField
 from .restriction import Q
+from .util import prefetch
 from .version import EXCHANGE_2010
 
 log = logging.getLogger(__name__)
@@ -61,6 +66,10 @@ class QuerySet(SearchableMixIn):
     PERSONA = "persona"
     REQUEST_TYPES = (ITEM, PERSONA)
 
+    # The max number of items to sort in memory when sorting client-side. Larger results are sorted in runs of this
+    # size which are written to temporary files and merged.
+    SORT_BUFFER_SIZE = 10000
+
     def __init__(self, folder_collection, request_type=ITEM):
         from .folders import FolderCollection
 
@@ -77,9 +86,13 @@ class QuerySet(SearchableMixIn):
         self.calendar_view = None
         self.page_size = None
         self.chunk_size = None
+        self.concurrency = None
+        self.prefetch = None
         self.max_items = None
         self.offset = 0
         self._depth = None
+        self._lazy = False
+        self._seek = False
 
     def _copy_self(self):
         # When we copy a queryset where the cache has already been filled, we don't copy the cache. Thus, a copied
@@ -100,9 +113,13 @@ class QuerySet(SearchableMixIn):
         new_qs.calendar_view = self.calendar_view
         new_qs.page_size = self.page_size
         new_qs.chunk_size = self.chunk_size
+        new_qs.concurrency = self.concurrency
+        new_qs.prefetch = self.prefetch
         new_qs.max_items = self.max_items
         new_qs.offset = self.offset
         new_qs._depth = self._depth
+        new_qs._lazy = self._lazy
+        new_qs._seek = self._seek
         return new_qs
 
     def _get_field_path(self, field_path):
@@ -158,6 +175,18 @@ class QuerySet(SearchableMixIn):
                 additional_fields.add(FieldPath(field=end_tz_field))
         return additional_fields
 
+    def _projection(self):
+        """Return the field paths to read directly from the response, or None if we need items. values() and
+        values_list() only need the values of the requested fields, unless we must sort the items client-side.
+        """
+        if self.return_format == self.NONE or self.request_type != self.ITEM or not self.only_fields:
+            return None
+        if self.calendar_view and self.order_fields:
+            return None
+        if self._seek:
+            return None  # We need the item ID and the value of the seek field of each item
+        return self.only_fields
+
     def _format_items(self, items, return_format):
         return {
             self.VALUES: self._as_values,
@@ -167,13 +196,18 @@ class QuerySet(SearchableMixIn):
         }[return_format](items)
 
     def _query(self):
+        from .services import FindItem
+
+        if self._seek:
+            items = self._seek_query()
+            return islice(items, self.offset, self.offset + self.max_items if self.max_items else None)
         if self.only_fields is None:
             # We didn't restrict list of field paths. Get all fields from the server, including extended properties.
             if self.request_type == self.PERSONA:
                 additional_fields = {}  # GetPersona doesn't take explicit fields. Don't bother calculating the list
                 complex_fields_requested = True
             else:
-                additional_fields = {FieldPath(field=f) for f in self.folder_collection.allowed_item_fields()}
+                additional_fields = self.folder_collection.allowed_item_field_paths()
                 complex_fields_requested = True
         else:
             additional_fields = self._additional_fields()
@@ -217,14 +251,23 @@ class QuerySet(SearchableMixIn):
                 items = self.folder_collection.find_people(self.q, **find_kwargs)
         else:
             find_kwargs["calendar_view"] = self.calendar_view
+            find_kwargs["concurrency"] = self.concurrency
             if complex_fields_requested:
                 # The FindItem service does not support complex field types. Tell find_items() to return
                 # (id, changekey) tuples, and pass that to fetch().
                 find_kwargs["additional_fields"] = None
+                ids = self.folder_collection.find_items(self.q, **find_kwargs)
+                if self.prefetch:
+                    # Page through the IDs in a background thread, so the next FindItem request doesn't wait for the
+                    # GetItem requests for the current page to finish.
+                    ids = prefetch(ids, size=self.prefetch * (self.page_size or FindItem.PAGE_SIZE))
                 unfiltered_items = self.folder_collection.account.fetch(
-                    ids=self.folder_collection.find_items(self.q, **find_kwargs),
+                    ids=ids,
                     only_fields=additional_fields,
                     chunk_size=self.chunk_size,
+                    concurrency=self.concurrency,
+                    lazy=self._lazy,
+                    projection=self._projection(),
                 )
                 # We may be unlucky that the item disappeared between the FindItem and the GetItem calls
                 items = filter(lambda i: not isinstance(i, MISSING_ITEM_ERRORS), unfiltered_items)
@@ -234,31 +277,117 @@ class QuerySet(SearchableMixIn):
                     # take a shortcut by using (shape=ID_ONLY, additional_fields=None) to tell find_items() to return
                     # (id, changekey) tuples. We'll post-process those later.
                     find_kwargs["additional_fields"] = None
-                items = self.folder_collection.find_items(self.q, **find_kwargs)
+                items = self.folder_collection.find_items(
+                    self.q, lazy=self._lazy, projection=self._projection(), **find_kwargs
+                )
 
         if not must_sort_clientside:
             return items
 
-        # Resort to client-side sorting of the order_by fields. This is greedy. Sorting in Python is stable, so when
-        # sorting on multiple fields, we can just do a sort on each of the requested fields in reverse order. Reverse
-        # each sort operation if the field was marked as such.
-        for f in reversed(self.order_fields):
-            try:
-                items = sorted(items, key=lambda i: _get_sort_value_or_default(i, f), reverse=f.reverse)
-            except TypeError as e:
-                if "unorderable types" not in e.args[0]:
-                    raise
-                raise ValueError(
-                    f"Cannot sort on field {f.field_path!r}. The field has no default value defined, and there are "
-                    f"either items with None values for this field, or the query contains exception instances "
-                    f"(original error: {e})."
-                )
+        # Resort to client-side sorting of the order_by fields. This is greedy.
+        items = self._sort_clientside(items)
         if not extra_order_fields:
             return items
 
         # Nullify the fields we only needed for sorting before returning
         return (_rinse_item(i, extra_order_fields) for i in items)
 
+    def _seek_query(self):
+        """Page through the items with keyset pagination. Each page is requested with a restriction on the last value
+        of the seek field that we have seen, instead of an offset. EWS can't sort or filter on item IDs, so we keep the
+        IDs of the items that have the last seen value, and skip them when the next page returns them again. If a page
+        only contains items that we already have, there are more items with the same value than fit in a page. We then
+        get all of them with an exact match, and continue with the values after it.
+        """
+        from .services import FindItem
+
+        if self.calendar_view or not self.order_fields or len(self.order_fields) != 1:
+            raise ValueError("seek() requires exactly one order_by field and no calendar view")
+        if len(self.folder_collection) != 1:
+            # The server sorts and pages each folder separately
+            raise ValueError("seek() is only supported on a single folder")
+        order_field = self.order_fields[0]
+        field_path = order_field.field_path
+        next_lookup = Q.LOOKUP_LT if order_field.reverse else Q.LOOKUP_GT
+        same_or_next_lookup = Q.LOOKUP_LTE if order_field.reverse else Q.LOOKUP_GTE
+        page_size = self.page_size or FindItem.PAGE_SIZE
+        page_qs = self._copy_self()
+        page_qs._seek = False
+        page_qs.return_format = self.NONE
+        page_qs.page_size = page_size
+        page_qs.offset = 0
+        extra_fields = set()
+        if self.only_fields is not None and field_path not in self.only_fields:
+            # Also fetch the seek field, but only return the fields that were requested
+            page_qs.only_fields = self.only_fields + (field_path,)
+            extra_fields.add(field_path)
+        # _item_yielder() expects (id, changekey) tuples if only ID and changekey fields were requested
+        ids_only = bool(self.only_fields) and all(f.field.is_attribute for f in self.only_fields)
+        # Items without a value for the seek field can't be reached with a restriction
+        base_q = self.q & Q(**{f"{field_path.path}__{Q.LOOKUP_EXISTS}": True})
+        last_value, last_ids = None, set()
+        item_count = new_item_count = 0
+
+        def new_items(qs):
+            nonlocal last_value, last_ids, item_count, new_item_count
+            for item in qs._query():
+                if isinstance(item, Exception):
+                    yield item
+                    continue
+                item_count += 1
+                value = field_path.get_value(item)
+                if value != last_value:
+                    last_value, last_ids = value, set()
+                if item.id in last_ids:
+                    # The server returned an item that we already have
+                    continue
+                last_ids.add(item.id)
+                new_item_count += 1
+                yield (item.id, item.changekey) if ids_only else _rinse_item(item, extra_fields)
+
+        page_qs.q = base_q
+        page_qs.max_items = page_size
+        while True:
+            log.debug("Seeking page of %s items from value %r", page_size, last_value)
+            item_count = new_item_count = 0
+            yield from new_items(page_qs)
+            if not item_count:
+                # Don't stop when a page is smaller than 'page_size'. GetItem may have filtered out deleted items.
+                return
+            if new_item_count:
+                page_qs.q = base_q & Q(**{f"{field_path.path}__{same_or_next_lookup}": last_value})
+                continue
+            # The page only had items with the last seen value. Get all items with that value, and continue after it.
+            ties_qs = page_qs._copy_self()
+            ties_qs.q = base_q & Q(**{field_path.path: last_value})
+            ties_qs.max_items = None
+            yield from new_items(ties_qs)
+            page_qs.q = base_q & Q(**{f"{field_path.path}__{next_lookup}": last_value})
+
+    def _sort_clientside(self, items):
+        """Sort items on all order_by fields in a single pass, using a composite key. The server ignores the offset and
+        max_items values for calendar views, so we apply them here. When we know how many items we need, we only keep
+        that many items in memory. Otherwise, items are sorted in runs that are spilled to disk and merged.
+        """
+        reverse = tuple(f.reverse for f in self.order_fields)
+        keyed_items = (
+            (SortKey(tuple(_get_sort_value_or_default(i, f) for f in self.order_fields), reverse), i) for i in items
+        )
+        try:
+            if self.max_items:
+                keyed_items = heapq.nsmallest(self.offset + self.max_items, keyed_items, key=itemgetter(0))
+            else:
+                keyed_items = _external_sort(keyed_items, buffer_size=self.SORT_BUFFER_SIZE)
+        except TypeError as e:
+            if "unorderable types" not in e.args[0]:
+                raise
+            raise ValueError(
+                f"Cannot sort on fields {[f.field_path for f in self.order_fields]!r}. A field has no default value "
+                f"defined, and there are either items with None values for this field, or the query contains exception "
+                f"instances (original error: {e})."
+            )
+        return (i for _, i in islice(keyed_items, self.offset, None))
+
     def __iter__(self):
         # Fill cache if this is the first iteration. Return an iterator over the results. Make this non-greedy by
         # filling the cache while we are iterating.
@@ -269,6 +398,15 @@ class QuerySet(SearchableMixIn):
         log.debug("Initializing cache")
         yield from self._format_items(items=self._query(), return_format=self.return_format)
 
+    async def __aiter__(self):
+        # Support 'async for item in qs'. Requests are sent from the thread pool of the AsyncProtocol belonging to the
+        # account protocol, so the event loop is never blocked.
+        from .aio import AsyncProtocol
+
+        async_protocol = AsyncProtocol.from_protocol(self.folder_collection.account.protocol)
+        async for item in async_protocol.iterate(self.__iter__(), batch_size=self.page_size):
+            yield item
+
     # Do not implement __len__. The implementation of list() tries to preallocate memory by calling __len__ on the
     # given sequence, before calling __iter__. If we implemented __len__, we would end up calling FindItems twice, once
     # to get the result of self.count(), and once to return the actual result.
@@ -364,7 +502,12 @@ class QuerySet(SearchableMixIn):
             raise ValueError("values() requires at least one field name")
         return self._item_yielder(
             iterable=iterable,
-            item_func=lambda i: {f.path: _get_value_or_default(f, i) for f in self.only_fields},
+            # _query() returns tuples of values if we don't need items
+            item_func=(
+                (lambda i: {f.path: v for f, v in zip(self.only_fields, i)})
+                if self._projection()
+                else lambda i: {f.path: _get_value_or_default(f, i) for f in self.only_fields}
+            ),
             id_only_func=lambda item_id, changekey: {"id": item_id},
             changekey_only_func=lambda item_id, changekey: {"changekey": changekey},
             id_and_changekey_func=lambda item_id, changekey: {"id": item_id, "changekey": changekey},
@@ -375,7 +518,12 @@ class QuerySet(SearchableMixIn):
             raise ValueError("values_list() requires at least one field name")
         return self._item_yielder(
             iterable=iterable,
-            item_func=lambda i: tuple(_get_value_or_default(f, i) for f in self.only_fields),
+            # _query() returns tuples of values if we don't need items
+            item_func=(
+                (lambda i: i)
+                if self._projection()
+                else lambda i: tuple(_get_value_or_default(f, i) for f in self.only_fields)
+            ),
             id_only_func=lambda item_id, changekey: (item_id,),
             changekey_only_func=lambda item_id, changekey: (changekey,),
             id_and_changekey_func=lambda item_id, changekey: (item_id, changekey),
@@ -386,7 +534,10 @@ class QuerySet(SearchableMixIn):
             raise ValueError("flat=True requires exactly one field name")
         return self._item_yielder(
             iterable=iterable,
-            item_func=lambda i: _get_value_or_default(self.only_fields[0], i),
+            # _query() returns tuples of values if we don't need items
+            item_func=(
+                (lambda i: i[0]) if self._projection() else lambda i: _get_value_or_default(self.only_fields[0], i)
+            ),
             id_only_func=lambda item_id, changekey: item_id,
             changekey_only_func=lambda item_id, changekey: changekey,
             id_and_changekey_func=None,  # Can never be called
@@ -456,6 +607,28 @@ class QuerySet(SearchableMixIn):
         new_qs.order_fields = order_fields
         return new_qs
 
+    def seek(self, field_path="datetime_received"):
+        """Page through the items with keyset pagination instead of offset pagination. Items are ordered by the given
+        field, and each page is requested with a restriction on the last value we have seen. This keeps deep pages as
+        cheap as the first one, and items are not skipped or returned twice when the folder changes while we iterate.
+
+        :param field_path: The field to order by. Prefix with '-' for descending order. The field should be one that
+          the server can sort and filter on efficiently, like 'datetime_received'. (Default value = 'datetime_received')
+        :return: The QuerySet ordered by the field
+        """
+        if self.request_type != self.ITEM:
+            raise ValueError("seek() is only supported for item queries")
+        if self.calendar_view:
+            raise ValueError("seek() is not supported for calendar views")
+        try:
+            order_field = self._get_field_order(field_path)
+        except ValueError as e:
+            raise ValueError(f"{e.args[0]} in seek()")
+        new_qs = self._copy_self()
+        new_qs.order_fields = (order_field,)
+        new_qs._seek = True
+        return new_qs
+
     def reverse(self):
         """Reverses the ordering of the queryset."""
         if not self.order_fields:
@@ -502,6 +675,14 @@ class QuerySet(SearchableMixIn):
         new_qs._depth = depth
         return new_qs
 
+    def lazy(self):
+        """Return items that read their field values from the server response when the fields are first accessed,
+        instead of when the item is created. This saves CPU time when only some of the fetched fields are used.
+        """
+        new_qs = self._copy_self()
+        new_qs._lazy = True
+        return new_qs
+
     ###########################
     #
     # Methods that end chaining
@@ -516,7 +697,7 @@ class QuerySet(SearchableMixIn):
             account = self.folder_collection.account
             item_id = self._id_field.field.clean(kwargs["id"], version=account.version)
             changekey = self._changekey_field.field.clean(kwargs.get("changekey"), version=account.version)
-            items = list(account.fetch(ids=[(item_id, changekey)], only_fields=self.only_fields))
+            items = list(account.fetch(ids=[(item_id, changekey)], only_fields=self.only_fields, lazy=self._lazy))
         else:
             new_qs = self.filter(*args, **kwargs)
             items = list(new_qs.__iter__())
@@ -529,9 +710,19 @@ class QuerySet(SearchableMixIn):
     def count(self, page_size=1000):
         """Get the query count, with as little effort as possible
 
-        :param page_size: The number of items to fetch per request. We're only fetching the IDs, so keep it high.
-        (Default value = 1000)
+        :param page_size: The number of items to fetch per request, if we need to page through the IDs of all items.
+        We're only fetching the IDs, so keep it high. Ignored for item queries that are not calendar views, because the
+        server counts those without paging. (Default value = 1000)
         """
+        if self.request_type == self.ITEM and not self.calendar_view:
+            # The server can count the items for us with a single request. Calendar views don't support paging, and
+            # we don't read the number of matching people, so we need to page through the results for those.
+            counts = self.folder_collection.count_items(self.q, depth=self._depth)
+            # The offset applies to each folder, and 'max_items' to the total
+            count = sum(max(c - self.offset, 0) for c in counts)
+            if self.max_items:
+                count = min(count, self.max_items)
+            return count
         new_qs = self._copy_self()
         new_qs.only_fields = ()
         new_qs.order_fields = None
@@ -674,6 +865,59 @@ def _default_field_value(field):
     return field.default or ([field.value_cls()] if field.is_list else field.value_cls())
 
 
+def _external_sort(keyed_items, buffer_size):
+    """Sort (key, item) tuples in runs of 'buffer_size' items. If there is more than one run, each run is written to a
+    temporary file, and the runs are merged. Return an iterator over the sorted tuples. The sort is stable.
+    """
+    runs = []
+    run = []
+    for keyed_item in keyed_items:
+        run.append(keyed_item)
+        if len(run) >= buffer_size:
+            run.sort(key=itemgetter(0))
+            runs.append(_spill_run(run))
+            run = []
+    run.sort(key=itemgetter(0))
+    if not runs:
+        return iter(run)
+    log.debug("Merging %s sorted runs", len(runs) + 1)
+    return heapq.merge(*runs, iter(run), key=itemgetter(0))
+
+
+def _spill_run(run):
+    """Write a sorted run of (key, item) tuples to a temporary file, and return a generator that reads the run back.
+    Items are written without their account and folder, which may not be picklable, and are re-attached when read.
+    """
+    refs = {}  # Maps (id(account), id(folder)) to an index into ref_list
+    ref_list = []
+    f = tempfile.TemporaryFile()
+    for key, i in run:
+        ref_idx = None
+        if not isinstance(i, Exception):
+            ref = i.account, i.folder
+            ref_idx = refs.setdefault((id(ref[0]), id(ref[1])), len(ref_list))
+            if ref_idx == len(ref_list):
+                ref_list.append(ref)
+            i.account = i.folder = None
+        pickle.dump((key, ref_idx, i), f, protocol=pickle.HIGHEST_PROTOCOL)
+        if ref_idx is not None:
+            i.account, i.folder = ref_list[ref_idx]
+    f.seek(0)
+
+    def read_run():
+        with f:
+            while True:
+                try:
+                    key, ref_idx, i = pickle.load(f)  # nosec
+                except EOFError:
+                    return
+                if ref_idx is not None:
+                    i.account, i.folder = ref_list[ref_idx]
+                yield key, i
+
+    return read_run()
+
+
 def _rinse_item(i, fields_to_nullify):
     """Set fields in fields_to_nullify to None. Make sure to accept exceptions."""
     if isinstance(i, Exception):
@@ -1,12 +1,17 @@
 import abc
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
-from itertools import chain
+from copy import deepcopy
+from itertools import chain, islice
+from queue import Queue
+from threading import Event
 
 from oauthlib.oauth2 import TokenExpiredError
 
 from .. import errors
-from ..attachments import AttachmentId
+from ..attachments import AttachmentId, StreamedFileContent
 from ..credentials import IMPERSONATION, BaseOAuth2Credentials
 from ..errors import (
     ErrorBatchProcessingStopped,
@@ -62,8 +67,10 @@ from ..util import (
     chunkify,
     create_element,
     get_xml_attr,
+    iterparse_xml,
     ns_translation,
     post_ratelimited,
+    put_until_stopped,
     set_xml_value,
     to_xml,
     xml_to_str,
@@ -72,6 +79,9 @@ from ..version import SupportedVersionClassMixIn, Version
 
 log = logging.getLogger(__name__)
 
+# The elements in paging payloads that hold the paging offset
+PAGING_VIEW_TAGS = f"{{{MNS}}}IndexedPageItemView", f"{{{MNS}}}IndexedPageFolderView"
+
 
 class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
     """Base class for all EWS services."""
@@ -81,6 +91,9 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
     SERVICE_NAME = None  # The name of the SOAP service
     element_container_name = None  # The name of the XML element wrapping the collection of returned items
     returns_elements = True  # If False, the service does not return response elements, just the ResponseCode status
+    # If True, the response is parsed incrementally, and the elements in the element container are returned as soon as
+    # they have been parsed, instead of after the full response has been parsed into a tree.
+    incremental_parsing = False
     # Return exception instance instead of raising exceptions for the following errors when contained in an element
     ERRORS_TO_CATCH_IN_RESPONSE = (
         EWSWarning,
@@ -105,13 +118,22 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
     NO_VALID_SERVER_VERSIONS = ErrorInvalidServerVersion
 
     NS_MAP = {k: v for k, v in ns_translation.items() if k in ("s", "m", "t")}
+    # The max number of serialized SOAP envelopes to keep in the cache used by wrap()
+    ENVELOPE_CACHE_SIZE = 1000
+    _envelope_cache = {}
 
-    def __init__(self, protocol, chunk_size=None, timeout=None):
+    def __init__(self, protocol, chunk_size=None, timeout=None, concurrency=None):
         self.chunk_size = chunk_size or self.CHUNK_SIZE
         if not isinstance(self.chunk_size, int):
             raise InvalidTypeError("chunk_size", chunk_size, int)
         if self.chunk_size < 1:
             raise ValueError(f"'chunk_size' {self.chunk_size} must be a positive number")
+        # The max number of chunks to send concurrently in ._chunked_get_elements(). Default is to send one at a time.
+        self.concurrency = concurrency or 1
+        if not isinstance(self.concurrency, int):
+            raise InvalidTypeError("concurrency", concurrency, int)
+        if self.concurrency < 1:
+            raise ValueError(f"'concurrency' {self.concurrency} must be a positive number")
         if self.supported_from and protocol.version.build < self.supported_from:
             raise NotImplementedError(
                 f"Service {self.SERVICE_NAME!r} only supports server versions from {self.supported_from or '*'} to "
@@ -181,7 +203,10 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
         """Used mostly for testing, when we want to parse static XML data."""
         resp = DummyResponse(content=xml, streaming=self.streaming)
         _, body = self._get_soap_parts(response=resp)
-        return self._elems_to_objs(self._get_elements_in_response(response=self._get_soap_messages(body=body)))
+        res = self._get_soap_messages(body=body)
+        if not self.incremental_parsing:
+            res = self._get_elements_in_response(response=res)
+        return self._elems_to_objs(res)
 
     def wrap(self, content, api_version=None):
         """Generate the necessary boilerplate XML for a raw SOAP request. The XML is specific to the server version.
@@ -196,18 +221,49 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
         TimeZoneContent element on MSDN:
         https://docs.microsoft.com/en-us/exchange/client-developer/web-service-reference/timezonecontext
 
+        The envelope around the body only depends on the API version, the impersonated identity and the timezone, and
+        is identical for most requests. It is rendered once for each combination and cached as serialized bytes, so
+        only the body is serialized for each request.
+
         :param content:
         :param api_version:
         """
+        identity = self._account_to_impersonate
+        timezone = self._timezone
+        key = (
+            tuple(self.NS_MAP.items()),
+            api_version,
+            # Don't key on the identity itself. Identity.__eq__() compares hashes.
+            tuple(getattr(identity, f.name) for f in identity.FIELDS) if identity else None,
+            timezone.ms_id if timezone else None,
+        )
+        try:
+            envelope_start, body_start = self._envelope_cache[key]
+        except KeyError:
+            envelope_start, body_start = self._render_envelope(api_version, identity, timezone)
+            if len(self._envelope_cache) >= self.ENVELOPE_CACHE_SIZE:
+                self._envelope_cache.clear()
+            self._envelope_cache[key] = envelope_start, body_start
+        # Appending the content to a body that declares our namespaces removes redundant namespace declarations from
+        # the content, just like appending it to the full envelope would.
+        body = create_element("s:Body", nsmap=self.NS_MAP)
+        body.append(content)
+        data = xml_to_str(body, encoding=DEFAULT_ENCODING, xml_declaration=True)
+        if not data.startswith(body_start):
+            raise ValueError(f"Unexpected start of serialized body: {data[:len(body_start)]!r}")
+        return b"".join((envelope_start, data[len(body_start) :], b"</s:Envelope>"))
+
+    def _render_envelope(self, api_version, identity, timezone):
+        """Return the serialized envelope up to and including the start tag of the body, and the serialized start tag of
+        a standalone body element, as produced by xml_to_str().
+        """
         envelope = create_element("s:Envelope", nsmap=self.NS_MAP)
         header = create_element("s:Header")
         if api_version:
             request_server_version = create_element("t:RequestServerVersion", attrs=dict(Version=api_version))
             header.append(request_server_version)
-        identity = self._account_to_impersonate
         if identity:
             add_xml_child(header, "t:ExchangeImpersonation", identity)
-        timezone = self._timezone
         if timezone:
             timezone_context = create_element("t:TimeZoneContext")
             timezone_definition = create_element("t:TimeZoneDefinition", attrs=dict(Id=timezone.ms_id))
@@ -215,10 +271,13 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
             header.append(timezone_context)
         if len(header):
             envelope.append(header)
-        body = create_element("s:Body")
-        body.append(content)
-        envelope.append(body)
-        return xml_to_str(envelope, encoding=DEFAULT_ENCODING, xml_declaration=True)
+        envelope.append(create_element("s:Body"))
+        data = xml_to_str(envelope, encoding=DEFAULT_ENCODING, xml_declaration=True)
+        empty_body = b"<s:Body/></s:Envelope>"
+        if not data.endswith(empty_body):
+            raise ValueError(f"Unexpected end of serialized envelope: {data[-len(empty_body):]!r}")
+        body_start = xml_to_str(create_element("s:Body", nsmap=self.NS_MAP), encoding=DEFAULT_ENCODING)
+        return data[: -len(empty_body)] + b"<s:Body>", body_start[: -len(b"/>")] + b">"
 
     def _elems_to_objs(self, elems):
         """Takes a generator of XML elements and exceptions. Returns the equivalent Python objects (or exceptions)."""
@@ -262,6 +321,16 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
     def _timezone(self):
         return None
 
+    @property
+    def _session_key(self):
+        # Requests with the same key are queued together when waiting for a session. See BaseProtocol.get_session()
+        identity = self._account_to_impersonate
+        return identity.primary_smtp_address if identity else None
+
+    @property
+    def _session_priority(self):
+        return 0
+
     def _response_generator(self, payload):
         """Send the payload to the server, and return the response.
 
@@ -269,6 +338,9 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
         :return: the response, as XML objects
         """
         response = self._get_response_xml(payload=payload)
+        if self.incremental_parsing:
+            # The response messages have already been converted to elements while parsing
+            return response
         return self._get_elements_in_response(response=response)
 
     def _chunked_get_elements(self, payload_func, items, **kwargs):
@@ -282,9 +354,75 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
         """
         # If the input for a service is a QuerySet, it can be difficult to remove exceptions before now
         filtered_items = filter(lambda item: not isinstance(item, Exception), items)
-        for i, chunk in enumerate(chunkify(filtered_items, self.chunk_size), start=1):
+        chunks = self._chunkify(filtered_items)
+        # There's no point in having more concurrent requests than sessions in the pool
+        max_workers = min(self.concurrency, self.protocol._session_pool_maxsize) if self.concurrency > 1 else 1
+        if max_workers > 1:
+            yield from self._concurrent_chunked_get_elements(payload_func, chunks, max_workers, **kwargs)
+            return
+        for i, chunk in enumerate(chunks, start=1):
             log.debug("Processing chunk %s containing %s items", i, len(chunk))
-            yield from self._get_elements(payload=payload_func(chunk, **kwargs))
+            yield from self._get_chunk_elements(payload_func, chunk, **kwargs)
+
+    def _chunkify(self, items):
+        """Like util.chunkify(), but use the chunk size learned by the chunk size controller of our protocol. The size
+        is looked up again for every chunk, so chunks shrink and grow while we are iterating.
+        """
+        controller = self.protocol.get_chunk_size_controller(self.__class__)
+        items = iter(items)
+        while True:
+            chunk = list(islice(items, controller.chunk_size(self.chunk_size)))
+            if not chunk:
+                return
+            yield chunk
+
+    def _get_chunk_elements(self, payload_func, chunk, **kwargs):
+        """Like ._get_elements(), but if the request times out, split the chunk in two and retry each half. The chunk
+        size controller of our protocol is updated, so subsequent chunks are sent with a size that works.
+        """
+        controller = self.protocol.get_chunk_size_controller(self.__class__)
+        has_yielded = False
+        try:
+            for elem in self._get_elements(payload=payload_func(chunk, **kwargs)):
+                has_yielded = True
+                yield elem
+        except ErrorTimeoutExpired:
+            if has_yielded or len(chunk) <= 1:
+                # We can't split the chunk without returning duplicate elements, or we can't split it at all
+                raise
+        else:
+            controller.increase(len(chunk))
+            return
+        controller.decrease(len(chunk))
+        half = (len(chunk) + 1) // 2
+        log.debug("Request for chunk of %s items timed out. Retrying as chunks of %s items", len(chunk), half)
+        for sub_chunk in chunkify(chunk, half):
+            yield from self._get_chunk_elements(payload_func, sub_chunk, **kwargs)
+
+    def _concurrent_chunked_get_elements(self, payload_func, chunks, max_workers, **kwargs):
+        """Like ._chunked_get_elements(), but send up to 'max_workers' chunks concurrently. Elements are yielded in
+        the same order as the input, and we never have more than 'max_workers' chunks in flight, to limit memory usage
+        when the consumer is slower than the server.
+        """
+
+        def get_chunk(i, chunk):
+            log.debug("Processing chunk %s containing %s items", i, len(chunk))
+            return list(self._get_chunk_elements(payload_func, chunk, **kwargs))
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for i, chunk in enumerate(chunks, start=1):
+                    pending.append(executor.submit(get_chunk, i, chunk))
+                    if len(pending) >= max_workers:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                # We may get here because of an exception or because the consumer stopped iterating. Cancel chunks
+                # that haven't been sent yet.
+                for future in pending:
+                    future.cancel()
 
     def stop_streaming(self):
         if not self.streaming:
@@ -306,7 +444,8 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
                 # Create a generator over the response elements so exceptions in response elements are also raised
                 # here and can be handled.
                 yield from self._response_generator(payload=payload)
-                # TODO: Restore session pool size on succeeding request?
+                # Allow the session pool to grow back if it was lowered due to throttling
+                self.protocol.record_success()
                 return
             except TokenExpiredError:
                 # Retry immediately
@@ -330,8 +469,8 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
                 # connection count, if possible, and retry the request.
                 if self.protocol.session_pool_size <= 1:
                     # We're already as low as we can go. We can no longer use the session count to put less load
-                    # on the server. If this is a chunked request we could lower the chunk size, but we don't have a
-                    # way of doing that from this part of the code yet. Let the user handle this.
+                    # on the server. If this is a chunked request, ._get_chunk_elements() will retry with a lower
+                    # chunk size. Otherwise, let the user handle this.
                     raise e
                 self._handle_backoff(ErrorServerBusy(f"Reraised from {e.__class__.__name__}({e})", back_off=wait))
             except (ErrorTooManyObjectsOpened, ErrorInternalServerTransientError) as e:
@@ -351,15 +490,18 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
         if self.streaming:
             # Make sure to clean up lingering resources
             self.stop_streaming()
-        session = self.protocol.get_session()
+        session = self.protocol.get_session(key=self._session_key, priority=self._session_priority)
         r, session = post_ratelimited(
             protocol=self.protocol,
             session=session,
             url=self.protocol.service_endpoint,
             headers=self._extra_headers(),
-            data=self.wrap(
-                content=payload,
-                api_version=api_version,
+            # File attachment content may be streamed from disk while the request is sent
+            data=StreamedFileContent.request_body(
+                self.wrap(
+                    content=payload,
+                    api_version=api_version,
+                )
             ),
             stream=self.streaming,
             timeout=self.timeout or self.protocol.TIMEOUT,
@@ -439,6 +581,11 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
         :return:
         """
         log.debug("Got ErrorServerBusy (back off %s seconds)", e.back_off)
+        rate_limiter = self.protocol.config.rate_limiter
+        if rate_limiter and e.back_off:
+            # Stop sending requests in this scope until the back off period is over
+            mailbox = self._extra_headers().get("X-AnchorMailbox")
+            rate_limiter.back_off(protocol=self.protocol, mailbox=mailbox, seconds=e.back_off)
         # ErrorServerBusy is very often a symptom of sending too many requests. Scale back connections if possible.
         with suppress(SessionPoolMinSizeReached):
             self.protocol.decrease_poolsize()
@@ -482,6 +629,8 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
     @classmethod
     def _get_soap_parts(cls, response, **parse_opts):
         """Split the SOAP response into its headers and body elements."""
+        if cls.incremental_parsing:
+            return cls._get_soap_parts_incrementally(response=response)
         try:
             root = to_xml(response.iter_content())
         except ParseError as e:
@@ -495,8 +644,32 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
             raise MalformedResponseError("No Body element in SOAP response")
         return header, body
 
+    @classmethod
+    def _get_soap_parts_incrementally(cls, response):
+        """Like ._get_soap_parts(), but only parse the response until the start of the body element. Return the header
+        element and, in place of the body element, a generator of the remaining parser events.
+        """
+        events = iterparse_xml(response.iter_content())
+        header = None
+        try:
+            for event, elem in events:
+                if event == "end" and elem.tag == f"{{{SOAPNS}}}Header":
+                    header = elem
+                elif event == "start" and elem.tag == f"{{{SOAPNS}}}Body":
+                    break
+            else:
+                raise MalformedResponseError("No Body element in SOAP response")
+        except ParseError as e:
+            raise SOAPError(f"Bad SOAP response: {e}")
+        if header is None:
+            # This is normal when the response contains SOAP-level errors
+            log.debug("No header in XML response")
+        return header, events
+
     def _get_soap_messages(self, body, **parse_opts):
         """Return the elements in the response containing the response messages. Raises any SOAP exceptions."""
+        if self.incremental_parsing:
+            return self._get_soap_messages_incrementally(events=body)
         response = body.find(self._response_tag())
         if response is None:
             fault = body.find(f"{{{SOAPNS}}}Fault")
@@ -510,6 +683,73 @@ class EWSService(SupportedVersionClassMixIn, metaclass=abc.ABCMeta):
             return [response]
         return response_messages.findall(self._response_message_tag())
 
+    def _get_soap_messages_incrementally(self, events):
+        """Like ._get_soap_messages(), but consume the parser events following the start of the body element. SOAP
+        errors are raised right away. Return a generator of response elements, like ._get_elements_in_response().
+        """
+        try:
+            event, elem = next(events)
+            if event == "start" and elem.tag == f"{{{SOAPNS}}}Fault":
+                for event, fault in events:
+                    if event == "end" and fault is elem:
+                        break
+                self._raise_soap_errors(fault=elem)  # Will throw SOAPError or custom EWS error
+        except ParseError as e:
+            raise SOAPError(f"Bad SOAP response: {e}")
+        if event != "start" or elem.tag != self._response_tag():
+            body = elem if event == "end" else elem.getparent()
+            raise SOAPError(f"Unknown SOAP response (expected {self._response_tag()} or Fault): {xml_to_str(body)}")
+        return self._get_elements_in_response_incrementally(response=elem, events=events)
+
+    def _get_elements_in_response_incrementally(self, response, events):
+        """Like ._get_elements_in_response(), but consume the parser events following the start of the 'response'
+        element. The children of an element container are yielded as soon as they are complete, and are then detached
+        from the tree. Response messages are detached from the tree when we are done with them.
+        """
+        messages_tag, message_tag = self._response_messages_tag(), self._response_message_tag()
+        messages = message = container = None
+        is_handled = False  # True if the status of the current response message has been handled
+        try:
+            for event, elem in events:
+                if event == "start":
+                    if messages is None and elem.tag == messages_tag and elem.getparent() is response:
+                        messages = elem
+                    elif messages is not None and elem.tag == message_tag and elem.getparent() is messages:
+                        message, container, is_handled = elem, None, False
+                    elif (
+                        self.returns_elements
+                        and not is_handled
+                        and elem.tag == self.element_container_name
+                        and message is not None
+                        and elem.getparent() is message
+                    ):
+                        # The response status precedes the element container in the response message, so we can
+                        # decide now whether to return elements or an exception.
+                        container_or_exc = self._get_element_container(
+                            message=message, name=self.element_container_name
+                        )
+                        is_handled = True
+                        if isinstance(container_or_exc, (bool, Exception)):
+                            yield container_or_exc
+                        else:
+                            container = container_or_exc
+                    continue
+                if container is not None and elem.getparent() is container:
+                    container.remove(elem)
+                    yield elem
+                elif message is not None and elem is message:
+                    if not is_handled:
+                        yield from self._get_elements_in_response(response=[message])
+                    messages.remove(message)
+                    message = container = None
+                elif elem is response:
+                    if messages is None:
+                        # Result isn't delivered in a list of FooResponseMessages, but directly in the FooResponse
+                        yield from self._get_elements_in_response(response=[response])
+                    return
+        except ParseError as e:
+            raise SOAPError(f"Bad SOAP response: {e}")
+
     @classmethod
     def _raise_soap_errors(cls, fault):
         """Parse error messages contained in SOAP headers and raise as exceptions defined in this package."""
@@ -760,6 +1000,14 @@ class EWSAccountService(EWSService, metaclass=abc.ABCMeta):
     def _timezone(self):
         return self.account.default_timezone
 
+    @property
+    def _session_key(self):
+        return self.account.primary_smtp_address
+
+    @property
+    def _session_priority(self):
+        return self.account.session_priority
+
 
 class EWSPagingService(EWSAccountService):
     PAGE_SIZE = 100  # A default page size for all paging services. This is the number of items we request per page
@@ -783,13 +1031,53 @@ class EWSPagingService(EWSAccountService):
         response = self._get_response_xml(payload=payload)
         return (self._get_page(message) for message in response)
 
+    def _total_item_counts(self, payload_func, folders, **kwargs):
+        """Request the first page of each folder with room for a single item, and return the total number of items in
+        the view of each folder, or an exception instance. This is much cheaper than paging through all items.
+        """
+        kwargs.update(folders=folders, page_size=1, offset=0)
+        pages = self._get_pages(payload_func(**kwargs), len(folders))
+        return [self._get_item_count(page) for page, _ in pages]
+
+    def _pages_concurrently(self, folders):
+        """Return True if we should page each folder on its own cursor, concurrently."""
+        return self.concurrency > 1 and len(folders) > 1
+
+    def _max_paging_workers(self, folders):
+        """Return the number of folders that we can page concurrently. There's no point in having more concurrent
+        requests than sessions in the pool.
+        """
+        return min(self.concurrency, self.protocol._session_pool_maxsize, len(folders))
+
     def _paged_call(self, payload_func, max_items, folders, **kwargs):
         """Call a service that supports paging requests. Return a generator over all response items. Keeps track of
         all paging-related counters.
         """
+        folders = list(folders)
+        if self._pages_concurrently(folders):
+            # Elements from different folders are interleaved
+            total_item_count = 0
+            for _, elem in self._concurrent_paged_call(
+                payload_func, max_items, folders, buffer_size=self.concurrency * self.page_size, **kwargs
+            ):
+                if elem is None:
+                    continue
+                yield elem
+                if isinstance(elem, Exception):
+                    continue
+                total_item_count += 1
+                if max_items and total_item_count >= max_items:
+                    log.debug("'max_items' count reached (concurrent)")
+                    return
+            return
+        yield from self._lockstep_paged_call(payload_func, max_items, folders, **kwargs)
+
+    def _lockstep_paged_call(self, payload_func, max_items, folders, **kwargs):
+        """Like ._paged_call(), but always page all folders in the same request, with a common offset."""
         paging_infos = {f: dict(item_count=0, next_offset=None) for f in folders}
         common_next_offset = kwargs["offset"]
         total_item_count = 0
+        payload, payload_folders = None, None
         while True:
             if not paging_infos:
                 # Paging is done for all folders
@@ -797,7 +1085,15 @@ class EWSPagingService(EWSAccountService):
             log.debug("Getting page at offset %s (max_items %s)", common_next_offset, max_items)
             kwargs["offset"] = common_next_offset
             kwargs["folders"] = paging_infos.keys()  # Only request the paging of the remaining folders.
-            pages = self._get_pages(payload_func, kwargs, len(paging_infos))
+            # Only the offset changes between pages, as long as no folders are done paging. Build the payload once and
+            # patch the offset, instead of rebuilding the shape, restriction etc. for every page.
+            if (
+                payload is None
+                or len(paging_infos) != payload_folders
+                or not self._set_offset(payload, kwargs["offset"])
+            ):
+                payload, payload_folders = payload_func(**kwargs), len(paging_infos)
+            pages = self._get_pages(payload, len(paging_infos))
             for (page, next_offset), (f, paging_info) in zip(pages, list(paging_infos.items())):
                 paging_info["next_offset"] = next_offset
                 if isinstance(page, Exception):
@@ -842,6 +1138,45 @@ class EWSPagingService(EWSAccountService):
                 # Paging is done for all folders
                 break
 
+    def _concurrent_paged_call(self, payload_func, max_items, folders, buffer_size, **kwargs):
+        """Like ._paged_call(), but page each folder on its own cursor instead of paging all folders with a common
+        offset, so a large folder doesn't hold back the small ones. Up to 'self.concurrency' folders are paged
+        concurrently, limited by the size of the session pool.
+
+        Yield (folder index, element) tuples as the elements arrive, and a (folder index, None) tuple when paging of a
+        folder is done. Elements from each folder arrive in order. 'buffer_size' is the max number of elements that may
+        wait to be consumed.
+        """
+        max_workers = self._max_paging_workers(folders)
+        results = Queue(maxsize=buffer_size)
+        stop = Event()
+
+        def page_folder(i, folder):
+            try:
+                for elem in self._paged_call(payload_func, max_items, [folder], **kwargs):
+                    if not put_until_stopped(results, (i, elem), stop):
+                        return
+            finally:
+                put_until_stopped(results, (i, None), stop)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(page_folder, i, f) for i, f in enumerate(folders)]
+            try:
+                remaining = len(futures)
+                while remaining:
+                    i, elem = results.get()
+                    if elem is None:
+                        remaining -= 1
+                        # Re-raise errors that ended paging of this folder
+                        futures[i].result()
+                    yield i, elem
+            finally:
+                # We may get here because of an exception or because the consumer stopped iterating. Stop the folders
+                # that are being paged, and cancel the ones that haven't started yet.
+                stop.set()
+                for future in futures:
+                    future.cancel()
+
     @staticmethod
     def _get_paging_values(elem):
         """Read paging information from the paging container element."""
@@ -876,6 +1211,16 @@ class EWSPagingService(EWSAccountService):
             paging_elem = None
         return paging_elem, next_offset
 
+    @staticmethod
+    def _get_item_count(page):
+        """Get the total number of items in the view from a page returned by ._get_page(), or the exception instance."""
+        if page is None:
+            # ._get_page() doesn't return empty views
+            return 0
+        if isinstance(page, Exception):
+            return page
+        return int(page.get("TotalItemsInView"))
+
     def _get_elems_from_page(self, elem, max_items, total_item_count):
         container = elem.find(self.element_container_name)
         if container is None:
@@ -889,11 +1234,18 @@ class EWSPagingService(EWSAccountService):
                 break
             yield e
 
-    def _get_pages(self, payload_func, kwargs, expected_message_count):
+    @staticmethod
+    def _set_offset(payload, offset):
+        """Set the offset of the paging view in an existing payload. Return False if the payload has no paging view."""
+        for view in payload.iterchildren(*PAGING_VIEW_TAGS):
+            view.set("Offset", str(offset))
+            return True
+        return False
+
+    def _get_pages(self, payload, expected_message_count):
         """Request a page, or a list of pages if multiple collections are pages in a single request. Return each
         page.
         """
-        payload = payload_func(**kwargs)
         page_elems = list(self._get_elements(payload=payload))
         if len(page_elems) != expected_message_count:
             raise MalformedResponseError(
@@ -935,10 +1287,29 @@ def to_item_id(item, item_cls):
     return item_cls(item.id, item.changekey)
 
 
+# Expanded and sorted AdditionalProperties elements, keyed by server build and field paths. See shape_element()
+_ADDITIONAL_PROPERTIES_CACHE_SIZE = 1000
+_additional_properties_cache = {}
+
+
 def shape_element(tag, shape, additional_fields, version):
     shape_elem = create_element(tag)
     add_xml_child(shape_elem, "t:BaseShape", shape)
     if additional_fields:
+        shape_elem.append(
+            deepcopy(_additional_properties_element(additional_fields=additional_fields, version=version))
+        )
+    return shape_elem
+
+
+def _additional_properties_element(additional_fields, version):
+    # Expanding and sorting the field paths is expensive, and most queries use the same fields over and over again.
+    # Don't key on FieldPath objects. They compare by hash, and e.g. extended property fields are hashed by name only.
+    # The cache entry holds a reference to the field paths, so the ids in the key stay unique.
+    key = version.build, frozenset((id(f.field), f.label, id(f.subfield)) for f in additional_fields)
+    try:
+        _, additional_properties = _additional_properties_cache[key]
+    except KeyError:
         additional_properties = create_element("t:AdditionalProperties")
         expanded_fields = chain(*(f.expand(version=version) for f in additional_fields))
         # 'path' is insufficient to consistently sort additional properties. For example, we have both
@@ -949,8 +1320,10 @@ def shape_element(tag, shape, additional_fields, version):
             sorted(expanded_fields, key=lambda f: (getattr(f.field, "field_uri", ""), f.path)),
             version=version,
         )
-        shape_elem.append(additional_properties)
-    return shape_elem
+        if len(_additional_properties_cache) >= _ADDITIONAL_PROPERTIES_CACHE_SIZE:
+            _additional_properties_cache.clear()
+        _additional_properties_cache[key] = tuple(additional_fields), additional_properties
+    return additional_properties
 
 
 def _ids_element(items, item_cls, version, tag):
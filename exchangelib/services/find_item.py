@@ -1,7 +1,11 @@
+import heapq
+from operator import itemgetter
+
 from ..errors import InvalidEnumValue
+from ..fields import SortKey
 from ..folders.base import BaseFolder
 from ..items import ID_ONLY, ITEM_TRAVERSAL_CHOICES, SHAPE_CHOICES, Item
-from ..util import MNS, TNS, create_element, set_xml_value
+from ..util import MNS, TNS, create_element, prefetch, set_xml_value
 from .common import EWSPagingService, folder_ids_element, shape_element
 
 
@@ -17,6 +21,8 @@ class FindItem(EWSPagingService):
         # A hack to communicate parsing args to _elems_to_objs()
         self.additional_fields = None
         self.shape = None
+        self.lazy = False
+        self.projection = None
 
     def call(
         self,
@@ -30,6 +36,8 @@ class FindItem(EWSPagingService):
         calendar_view,
         max_items,
         offset,
+        lazy=False,
+        projection=None,
     ):
         """Find items in an account.
 
@@ -43,6 +51,9 @@ class FindItem(EWSPagingService):
         :param calendar_view: If set, returns recurring calendar items unfolded
         :param max_items: the max number of items to return
         :param offset: the offset relative to the first item in the item collection. Usually 0.
+        :param lazy: If True, field values are read when they are first accessed
+        :param projection: If set, a list of FieldPath objects. Return a tuple of the values of these field paths
+          instead of an item
 
         :return: XML elements for the matching items
         """
@@ -52,29 +63,102 @@ class FindItem(EWSPagingService):
             raise InvalidEnumValue("depth", depth, ITEM_TRAVERSAL_CHOICES)
         self.additional_fields = additional_fields
         self.shape = shape
-        return self._elems_to_objs(
-            self._paged_call(
-                payload_func=self.get_payload,
-                max_items=max_items,
-                folders=folders,
-                **dict(
-                    additional_fields=additional_fields,
-                    restriction=restriction,
-                    order_fields=order_fields,
-                    query_string=query_string,
-                    shape=shape,
-                    depth=depth,
-                    calendar_view=calendar_view,
-                    page_size=self.page_size,
-                    offset=offset,
-                ),
+        self.lazy = lazy
+        self.projection = projection
+        kwargs = dict(
+            additional_fields=additional_fields,
+            restriction=restriction,
+            order_fields=order_fields,
+            query_string=query_string,
+            shape=shape,
+            depth=depth,
+            calendar_view=calendar_view,
+            page_size=self.page_size,
+            offset=offset,
+        )
+        if order_fields and self._pages_concurrently(folders):
+            if self._max_paging_workers(folders) >= len(folders):
+                return self._merge_sorted(max_items=max_items, folders=folders, **kwargs)
+            # Merging needs items from all folders at once, and concurrent paging would interleave the items from
+            # different folders in arrival order. Page all folders in lock-step instead, like with no concurrency.
+            return self._elems_to_objs(
+                self._lockstep_paged_call(payload_func=self.get_payload, max_items=max_items, folders=folders, **kwargs)
             )
+        return self._elems_to_objs(
+            self._paged_call(payload_func=self.get_payload, max_items=max_items, folders=folders, **kwargs)
+        )
+
+    def _merge_sorted(self, max_items, folders, **kwargs):
+        """Page each folder on its own cursor, and merge the items of each folder, which are sorted by the server, into
+        a single sorted stream. We need the values of the order fields for that, so we always request these fields and
+        create items, and convert the items to the requested format afterwards. Each folder is paged in its own thread,
+        and at most one page of items per folder waits to be merged.
+        """
+        order_fields = kwargs["order_fields"]
+        ids_only = self.shape == ID_ONLY and self.additional_fields is None
+        projection, lazy = self.projection, self.lazy
+        kwargs["additional_fields"] = set(kwargs["additional_fields"] or ()) | {f.field_path for f in order_fields}
+
+        def folder_items(folder):
+            # Yield (sort key, item) tuples. Exceptions sort first, so they are passed on as soon as they arrive.
+            for elem in self._paged_call(self.get_payload, max_items, [folder], **kwargs):
+                if isinstance(elem, Exception):
+                    yield (0,), elem
+                    continue
+                item = BaseFolder.item_model_from_tag(elem.tag).from_xml(elem=elem, account=self.account, lazy=lazy)
+                yield (1, SortKey.from_item(item, order_fields)), item
+
+        streams = [prefetch(folder_items(f), size=self.page_size) for f in folders]
+        try:
+            total_item_count = 0
+            for _, item in heapq.merge(*streams, key=itemgetter(0)):
+                if isinstance(item, Exception):
+                    yield item
+                    continue
+                if ids_only:
+                    yield item.id, item.changekey
+                elif projection is not None:
+                    yield item._get_values(projection)
+                else:
+                    yield item
+                total_item_count += 1
+                if max_items and total_item_count >= max_items:
+                    return
+        finally:
+            for stream in streams:
+                stream.close()
+
+    def count(self, folders, restriction, query_string, depth):
+        """Count the items in each folder without fetching them.
+
+        :param folders: the folders to act on
+        :param restriction: a Restriction object for
+        :param query_string: a QueryString object
+        :param depth: How deep in the folder structure to search for items
+
+        :return: the number of matching items in each folder, or an exception instance
+        """
+        if depth not in ITEM_TRAVERSAL_CHOICES:
+            raise InvalidEnumValue("depth", depth, ITEM_TRAVERSAL_CHOICES)
+        return self._total_item_counts(
+            payload_func=self.get_payload,
+            folders=folders,
+            additional_fields=None,
+            restriction=restriction,
+            order_fields=None,
+            query_string=query_string,
+            shape=ID_ONLY,
+            depth=depth,
+            calendar_view=None,
         )
 
     def _elem_to_obj(self, elem):
         if self.shape == ID_ONLY and self.additional_fields is None:
             return Item.id_from_xml(elem)
-        return BaseFolder.item_model_from_tag(elem.tag).from_xml(elem=elem, account=self.account)
+        item_model = BaseFolder.item_model_from_tag(elem.tag)
+        if self.projection is not None:
+            return item_model.values_from_xml(elem=elem, account=self.account, field_paths=self.projection)
+        return item_model.from_xml(elem=elem, account=self.account, lazy=self.lazy)
 
     def get_payload(
         self,
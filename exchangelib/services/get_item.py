@@ -8,16 +8,28 @@ class GetItem(EWSAccountService):
 
     SERVICE_NAME = "GetItem"
     element_container_name = f"{{{MNS}}}Items"
+    incremental_parsing = True
 
-    def call(self, items, additional_fields, shape):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # A hack to communicate parsing args to _elems_to_objs()
+        self.lazy = False
+        self.projection = None
+
+    def call(self, items, additional_fields, shape, lazy=False, projection=None):
         """Return all items in an account that correspond to a list of ID's, in stable order.
 
         :param items: a list of (id, changekey) tuples or Item objects
         :param additional_fields: the extra fields that should be returned with the item, as FieldPath objects
         :param shape: The shape of returned objects
+        :param lazy: If True, field values are read when they are first accessed
+        :param projection: If set, a list of FieldPath objects. Return a tuple of the values of these field paths
+          instead of an item
 
         :return: XML elements for the items, in stable order
         """
+        self.lazy = lazy
+        self.projection = projection
         return self._elems_to_objs(
             self._chunked_get_elements(
                 self.get_payload,
@@ -28,7 +40,10 @@ class GetItem(EWSAccountService):
         )
 
     def _elem_to_obj(self, elem):
-        return BaseFolder.item_model_from_tag(elem.tag).from_xml(elem=elem, account=self.account)
+        item_model = BaseFolder.item_model_from_tag(elem.tag)
+        if self.projection is not None:
+            return item_model.values_from_xml(elem=elem, account=self.account, field_paths=self.projection)
+        return item_model.from_xml(elem=elem, account=self.account, lazy=self.lazy)
 
     def get_payload(self, items, additional_fields, shape):
         payload = create_element(f"m:{self.SERVICE_NAME}")
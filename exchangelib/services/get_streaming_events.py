@@ -57,7 +57,9 @@ class GetStreamingEvents(EWSAccountService):
         # looking for complete XML documents. When we have a full document, we want to parse it as if it was a normal
         # XML response.
         r = body
-        for i, doc in enumerate(DocumentYielder(r.iter_content()), start=1):
+        # Read data as it arrives instead of one byte at a time. EWS sends the notifications with chunked transfer
+        # encoding, so each chunk is returned as soon as it has been received.
+        for i, doc in enumerate(DocumentYielder(r.iter_content(chunk_size=None)), start=1):
             xml_log.debug("Response XML (docs counter: %(i)s): %(xml_response)s", dict(i=i, xml_response=doc))
             response = DummyResponse(content=doc)
             try:
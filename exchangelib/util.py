@@ -4,14 +4,18 @@ import itertools
 import logging
 import re
 import socket
+import sys
 import time
+import weakref
 import xml.sax.handler  # nosec
 from base64 import b64decode, b64encode
+from binascii import a2b_base64
 from codecs import BOM_UTF8
 from contextlib import suppress
 from decimal import Decimal
 from functools import wraps
-from threading import get_ident
+from queue import Full, Queue
+from threading import Event, Lock, Thread, get_ident
 from urllib.parse import urlparse
 
 import isodate
@@ -25,7 +29,13 @@ from pygments.formatters.terminal import TerminalFormatter
 from pygments.lexers.html import XmlLexer
 from requests_oauthlib import OAuth2Session
 
-from .errors import ErrorInternalServerTransientError, ErrorTimeoutExpired, RelativeRedirect, TransportError
+from .errors import (
+    ErrorInternalServerTransientError,
+    ErrorTimeoutExpired,
+    InvalidTypeError,
+    RelativeRedirect,
+    TransportError,
+)
 
 log = logging.getLogger(__name__)
 xml_log = logging.getLogger(f"{__name__}.xml")
@@ -155,6 +165,68 @@ def peek(iterable):
     return False, itertools.chain([first], iterable)
 
 
+def put_until_stopped(queue, value, stop):
+    """Put a value on a bounded queue. Don't block forever on a full queue if the consumer has stopped iterating.
+
+    :param queue: A Queue instance
+    :param value: The value to put on the queue
+    :param stop: An Event that the consumer sets when it stops consuming
+    :return: True if the value was put on the queue, False if the consumer has stopped
+    """
+    while not stop.is_set():
+        try:
+            queue.put(value, timeout=0.1)
+            return True
+        except Full:
+            continue
+    return False
+
+
+_PREFETCH_DONE = object()
+
+
+def prefetch(iterable, size):
+    """Consume an iterable in a background thread, and return a generator over its values. The background thread
+    starts right away, and up to ``size`` values are fetched ahead of the consumer. Exceptions raised by the iterable
+    are re-raised to the consumer. Exception instances that are yielded by the iterable are passed on unaltered.
+
+    :param iterable:
+    :param size: The max number of values to fetch ahead
+    :return:
+    """
+    values = Queue(maxsize=size)
+    stop = Event()
+
+    def produce():
+        try:
+            for value in iterable:
+                if not put_until_stopped(values, (value, None), stop):
+                    return
+        except Exception as e:
+            put_until_stopped(values, (_PREFETCH_DONE, e), stop)
+            return
+        put_until_stopped(values, (_PREFETCH_DONE, None), stop)
+
+    def consume():
+        try:
+            while True:
+                value, e = values.get()
+                if value is _PREFETCH_DONE:
+                    if e is not None:
+                        raise e
+                    return
+                yield value
+        finally:
+            # We may get here because of an exception or because the consumer stopped iterating
+            stop.set()
+
+    Thread(target=produce, name="exchangelib-prefetch", daemon=True).start()
+    consumer = consume()
+    # Also stop the producer if the generator is discarded before it was started
+    weakref.finalize(consumer, stop.set)
+    return consumer
+
+
 def xml_to_str(tree, encoding=None, xml_declaration=False):
     """Serialize an XML tree. Returns unicode if 'encoding' is None. Otherwise, we return encoded 'bytes'.
 
@@ -291,6 +363,82 @@ def add_xml_child(tree, name, value):
     tree.append(set_xml_value(elem=create_element(name), value=value))
 
 
+class InternPool:
+    """A pool of the string values that repeat across many items in large responses, e.g. email addresses, display
+    names, categories, item classes and parent folder IDs. Decoded values are replaced with an equal string from the
+    pool, so each distinct value is held in memory only once. Assign an instance to 'Account.intern_pool' to enable
+    it. Instances can be shared between accounts.
+
+    Only immutable values are pooled. Objects like Mailbox are still created per item, so changing a field value on one
+    item never affects another item. Only the strings they hold are shared.
+
+    'max_size' is the max number of distinct values in the pool. When the pool is full, new values are not pooled.
+    """
+
+    def __init__(self, max_size=100000):
+        if not isinstance(max_size, int):
+            raise InvalidTypeError("max_size", max_size, int)
+        if max_size < 1:
+            raise ValueError(f"'max_size' {max_size} must be a positive number")
+        self.max_size = max_size
+        self._values = {}
+        self._hits = 0
+        self._bytes_saved = 0
+        self._lock = Lock()
+
+    def __getstate__(self):
+        # Locks cannot be pickled
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        # Restore the lock
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def intern(self, value):
+        """Return the pooled string equal to 'value'. Values that are not exactly of type str are returned as-is."""
+        if type(value) is not str:
+            # Don't let e.g. a Body value stand in for an equal str, or vice versa
+            return value
+        with self._lock:
+            pooled = self._values.get(value)
+            if pooled is None:
+                if len(self._values) < self.max_size:
+                    self._values[value] = value
+                return value
+            if pooled is not value:
+                self._hits += 1
+                self._bytes_saved += sys.getsizeof(value)
+            return pooled
+
+    def clear(self):
+        """Empty the pool and reset the statistics."""
+        with self._lock:
+            self._values.clear()
+            self._hits = 0
+            self._bytes_saved = 0
+
+    def stats(self):
+        """Return a dict with the number of distinct values in the pool, the number of decoded values that were
+        replaced with a pooled value, and an estimate of the memory saved by that, in bytes.
+        """
+        with self._lock:
+            return dict(size=len(self._values), hits=self._hits, bytes_saved=self._bytes_saved)
+
+
+def intern_value(value, account):
+    """Return 'value' from the intern pool of the account, if the account has one."""
+    pool = getattr(account, "intern_pool", None)
+    if pool is None:
+        return value
+    return pool.intern(value)
+
+
 class StreamingContentHandler(xml.sax.handler.ContentHandler):
     """A SAX content handler that returns a character data for a single element back to the parser. The parser must have
     a 'buffer' attribute we can append data to.
@@ -359,18 +507,20 @@ class StreamingBase64Parser(DefusedExpatParser):
         self.buffer = []
         self.element_found = False
         buffer = file.read(self._bufsize)
-        collected_data = []
+        # The data received until the element is found. We need it for error handling if the element is never found.
+        collected_data = bytearray()
         while buffer:
             if not self.element_found:
                 collected_data += buffer
+            elif collected_data:
+                collected_data.clear()
             yield from self.feed(buffer)
             buffer = file.read(self._bufsize)
         # Any remaining data in self.buffer should be padding chars now
         self.buffer = None
         self.close()
         if not self.element_found:
-            data = bytes(collected_data)
-            raise ElementNotFound("The element to be streamed from was not found", data=bytes(data))
+            raise ElementNotFound("The element to be streamed from was not found", data=bytes(collected_data))
 
     def feed(self, data, isFinal=0):
         """Yield the current content of the character buffer."""
@@ -378,18 +528,18 @@ class StreamingBase64Parser(DefusedExpatParser):
         return self._decode_buffer()
 
     def _decode_buffer(self):
-        remainder = ""
-        for data in self.buffer:
-            available = len(remainder) + len(data)
-            overflow = available % 4  # Make sure we always decode a multiple of 4
-            if remainder:
-                data = remainder + data
-                remainder = ""
-            if overflow:
-                remainder, data = data[-overflow:], data[:-overflow]
-            if data:
-                yield b64decode(data)
-        self.buffer = [remainder] if remainder else []
+        # The buffer holds the characters received since the last call, which is at most one read of the input. Decode
+        # them in one go. Base64 can only be decoded in multiples of 4 characters, so keep any remainder for the next
+        # call.
+        data = "".join(self.buffer)
+        overflow = len(data) % 4
+        if overflow:
+            data, remainder = data[:-overflow], data[-overflow:]
+            self.buffer = [remainder]
+        else:
+            self.buffer = []
+        if data:
+            yield a2b_base64(data)
 
 
 _forgiving_parser = lxml.etree.XMLParser(
@@ -450,27 +600,19 @@ class BytesGeneratorIO(io.RawIOBase):
 
 
 class DocumentYielder:
-    """Look for XML documents in a streaming HTTP response and yield them as they become available from the stream."""
+    """Look for XML documents in a streaming HTTP response and yield them as they become available from the stream.
+
+    The content iterator may return chunks of any size. Chunks are collected in a buffer, and tags are located with
+    bytes.find(), so the cost is per tag instead of per byte. Incomplete tags and documents are kept in the buffer until
+    the next chunk arrives.
+    """
+
+    XML_DECLARATION = b"<?xml version='1.0' encoding='utf-8'?>\n"
 
     def __init__(self, content_iterator, document_tag="Envelope"):
         self._iterator = content_iterator
         self._document_tag = document_tag.encode()
 
-    def _get_tag(self):
-        """Iterate over the bytes until we have a full tag in the buffer. If there's a '>' in an attr value, then we'll
-        exit on that, but it's OK because we just need the plain tag name later.
-        """
-        tag_buffer = [b"<"]
-        while True:
-            try:
-                c = next(self._iterator)
-            except StopIteration:
-                break
-            tag_buffer.append(c)
-            if c == b">":
-                break
-        return b"".join(tag_buffer)
-
     @staticmethod
     def _normalize_tag(tag):
         """Returns the plain tag name given a range of tag formats:
@@ -485,29 +627,39 @@ class DocumentYielder:
         """Consumes the content iterator, looking for start and end tags. Returns each document when we have fully
         collected it.
         """
-        doc_started = False
-        buffer = []
-        try:
+        buffer = bytearray()
+        pos = 0  # The position in the buffer to continue searching for tags from
+        doc_start = None  # The position of the start tag of the current document, if we are inside a document
+        for chunk in self._iterator:
+            buffer += chunk
             while True:
-                c = next(self._iterator)
-                if not doc_started and c == b"<":
-                    tag = self._get_tag()
-                    if self._normalize_tag(tag) == self._document_tag:
-                        # Start of document. Collect bytes from this point
-                        buffer.append(tag)
-                        doc_started = True
-                elif doc_started and c == b"<":
-                    tag = self._get_tag()
-                    buffer.append(tag)
-                    if self._normalize_tag(tag) == self._document_tag:
-                        # End of document. Yield a valid document and reset the buffer
-                        yield b"<?xml version='1.0' encoding='utf-8'?>\n" + b"".join(buffer)
-                        doc_started = False
-                        buffer = []
-                elif doc_started:
-                    buffer.append(c)
-        except StopIteration:
-            return
+                tag_start = buffer.find(b"<", pos)
+                if tag_start == -1:
+                    pos = len(buffer)
+                    break
+                # If there's a '>' in an attr value, then we'll stop at that, but it's OK because we just need the plain
+                # tag name.
+                tag_end = buffer.find(b">", tag_start + 1)
+                if tag_end == -1:
+                    # Incomplete tag. Wait for more data.
+                    pos = tag_start
+                    break
+                pos = tag_end + 1
+                if self._normalize_tag(bytes(buffer[tag_start:pos])) != self._document_tag:
+                    continue
+                if doc_start is None:
+                    # Start of document
+                    doc_start = tag_start
+                    continue
+                # End of document. Yield a valid document and remove it from the buffer
+                yield self.XML_DECLARATION + bytes(buffer[doc_start:pos])
+                doc_start = None
+                del buffer[:pos]
+                pos = 0
+            if doc_start is None:
+                # Outside a document. Throw away everything that is not part of an incomplete tag.
+                del buffer[:pos]
+                pos = 0
 
 
 def to_xml(bytes_content):
@@ -550,6 +702,30 @@ def to_xml(bytes_content):
     return res
 
 
+def iterparse_xml(bytes_content, events=("start", "end")):
+    """Like to_xml(), but return a generator of (event, element) tuples while the XML document is being parsed, instead
+    of the full tree. An element is only complete when its 'end' event has been yielded. Consumers can detach elements
+    from the tree when they are done with them, to keep memory usage down.
+    """
+    if isinstance(bytes_content, bytes):
+        stream = io.BytesIO(bytes_content)
+    else:
+        stream = BytesGeneratorIO(bytes_content)
+    found_root = False
+    try:
+        for event, elem in lxml.etree.iterparse(  # nosec
+            stream, events=events, resolve_entities=False, recover=True, huge_tree=True
+        ):
+            found_root = True
+            yield event, elem
+    except lxml.etree.ParseError as e:
+        if hasattr(e, "position"):
+            e.lineno, e.offset = e.position
+        raise ParseError(str(e), "<not from file>", e.lineno, e.offset)
+    if not found_root:
+        raise ParseError("No root element found", "<not from file>", -1, 0)
+
+
 def is_xml(text):
     """Lightweight test if response is an XML doc. It's better to be fast than correct here.
 
@@ -664,7 +840,7 @@ class DummyResponse:
         self.reason = ""
         self.history = history
 
-    def iter_content(self):
+    def iter_content(self, chunk_size=1):
         return self.content
 
     def close(self):
@@ -819,6 +995,15 @@ Response XML: %(xml_response)s"""
     if isinstance(session, OAuth2Session):
         # Fix token refreshing bug. Reported as https://github.com/requests/requests-oauthlib/issues/498
         kwargs.update(session.auto_refresh_kwargs)
+    rate_limiter = protocol.config.rate_limiter
+    if rate_limiter:
+        # Wait until the rate limiter allows us to send the request
+        bucket = rate_limiter.get_bucket(protocol=protocol, mailbox=(headers or {}).get("X-AnchorMailbox"))
+        rate_limit_secs = bucket.acquire()
+        if rate_limit_secs:
+            log.debug("Session %s thread %s: Rate limiter waited %ss", session.session_id, thread_id, rate_limit_secs)
+    else:
+        bucket = None
     d_start = time.monotonic()
     try:
         r = session.post(**kwargs)
@@ -846,6 +1031,9 @@ Response XML: %(xml_response)s"""
         log.error("%s: %s\n%s\n%s", e.__class__.__name__, str(e), log_msg % log_vals, xml_log_msg % xml_log_vals)
         protocol.retire_session(session)
         raise
+    finally:
+        if bucket:
+            bucket.release()
     log_vals.update(
         session_id=session.session_id,
         url=r.url,
@@ -71,7 +71,7 @@ class Build:
         return self.__cmp__(other) == 0
 
     def __hash__(self):
-        return hash(repr(self))
+        return hash((self.major_version, self.minor_version, self.major_build, self.minor_build))
 
     def __ne__(self, other):
         return self.__cmp__(other) != 0
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+# Measures the time it takes to convert the items in a canned GetItem response to Python objects, with the compiled
+# per-class field decoders and with the field-by-field lookup they replace. Needs no server.
+import argparse
+import time
+
+from exchangelib.items import Message
+from exchangelib.properties import EWSElement
+from exchangelib.util import MNS, TNS, to_xml
+
+MESSAGE_XML = """\
+<t:Message>
+  <t:ItemId Id="AAMkAGE{i:08d}" ChangeKey="CQAAABYAAAB"/>
+  <t:ParentFolderId Id="AAMkAGEwMTM2ZWJj" ChangeKey="AQAAAA=="/>
+  <t:ItemClass>IPM.Note</t:ItemClass>
+  <t:Subject>Quarterly report {i}</t:Subject>
+  <t:Sensitivity>Normal</t:Sensitivity>
+  <t:Body BodyType="Text">Hi all, please find the quarterly report for item {i} attached.</t:Body>
+  <t:DateTimeReceived>2022-03-01T09:15:{s:02d}Z</t:DateTimeReceived>
+  <t:Size>{size}</t:Size>
+  <t:Categories><t:String>Reports</t:String><t:String>Finance</t:String></t:Categories>
+  <t:Importance>Normal</t:Importance>
+  <t:IsSubmitted>false</t:IsSubmitted>
+  <t:IsDraft>false</t:IsDraft>
+  <t:IsFromMe>false</t:IsFromMe>
+  <t:IsResend>false</t:IsResend>
+  <t:IsUnmodified>true</t:IsUnmodified>
+  <t:DateTimeSent>2022-03-01T09:15:{s:02d}Z</t:DateTimeSent>
+  <t:DateTimeCreated>2022-03-01T09:15:{s:02d}Z</t:DateTimeCreated>
+  <t:ReminderDueBy>2022-03-02T09:00:00Z</t:ReminderDueBy>
+  <t:ReminderIsSet>false</t:ReminderIsSet>
+  <t:ReminderMinutesBeforeStart>15</t:ReminderMinutesBeforeStart>
+  <t:DisplayCc/>
+  <t:DisplayTo>Finance Team</t:DisplayTo>
+  <t:HasAttachments>false</t:HasAttachments>
+  <t:Culture>en-US</t:Culture>
+  <t:EffectiveRights>
+    <t:CreateAssociated>false</t:CreateAssociated><t:CreateContents>false</t:CreateContents>
+    <t:CreateHierarchy>false</t:CreateHierarchy><t:Delete>true</t:Delete><t:Modify>true</t:Modify>
+    <t:Read>true</t:Read><t:ViewPrivateItems>true</t:ViewPrivateItems>
+  </t:EffectiveRights>
+  <t:LastModifiedName>Jane Doe</t:LastModifiedName>
+  <t:LastModifiedTime>2022-03-01T09:15:{s:02d}Z</t:LastModifiedTime>
+  <t:IsAssociated>false</t:IsAssociated>
+  <t:ConversationId Id="AAQkAGEwMTM2ZWJj"/>
+  <t:Sender><t:Mailbox><t:Name>Jane Doe</t:Name><t:EmailAddress>jane@example.com</t:EmailAddress>
+    <t:RoutingType>SMTP</t:RoutingType><t:MailboxType>Mailbox</t:MailboxType></t:Mailbox></t:Sender>
+  <t:ToRecipients>
+    <t:Mailbox><t:Name>Finance Team</t:Name><t:EmailAddress>finance@example.com</t:EmailAddress>
+      <t:RoutingType>SMTP</t:RoutingType><t:MailboxType>PublicDL</t:MailboxType></t:Mailbox>
+  </t:ToRecipients>
+  <t:IsReadReceiptRequested>false</t:IsReadReceiptRequested>
+  <t:IsDeliveryReceiptRequested>false</t:IsDeliveryReceiptRequested>
+  <t:ConversationIndex>AQHYLVy0</t:ConversationIndex>
+  <t:ConversationTopic>Quarterly report {i}</t:ConversationTopic>
+  <t:From><t:Mailbox><t:Name>Jane Doe</t:Name><t:EmailAddress>jane@example.com</t:EmailAddress>
+    <t:RoutingType>SMTP</t:RoutingType><t:MailboxType>Mailbox</t:MailboxType></t:Mailbox></t:From>
+  <t:InternetMessageId>&lt;{i}@example.com&gt;</t:InternetMessageId>
+  <t:IsRead>true</t:IsRead>
+  <t:IsResponseRequested>false</t:IsResponseRequested>
+</t:Message>"""
+
+RESPONSE_XML = """\
+<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:GetItemResponse xmlns:m="{mns}" xmlns:t="{tns}">
+      <m:ResponseMessages>
+        <m:GetItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Items>
+{items}
+          </m:Items>
+        </m:GetItemResponseMessage>
+      </m:ResponseMessages>
+    </m:GetItemResponse>
+  </s:Body>
+</s:Envelope>"""
+
+
+def field_by_field_kwargs(cls, elem, account):
+    # The decoding strategy used before compiled decoders were introduced
+    return {f.name: f.from_xml(elem=elem, account=account) for f in cls.FIELDS}
+
+
+def decode(data):
+    items = to_xml(data).getroot().iter(f"{{{TNS}}}Message")
+    t = time.perf_counter()
+    res = [Message.from_xml(elem=elem, account=None) for elem in list(items)]
+    return time.perf_counter() - t, res
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000, help="Number of items in the canned response")
+    parser.add_argument("--rounds", type=int, default=5, help="Number of rounds to run, the best round is reported")
+    args = parser.parse_args()
+
+    items = "\n".join(MESSAGE_XML.format(i=i, s=i % 60, size=1000 + i) for i in range(args.items))
+    data = RESPONSE_XML.format(mns=MNS, tns=TNS, items=items).encode("utf-8")
+    print(f"Canned GetItem response with {args.items} items ({len(data)} bytes)")
+
+    # Alternate between the two strategies, so they are equally affected by other load on the machine
+    orig_kwargs_from_elem = EWSElement.__dict__["_kwargs_from_elem"]
+    compiled_time = field_by_field_time = float("inf")
+    for _ in range(args.rounds):
+        delta, compiled_res = decode(data)
+        compiled_time = min(compiled_time, delta)
+        EWSElement._kwargs_from_elem = classmethod(field_by_field_kwargs)
+        try:
+            delta, field_by_field_res = decode(data)
+        finally:
+            EWSElement._kwargs_from_elem = orig_kwargs_from_elem
+        field_by_field_time = min(field_by_field_time, delta)
+    if compiled_res != field_by_field_res:
+        raise RuntimeError("The two decoding strategies returned different results")
+
+    for label, delta in ("Field-by-field", field_by_field_time), ("Compiled decoder", compiled_time):
+        print(f"{label:>16}: {delta:.3f}s ({args.items / delta:.0f} items/s)")
+    print(f"Speedup: {field_by_field_time / compiled_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
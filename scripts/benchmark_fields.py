@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+# Measures the per-call cost of looking up the fields supported by a server version, with the computation that
+# EWSElement.supported_fields() and BaseFolder.allowed_item_fields() used to do on every call, and with the cached
+# values they return now. Needs no server.
+import argparse
+import time
+
+from exchangelib.fields import FieldPath
+from exchangelib.folders import BaseFolder
+from exchangelib.items import Message
+from exchangelib.version import EXCHANGE_2016, Version
+
+
+def uncached_supported_fields(cls, version):
+    return tuple(f for f in cls.FIELDS if not f.is_attribute and f.supports_version(version))
+
+
+def uncached_allowed_item_fields(cls, version):
+    fields = set()
+    for item_model in cls.supported_item_models:
+        fields.update(set(uncached_supported_fields(item_model, version=version)))
+    return fields
+
+
+def uncached_allowed_item_field_paths(cls, version):
+    return {FieldPath(field=f) for f in uncached_allowed_item_fields(cls, version=version)}
+
+
+def run(func, calls):
+    t = time.perf_counter()
+    for _ in range(calls):
+        res = func()
+    return time.perf_counter() - t, res
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=10000, help="Number of calls to each function")
+    parser.add_argument("--rounds", type=int, default=3, help="Number of rounds to run, the best round is reported")
+    args = parser.parse_args()
+
+    version = Version(build=EXCHANGE_2016)
+    benchmarks = (
+        (
+            "Message.supported_fields()",
+            lambda: uncached_supported_fields(Message, version=version),
+            lambda: Message.supported_fields(version=version),
+        ),
+        (
+            "BaseFolder.allowed_item_fields()",
+            lambda: uncached_allowed_item_fields(BaseFolder, version=version),
+            lambda: BaseFolder.allowed_item_fields(version=version),
+        ),
+        (
+            "BaseFolder.allowed_item_field_paths()",
+            lambda: uncached_allowed_item_field_paths(BaseFolder, version=version),
+            lambda: BaseFolder.allowed_item_field_paths(version=version),
+        ),
+    )
+    for label, uncached, cached in benchmarks:
+        times = dict(uncached=float("inf"), cached=float("inf"))
+        results = {}
+        for _ in range(args.rounds):
+            for name, func in (("uncached", uncached), ("cached", cached)):
+                delta, results[name] = run(func, args.calls)
+                times[name] = min(times[name], delta)
+        if set(results["uncached"]) != set(results["cached"]):
+            raise RuntimeError(f"{label}: the strategies returned different results")
+        print(label)
+        for name, delta in times.items():
+            print(f"{name:>10}: {delta / args.calls * 1e6:.1f}us per call")
+        print(f"   Speedup: {times['uncached'] / times['cached']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
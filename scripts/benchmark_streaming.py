@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+
+# Measures how many streaming notifications per second we can cut out of a canned GetStreamingEvents response, with the
+# byte-at-a-time document framing that DocumentYielder used to do and with the chunk-based framing it does now. With
+# --parse, the notifications are also converted to Notification objects. Needs no server.
+import argparse
+import time
+
+from exchangelib.properties import Notification
+from exchangelib.util import MNS, TNS, DocumentYielder, to_xml
+
+NOTIFICATION_XML = """\
+<?xml version="1.0" encoding="utf-8"?>
+<Envelope xmlns="http://schemas.xmlsoap.org/soap/envelope/">
+  <soap11:Header xmlns:soap11="http://schemas.xmlsoap.org/soap/envelope/">
+    <ServerVersionInfo xmlns="{tns}" MajorVersion="15" MinorVersion="1" MajorBuildNumber="2375"
+      MinorBuildNumber="31" Version="V2017_07_11"/>
+  </soap11:Header>
+  <soap11:Body xmlns:soap11="http://schemas.xmlsoap.org/soap/envelope/">
+    <m:GetStreamingEventsResponse xmlns:m="{mns}" xmlns:t="{tns}">
+      <m:ResponseMessages>
+        <m:GetStreamingEventsResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Notifications>
+            <m:Notification>
+              <t:SubscriptionId>JQB0YW1iMDEwMC5jb3JwLmNvbRAAAAA{i:08d}</t:SubscriptionId>
+              <t:NewMailEvent>
+                <t:TimeStamp>2022-03-01T09:15:00Z</t:TimeStamp>
+                <t:ItemId Id="AAMkAGE{i:08d}" ChangeKey="CQAAAA=="/>
+                <t:ParentFolderId Id="AAMkAGEwMTM2ZWJj" ChangeKey="AQAAAA=="/>
+              </t:NewMailEvent>
+            </m:Notification>
+          </m:Notifications>
+        </m:GetStreamingEventsResponseMessage>
+      </m:ResponseMessages>
+    </m:GetStreamingEventsResponse>
+  </soap11:Body>
+</Envelope>
+"""
+
+
+class ByteDocumentYielder:
+    """The document framing that DocumentYielder used before it learned to handle chunks of more than one byte"""
+
+    def __init__(self, content_iterator, document_tag="Envelope"):
+        self._iterator = content_iterator
+        self._document_tag = document_tag.encode()
+
+    def _get_tag(self):
+        tag_buffer = [b"<"]
+        while True:
+            try:
+                c = next(self._iterator)
+            except StopIteration:
+                break
+            tag_buffer.append(c)
+            if c == b">":
+                break
+        return b"".join(tag_buffer)
+
+    def __iter__(self):
+        doc_started = False
+        buffer = []
+        try:
+            while True:
+                c = next(self._iterator)
+                if not doc_started and c == b"<":
+                    tag = self._get_tag()
+                    if DocumentYielder._normalize_tag(tag) == self._document_tag:
+                        buffer.append(tag)
+                        doc_started = True
+                elif doc_started and c == b"<":
+                    tag = self._get_tag()
+                    buffer.append(tag)
+                    if DocumentYielder._normalize_tag(tag) == self._document_tag:
+                        yield b"<?xml version='1.0' encoding='utf-8'?>\n" + b"".join(buffer)
+                        doc_started = False
+                        buffer = []
+                elif doc_started:
+                    buffer.append(c)
+        except StopIteration:
+            return
+
+
+def run(yielder_cls, data, chunk_size, parse):
+    chunks = (data[i : i + chunk_size] for i in range(0, len(data), chunk_size))
+    t = time.perf_counter()
+    res = []
+    for doc in yielder_cls(chunks):
+        if not parse:
+            res.append(doc)
+            continue
+        for elem in to_xml(doc).getroot().iter(f"{{{MNS}}}Notification"):
+            res.append(Notification.from_xml(elem=elem, account=None))
+    return time.perf_counter() - t, res
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notifications", type=int, default=2000, help="Number of notifications in the stream")
+    parser.add_argument("--chunk-size", type=int, default=8192, help="Size of the chunks delivered by the stream")
+    parser.add_argument("--rounds", type=int, default=3, help="Number of rounds to run, the best round is reported")
+    parser.add_argument("--parse", action="store_true", help="Also parse the notifications")
+    args = parser.parse_args()
+
+    data = "".join(NOTIFICATION_XML.format(i=i, mns=MNS, tns=TNS) for i in range(args.notifications)).encode("utf-8")
+    print(f"Canned GetStreamingEvents response with {args.notifications} notifications ({len(data)} bytes)")
+
+    strategies = (
+        ("Byte-at-a-time", ByteDocumentYielder, 1),
+        (f"{args.chunk_size}-byte chunks", DocumentYielder, args.chunk_size),
+    )
+    times = {label: float("inf") for label, _, _ in strategies}
+    results = {}
+    for _ in range(args.rounds):
+        for label, yielder_cls, chunk_size in strategies:
+            delta, results[label] = run(yielder_cls, data, chunk_size, args.parse)
+            times[label] = min(times[label], delta)
+    first, *rest = results.values()
+    if len(first) != args.notifications or any(r != first for r in rest):
+        raise RuntimeError("The strategies returned different results")
+
+    for label, delta in times.items():
+        print(f"{label:>20}: {delta:.3f}s ({args.notifications / delta:.0f} notifications/s)")
+    (slow, *_), (fast, *_) = strategies
+    print(f"Speedup: {times[slow] / times[fast]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+# Measures the time it takes to get the values of a few fields from the items in a canned GetItem response, like
+# QuerySet.values_list() does, by creating the items and reading the values from them, and by reading the values
+# directly from the XML elements. Needs no server.
+import argparse
+import time
+
+from benchmark_decode import MESSAGE_XML, RESPONSE_XML
+
+from exchangelib.fields import FieldPath
+from exchangelib.items import Message
+from exchangelib.util import MNS, TNS, to_xml
+
+
+def from_items(elems, field_paths):
+    res = []
+    for elem in elems:
+        item = Message.from_xml(elem=elem, account=None)
+        res.append(tuple(f.get_value(item) for f in field_paths))
+    return res
+
+
+def from_lazy_items(elems, field_paths):
+    res = []
+    for elem in elems:
+        item = Message.from_xml(elem=elem, account=None, lazy=True)
+        res.append(tuple(f.get_value(item) for f in field_paths))
+    return res
+
+
+def from_elems(elems, field_paths):
+    return [Message.values_from_xml(elem=elem, account=None, field_paths=field_paths) for elem in elems]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000, help="Number of items in the canned response")
+    parser.add_argument("--rounds", type=int, default=5, help="Number of rounds to run, the best round is reported")
+    parser.add_argument(
+        "--fields", default="datetime_received,sender,size", help="Comma-separated list of fields to get values for"
+    )
+    args = parser.parse_args()
+
+    items = "\n".join(MESSAGE_XML.format(i=i, s=i % 60, size=1000 + i) for i in range(args.items))
+    data = RESPONSE_XML.format(mns=MNS, tns=TNS, items=items).encode("utf-8")
+    field_paths = [FieldPath(field=Message.get_field_by_fieldname(name)) for name in args.fields.split(",")]
+    print(f"Canned GetItem response with {args.items} items ({len(data)} bytes), fields: {args.fields}")
+
+    strategies = (("Items", from_items), ("Lazy items", from_lazy_items), ("Projection", from_elems))
+    times = {label: float("inf") for label, _ in strategies}
+    results = {}
+    for _ in range(args.rounds):
+        for label, func in strategies:
+            elems = list(to_xml(data).getroot().iter(f"{{{TNS}}}Message"))
+            t = time.perf_counter()
+            results[label] = func(elems, field_paths)
+            times[label] = min(times[label], time.perf_counter() - t)
+    first, *rest = results.values()
+    if any(r != first for r in rest):
+        raise RuntimeError("The strategies returned different results")
+
+    for label, delta in times.items():
+        print(f"{label:>10}: {delta:.3f}s ({args.items / delta:.0f} items/s)")
+    print(f"Speedup: {times['Items'] / times['Projection']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
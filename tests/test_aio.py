@@ -0,0 +1,78 @@
+import asyncio
+import gc
+from unittest.mock import patch
+
+from exchangelib.aio import AsyncAccount, AsyncProtocol
+from exchangelib.errors import InvalidTypeError
+from exchangelib.folders import FolderCollection
+from exchangelib.items import Message
+from exchangelib.protocol import BaseProtocol
+from exchangelib.services import GetItem
+
+from .common import EWSTest
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def collect(agen):
+    return [i async for i in agen]
+
+
+class AsyncTest(EWSTest):
+    def test_async_protocol_caching(self):
+        async_protocol = AsyncProtocol.from_protocol(self.account.protocol)
+        self.assertIs(async_protocol, AsyncProtocol.from_protocol(self.account.protocol))
+        self.assertIs(async_protocol, AsyncAccount(self.account).protocol)
+        self.assertEqual(async_protocol.max_workers, self.account.protocol._session_pool_maxsize)
+        with self.assertRaises(InvalidTypeError):
+            AsyncAccount("XXX")
+
+    def test_async_protocol_lifetime(self):
+        # The cache must not keep protocols alive, and the thread pool is stopped when the protocol is collected
+        protocol = BaseProtocol(config=self.account.protocol.config)
+        async_protocol = AsyncProtocol.from_protocol(protocol)
+        self.assertIs(async_protocol.protocol, protocol)
+        self.assertEqual(run(async_protocol.run(lambda: 1)), 1)
+        del protocol
+        gc.collect()
+        self.assertIsNone(async_protocol.protocol)
+        self.assertNotIn(async_protocol, AsyncProtocol._cache.values())
+        with self.assertRaises(RuntimeError):
+            async_protocol._executor.submit(lambda: None)
+
+    def test_iterate(self):
+        async_protocol = AsyncProtocol.from_protocol(self.account.protocol)
+        for n in (0, 1, 2, 3, 10):
+            with self.subTest(n=n):
+                self.assertEqual(run(collect(async_protocol.iterate(range(n), batch_size=3))), list(range(n)))
+
+    def test_map_ordered(self):
+        async_protocol = AsyncProtocol.from_protocol(self.account.protocol)
+
+        def square(i):
+            return i * i
+
+        self.assertEqual(
+            run(collect(async_protocol.map_ordered(square, range(20), max_in_flight=3))), [i * i for i in range(20)]
+        )
+
+    def test_fetch(self):
+        # Test that results are returned in input order, even though chunks are fetched concurrently
+        ids = [(str(i), "XXX") for i in range(25)]
+
+        def call(self, items, additional_fields, shape):
+            return (Message(id=i, changekey=c) for i, c in items)
+
+        with patch.object(GetItem, "call", call):
+            items = run(collect(AsyncAccount(self.account).fetch(ids=ids, only_fields=["subject"], chunk_size=4)))
+        self.assertEqual([(i.id, i.changekey) for i in items], ids)
+
+    def test_queryset_aiter(self):
+        ids = [(str(i), "XXX") for i in range(7)]
+        with patch.object(FolderCollection, "find_items", return_value=iter(ids)):
+            qs = self.account.inbox.all().only("id", "changekey")
+            qs.page_size = 3
+            items = run(collect(qs))
+        self.assertEqual([(i.id, i.changekey) for i in items], ids)
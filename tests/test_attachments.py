@@ -1,11 +1,25 @@
-from exchangelib.attachments import AttachmentId, FileAttachment, ItemAttachment
-from exchangelib.errors import ErrorInvalidAttachmentId, ErrorInvalidIdMalformed
+import io
+import os
+import tempfile
+from base64 import b64encode
+from copy import deepcopy
+from unittest.mock import patch
+
+from exchangelib.attachments import (
+    AttachmentId,
+    FileAttachment,
+    ItemAttachment,
+    StreamedFileContent,
+    StreamingRequestBody,
+)
+from exchangelib.errors import ErrorInvalidAttachmentId, ErrorInvalidIdMalformed, ErrorItemNotFound
 from exchangelib.fields import FieldPath
 from exchangelib.folders import Inbox
 from exchangelib.items import Item, Message
 from exchangelib.properties import HTMLBody
+from exchangelib.queryset import QuerySet
 from exchangelib.services import GetAttachment
-from exchangelib.util import chunkify
+from exchangelib.util import chunkify, xml_to_str
 
 from .common import get_random_string
 from .test_items.test_basics import BaseItemTest
@@ -68,6 +82,17 @@ class AttachmentsTest(BaseItemTest):
             att1.content = "XXX"
         self.assertEqual(e.exception.args[0], "'value' 'XXX' must be of type <class 'bytes'>")
         self.assertEqual(att1.content, binary_file_content)  # Test property getter
+        self.assertListEqual(list(att1.iter_chunks(size=7)), list(chunkify(binary_file_content, 7)))
+        with self.assertRaises(ValueError):
+            list(att1.iter_chunks(size=-1))
+        with io.BytesIO() as f:
+            att1.save(f)
+            self.assertEqual(f.getvalue(), binary_file_content)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "attachment.txt")
+            att1.save(path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), binary_file_content)
         att1.attachment_id = "xxx"
         self.assertEqual(att1.content, binary_file_content)  # Test property getter when attachment_id is set
         att1._content = None
@@ -213,6 +238,132 @@ class AttachmentsTest(BaseItemTest):
         self.assertEqual(fresh_attachments[0].name, "my_file_2.txt")
         self.assertEqual(fresh_attachments[0].content, binary_file_content)
 
+    def test_streamed_file_content(self):
+        binary_file_content = get_random_string(1000).encode("utf-8")
+        fileobj = io.BytesIO(b"XXX" + binary_file_content)
+        fileobj.seek(3)  # Reading starts at the position of the file object when the attachment was created
+        att1 = FileAttachment.from_file(fileobj, name="my_file_1.txt")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "my_file_2.txt")
+            with open(path, "wb") as f:
+                f.write(binary_file_content)
+            att2 = FileAttachment.from_file(path)
+            self.assertEqual(att2.name, "my_file_2.txt")
+            self.assertEqual(att2.content, binary_file_content)
+            for att in (att1, att2):
+                self.assertEqual(att._source.size, len(binary_file_content))
+                self.assertEqual(b"".join(att._source.iter_encoded()), b64encode(binary_file_content))
+
+            # The placeholder in the request is replaced by the file content, and the body can be sent more than once
+            data = xml_to_str(att2.to_xml(version=self.account.version), encoding="utf-8")
+            self.assertIn(att2._source.placeholder.encode(), data)
+            body = StreamedFileContent.request_body(data)
+            self.assertIsInstance(body, StreamingRequestBody)
+            self.assertEqual(b"".join(body), b"".join(body))
+            self.assertEqual(len(b"".join(body)), len(body))
+            self.assertEqual(
+                b"".join(body), data.replace(att2._source.placeholder.encode(), b64encode(binary_file_content))
+            )
+            self.assertNotIn(binary_file_content.decode(), str(body))
+            # Copies of the attachment can also be sent
+            att3 = deepcopy(att2)
+            body = StreamedFileContent.request_body(
+                xml_to_str(att3.to_xml(version=self.account.version), encoding="utf-8")
+            )
+            self.assertIn(b64encode(binary_file_content), b"".join(body))
+        # Requests without placeholders are not touched
+        self.assertEqual(StreamedFileContent.request_body(b"XXX"), b"XXX")
+        with self.assertRaises(ValueError):
+            FileAttachment.from_file(object())
+        # Setting the content replaces the file
+        att1.content = b"YYY"
+        self.assertEqual(att1.content, b"YYY")
+        self.assertIsNone(att1._source)
+
+    def test_file_attachment_from_file(self):
+        item = self.get_test_item(folder=self.test_folder)
+        binary_file_content = get_random_string(2**10).encode("utf-8")
+        item.attach(FileAttachment.from_file(io.BytesIO(binary_file_content), name="my_file_1.txt"))
+        item.save()
+        item.attach(FileAttachment.from_file(io.BytesIO(binary_file_content), name="my_file_2.txt"))
+        fresh_item = self.get_item_by_id(item)
+        fresh_attachments = sorted(fresh_item.attachments, key=lambda a: a.name)
+        self.assertListEqual([a.name for a in fresh_attachments], ["my_file_1.txt", "my_file_2.txt"])
+        for a in fresh_attachments:
+            self.assertEqual(a.content, binary_file_content)
+
+    def test_download_attachments_mocked(self):
+        # The services are mocked, but the test class still needs an account on a live server
+        small = FileAttachment(name="a.txt", attachment_id=AttachmentId(id="A"), size=3)
+        large = FileAttachment(name="sub/a.txt", attachment_id=AttachmentId(id="B"), size=2**30)
+        inline = FileAttachment(name="logo.png", attachment_id=AttachmentId(id="C"), size=3, is_inline=True)
+        item_attachment = ItemAttachment(name="x", attachment_id=AttachmentId(id="D"))
+        item = Message(account=self.account, id="XXX", attachments=[small, large, inline, item_attachment])
+        missing = ErrorItemNotFound("Not found")
+
+        def fetch(account, ids, **kwargs):
+            return iter(item if i is item else missing for i in ids)
+
+        def get_attachments(svc, items, **kwargs):
+            return [FileAttachment(attachment_id=i, content=i.id.encode() * 2) for i in items]
+
+        def stream_file_content(svc, attachment_id):
+            return iter([b"big ", b"data"])
+
+        with patch.object(self.account.__class__, "fetch", fetch), patch.object(
+            GetAttachment, "call", get_attachments
+        ), patch.object(
+            GetAttachment, "stream_file_content", stream_file_content
+        ), tempfile.TemporaryDirectory() as tmp_dir:
+            with open(os.path.join(tmp_dir, "a.txt"), "w") as f:
+                f.write("existing file")
+            manifest = self.account.download_attachments(items=[item, ("YYY", "ZZZ")], dest_dir=tmp_dir, workers=2)
+            self.assertListEqual(
+                [(e["item_id"], e["attachment_id"], e["error"]) for e in manifest],
+                [("XXX", "A", None), ("XXX", "B", None), ("YYY", None, missing)],
+            )
+            # Names are unique, existing files are kept, and paths can't point outside the directory
+            self.assertListEqual(
+                [e["path"] for e in manifest],
+                [os.path.join(tmp_dir, "a (1).txt"), os.path.join(tmp_dir, "a (2).txt"), None],
+            )
+            with open(os.path.join(tmp_dir, "a.txt"), "rb") as f:
+                self.assertEqual(f.read(), b"existing file")
+            with open(manifest[0]["path"], "rb") as f:
+                self.assertEqual(f.read(), b"AA")
+            with open(manifest[1]["path"], "rb") as f:
+                self.assertEqual(f.read(), b"big data")
+
+            # Inline attachments are opt-in
+            manifest = self.account.download_attachments(items=[item], dest_dir=tmp_dir, include_inline=True)
+            self.assertListEqual([e["name"] for e in manifest], ["a.txt", "sub/a.txt", "logo.png"])
+
+            # Only item IDs are requested from querysets
+            with patch.object(QuerySet, "_query", autospec=True, return_value=iter([("YYY", "ZZZ")])) as query:
+                manifest = self.account.download_attachments(items=self.account.inbox.all(), dest_dir=tmp_dir)
+            self.assertListEqual([(e["item_id"], e["error"]) for e in manifest], [("YYY", missing)])
+            self.assertListEqual([f.path for f in query.call_args[0][0].only_fields], ["id", "changekey"])
+        with self.assertRaises(ValueError):
+            self.account.download_attachments(items=[], dest_dir="/non/existent/dir")
+
+    def test_download_attachments(self):
+        item = self.get_test_item(folder=self.test_folder)
+        binary_file_content = get_random_string(2**10).encode("utf-8")
+        item.attach(FileAttachment(name="my_file.txt", content=binary_file_content))
+        item.attach(FileAttachment(name="my_file.txt", content=binary_file_content[:10]))
+        item.save()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manifest = self.account.download_attachments(
+                items=self.test_folder.filter(categories__contains=self.categories), dest_dir=tmp_dir
+            )
+            self.assertEqual(len(manifest), 2)
+            contents = set()
+            for entry in manifest:
+                self.assertIsNone(entry["error"])
+                with open(entry["path"], "rb") as f:
+                    contents.add(f.read())
+            self.assertSetEqual(contents, {binary_file_content, binary_file_content[:10]})
+
     def test_streaming_file_attachments(self):
         item = self.get_test_item(folder=self.test_folder)
         large_binary_file_content = get_random_string(2**10).encode("utf-8")
@@ -235,6 +386,16 @@ class AttachmentsTest(BaseItemTest):
                 buffer = fp.read(7)
             self.assertListEqual(chunked_reads, list(chunkify(large_binary_file_content, 7)))
 
+        # Test streaming file content to a file and in chunks, without storing the content locally
+        fresh_item = self.get_item_by_id(item)
+        with io.BytesIO() as f:
+            fresh_item.attachments[0].save(f)
+            self.assertEqual(f.getvalue(), large_binary_file_content)
+        self.assertListEqual(
+            list(fresh_item.attachments[0].iter_chunks(size=100)), list(chunkify(large_binary_file_content, 100))
+        )
+        self.assertIsNone(fresh_item.attachments[0]._content)
+
     def test_streaming_file_attachment_error(self):
         # Test that we can parse XML error responses in streaming mode.
 
@@ -1,12 +1,14 @@
 import datetime
 import math
+import pickle
 import time
+from threading import Thread
 
 import requests_mock
 
 from exchangelib.configuration import Configuration
 from exchangelib.credentials import Credentials
-from exchangelib.protocol import FailFast, FaultTolerance
+from exchangelib.protocol import FailFast, FaultTolerance, Protocol, RateLimiter, TokenBucket
 from exchangelib.transport import AUTH_TYPE_MAP, NTLM
 from exchangelib.version import Build, Version
 
@@ -40,6 +42,11 @@ class ConfigurationTest(TimedTestCase):
         with self.assertRaises(TypeError) as e:
             Configuration(max_connections="foo")
         self.assertEqual(e.exception.args[0], "'max_connections' 'foo' must be of type <class 'int'>")
+        with self.assertRaises(TypeError) as e:
+            Configuration(rate_limiter="foo")
+        self.assertEqual(
+            e.exception.args[0], "'rate_limiter' 'foo' must be of type <class 'exchangelib.protocol.RateLimiter'>"
+        )
         self.assertEqual(Configuration().server, None)  # Test that property works when service_endpoint is None
 
     def test_magic(self):
@@ -101,3 +108,91 @@ class ConfigurationTest(TimedTestCase):
         # Test default value
         sa.back_off(None)
         self.assertEqual(int(math.ceil((sa.back_off_until - datetime.datetime.now()).total_seconds())), 60)
+
+    def test_rate_limiter_init(self):
+        with self.assertRaises(ValueError):
+            RateLimiter()
+        with self.assertRaises(TypeError):
+            RateLimiter(requests_per_second="foo")
+        with self.assertRaises(ValueError):
+            RateLimiter(requests_per_second=0)
+        with self.assertRaises(TypeError):
+            RateLimiter(max_concurrent_requests="foo")
+        with self.assertRaises(ValueError):
+            RateLimiter(max_concurrent_requests=0)
+        with self.assertRaises(TypeError):
+            RateLimiter(requests_per_second=1, burst="foo")
+        with self.assertRaises(ValueError):
+            RateLimiter(requests_per_second=1, burst=0)
+        with self.assertRaises(ValueError) as e:
+            RateLimiter(requests_per_second=1, scope="foo")
+        self.assertEqual(e.exception.args[0], f"'scope' 'foo' must be one of {sorted(RateLimiter.SCOPES)}")
+        self.assertEqual(RateLimiter(requests_per_second=0.5).burst, 1)
+        self.assertEqual(RateLimiter(requests_per_second=20).burst, 20)
+        rate_limiter = pickle.loads(pickle.dumps(RateLimiter(requests_per_second=1, max_concurrent_requests=2)))
+        self.assertEqual(repr(rate_limiter), repr(RateLimiter(requests_per_second=1, max_concurrent_requests=2)))
+
+    def test_rate_limiter_scope(self):
+        def protocol(endpoint, username, rate_limiter):
+            return Protocol(
+                config=Configuration(
+                    service_endpoint=endpoint,
+                    credentials=Credentials(username, "XXX"),
+                    auth_type=NTLM,
+                    rate_limiter=rate_limiter,
+                )
+            )
+
+        for scope, expected in (
+            (RateLimiter.ENDPOINT, [0, 0, 2, 0]),
+            (RateLimiter.CREDENTIALS, [0, 1, 2, 0]),
+            (RateLimiter.MAILBOX, [0, 1, 2, 3]),
+        ):
+            with self.subTest(scope=scope):
+                rate_limiter = RateLimiter(max_concurrent_requests=1, scope=scope)
+                p1 = protocol("https://example.com/EWS/Exchange.asmx", "foo", rate_limiter)
+                p2 = protocol("https://example.com/EWS/Exchange.asmx", "bar", rate_limiter)
+                p3 = protocol("https://example.org/EWS/Exchange.asmx", "foo", rate_limiter)
+                buckets = [
+                    rate_limiter.get_bucket(p1, "a@example.com"),
+                    rate_limiter.get_bucket(p2, "a@example.com"),
+                    rate_limiter.get_bucket(p3, "a@example.com"),
+                    rate_limiter.get_bucket(p1, "b@example.com"),
+                ]
+                # Compare the identity of the buckets
+                self.assertEqual([buckets.index(b) for b in buckets], expected)
+                self.assertEqual(len(rate_limiter.budgets()), len(set(expected)))
+
+    def test_token_bucket_rate(self):
+        bucket = TokenBucket(rate=100, capacity=2)
+        # We can burst up to the capacity
+        self.assertEqual(bucket.acquire(), 0)
+        bucket.release()
+        self.assertEqual(bucket.acquire(), 0)
+        bucket.release()
+        self.assertLess(bucket.budget()["tokens"], 1)
+        # Then we're rate-limited
+        self.assertGreater(bucket.acquire(), 0)
+        bucket.release()
+        # Backing off empties the bucket and stops the refill
+        bucket.back_off(0.05)
+        budget = bucket.budget()
+        self.assertEqual(budget["tokens"], 0)
+        self.assertGreater(budget["paused_for"], 0)
+        self.assertGreaterEqual(bucket.acquire(), 0.04)
+        bucket.release()
+        self.assertEqual(bucket.budget()["paused_for"], 0)
+
+    def test_token_bucket_concurrency(self):
+        bucket = TokenBucket(max_concurrent=1)
+        bucket.acquire()
+        self.assertEqual(bucket.budget(), dict(tokens=None, in_flight=1, max_concurrent=1, paused_for=0.0))
+        waited = []
+        t = Thread(target=lambda: waited.append(bucket.acquire()))
+        t.start()
+        time.sleep(0.02)
+        self.assertEqual(waited, [])
+        bucket.release()
+        t.join()
+        self.assertGreater(waited[0], 0)
+        self.assertEqual(bucket.budget()["in_flight"], 1)
@@ -66,6 +66,22 @@ class EWSDateTimeTest(TimedTestCase):
         self.assertEqual(EWSDateTime.from_string("2000-01-02T03:04:05Z"), EWSDateTime(2000, 1, 2, 3, 4, 5, tzinfo=UTC))
         self.assertIsInstance(EWSDateTime.from_string("2000-01-02T03:04:05+01:00"), EWSDateTime)
         self.assertIsInstance(EWSDateTime.from_string("2000-01-02T03:04:05Z"), EWSDateTime)
+        self.assertEqual(
+            EWSDateTime.from_string("2000-01-01T23:34:05-01:30"), EWSDateTime(2000, 1, 2, 1, 4, 5, tzinfo=UTC)
+        )
+        self.assertIs(EWSDateTime.from_string("2000-01-02T03:04:05Z").tzinfo, UTC)
+        self.assertIs(EWSDateTime.from_string("2000-01-02T03:04:05+01:00").tzinfo, UTC)
+        # Strings that are not in one of the fixed formats fall back to the strict parsers
+        for date_string in (
+            "2000-01-02 03:04:05Z",
+            "2000-01-02T03:04:05.123Z",
+            "2000-01-02T03:04:0xZ",
+            "2000-01-02T03:04:05+01:0x",
+            "+200-01-02T03:04:05+01:00",
+        ):
+            with self.subTest(date_string=date_string):
+                with self.assertRaises(ValueError):
+                    EWSDateTime.from_string(date_string)
 
         # Test addition, subtraction, summertime etc
         self.assertIsInstance(dt + datetime.timedelta(days=1), EWSDateTime)
@@ -186,6 +202,16 @@ class EWSTimeZoneTest(TimedTestCase):
         # Test from_ms_id() with non-standard MS ID
         self.assertEqual(EWSTimeZone("Europe/Copenhagen"), EWSTimeZone.from_ms_id("Europe/Copenhagen"))
 
+        # Test that instances are cached, and that the cache can be cleared
+        tz = EWSTimeZone.from_ms_id("Romance Standard Time")
+        self.assertIs(EWSTimeZone.from_ms_id("Romance Standard Time"), tz)
+        self.assertIs(EWSTimeZone(tz.key), tz)
+        self.assertIs(EWSTimeZone.from_timezone(zoneinfo.ZoneInfo(tz.key)), tz)
+        EWSTimeZone.clear_cache(only_keys=[tz.key])
+        self.assertIsNot(EWSTimeZone.from_ms_id("Romance Standard Time"), tz)
+        with self.assertRaises(UnknownTimeZone):
+            EWSTimeZone.from_ms_id("UNKNOWN")
+
     def test_from_timezone(self):
         self.assertEqual(EWSTimeZone("Europe/Copenhagen"), EWSTimeZone.from_timezone(EWSTimeZone("Europe/Copenhagen")))
         self.assertEqual(
@@ -239,6 +265,9 @@ class EWSDateTest(TimedTestCase):
         self.assertEqual(EWSDate.from_string("2000-01-01Z"), EWSDate(2000, 1, 1))
         self.assertEqual(EWSDate.from_string("2000-01-01+01:00"), EWSDate(2000, 1, 1))
         self.assertEqual(EWSDate.from_string("2000-01-01-01:00"), EWSDate(2000, 1, 1))
+        self.assertIsInstance(EWSDate.from_string("2000-01-01"), EWSDate)
+        with self.assertRaises(ValueError):
+            EWSDate.from_string("2000-W01-1")
         self.assertIsInstance(EWSDate(2000, 1, 2) - EWSDate(2000, 1, 1), datetime.timedelta)
         self.assertIsInstance(EWSDate(2000, 1, 2) + datetime.timedelta(days=1), EWSDate)
         self.assertIsInstance(EWSDate(2000, 1, 2) - datetime.timedelta(days=1), EWSDate)
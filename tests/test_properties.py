@@ -1,13 +1,35 @@
+from copy import deepcopy
 from inspect import isclass
 from itertools import chain
+from types import SimpleNamespace
+from unittest.mock import patch
 
-from exchangelib.extended_properties import ExternId, Flag
-from exchangelib.fields import GenericEventListField, InvalidField, InvalidFieldForVersion, TextField, TypeValueField
+from exchangelib.ewsdatetime import EWSDate
+from exchangelib.extended_properties import ExtendedProperty, ExternId, Flag
+from exchangelib.fields import (
+    FieldPath,
+    GenericEventListField,
+    InvalidField,
+    InvalidFieldForVersion,
+    TextField,
+    TypeValueField,
+)
 from exchangelib.folders import Folder, RootOfHierarchy
 from exchangelib.indexed_properties import PhysicalAddress
-from exchangelib.items import BulkCreateResult, Item
-from exchangelib.properties import UID, Body, DLMailbox, EWSElement, Fields, HTMLBody, ItemId, Mailbox, MessageHeader
-from exchangelib.util import TNS, to_xml
+from exchangelib.items import BulkCreateResult, CalendarItem, Item, Message
+from exchangelib.properties import (
+    UID,
+    Body,
+    DLMailbox,
+    EWSElement,
+    Fields,
+    FieldsDecoder,
+    HTMLBody,
+    ItemId,
+    Mailbox,
+    MessageHeader,
+)
+from exchangelib.util import TNS, InternPool, to_xml
 from exchangelib.version import EXCHANGE_2010, EXCHANGE_2013, Version
 
 from .common import TimedTestCase
@@ -64,6 +86,9 @@ class PropertiesTest(TimedTestCase):
                             if not isinstance(f, (TypeValueField, GenericEventListField)):
                                 # All other fields must define a value type
                                 self.assertIsNotNone(value_cls)
+                            if FieldsDecoder._field_elem_tag(f) is not None:
+                                # Fields that are read from a single child element must implement reading it
+                                self.assertTrue(hasattr(f, "from_field_elem"), f"{f} must implement from_field_elem()")
                             field_names.add(f.name)
                     # Finally, test that all models have a link to MSDN documentation
                     if issubclass(cls, Folder):
@@ -168,6 +193,24 @@ class PropertiesTest(TimedTestCase):
         finally:
             Item.remove_field(field)
 
+    def test_supported_fields_cache(self):
+        version = Version(build=EXCHANGE_2013)
+        self.assertIs(Message.supported_fields(version=version), Message.supported_fields(version=version))
+        self.assertIn("text_body", {f.name for f in Message.supported_fields(version=version)})
+        self.assertNotIn("text_body", {f.name for f in Message.supported_fields(version=Version(build=EXCHANGE_2010))})
+        self.assertNotIn("extern_id", {f.name for f in Folder.allowed_item_fields(version=version)})
+        # Registering and deregistering extended properties must invalidate cached values
+        Message.register("extern_id", ExternId)
+        try:
+            self.assertIn("extern_id", {f.name for f in Message.supported_fields(version=version)})
+            self.assertIn("extern_id", {f.name for f in Folder.allowed_item_fields(version=version)})
+            self.assertIn("extern_id", {f.field.name for f in Folder.allowed_item_field_paths(version=version)})
+        finally:
+            Message.deregister("extern_id")
+        self.assertNotIn("extern_id", {f.name for f in Message.supported_fields(version=version)})
+        self.assertNotIn("extern_id", {f.name for f in Folder.allowed_item_fields(version=version)})
+        self.assertNotIn("extern_id", {f.field.name for f in Folder.allowed_item_field_paths(version=version)})
+
     def test_itemid_equality(self):
         self.assertEqual(ItemId("X", "Y"), ItemId("X", "Y"))
         self.assertNotEqual(ItemId("X", "Y"), ItemId("X", "Z"))
@@ -235,3 +278,237 @@ class PropertiesTest(TimedTestCase):
         with self.assertRaises(ValueError) as e:
             fields.insert(0, TextField(name="xxx"))
         self.assertIn("is a duplicate", e.exception.args[0])
+
+    def test_fields_decoder(self):
+        payload = b"""\
+<?xml version="1.0" encoding="utf-8"?>
+<t:Message xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+    <t:ItemId Id="XXX" ChangeKey="YYY"/>
+    <t:Subject>Hello</t:Subject>
+    <t:Subject>Ignored</t:Subject>
+    <t:Importance>High</t:Importance>
+    <t:Size>123</t:Size>
+    <t:From><t:Mailbox><t:EmailAddress>foo@example.com</t:EmailAddress></t:Mailbox></t:From>
+    <t:Foo>Bar</t:Foo>
+</t:Message>"""
+        decoder = Message.FIELDS.decoder
+        self.assertIs(decoder, Message.FIELDS.decoder)  # The decoder is cached
+        tags = dict((f.name, tag) for f, tag in decoder.fields)
+        self.assertEqual(tags["subject"], f"{{{TNS}}}Subject")
+        self.assertIsNone(dict((f.name, tag) for f, tag in ItemId.FIELDS.decoder.fields)["id"])  # An attribute
+
+        # The decoder returns the same values as reading field by field
+        kwargs = decoder.from_xml(elem=to_xml(payload).getroot(), account=None)
+        elem = to_xml(payload).getroot()
+        self.assertDictEqual(kwargs, {f.name: f.from_xml(elem=elem, account=None) for f in Message.FIELDS})
+        self.assertEqual(kwargs["subject"], "Hello")
+        self.assertEqual(kwargs["size"], 123)
+        self.assertEqual(kwargs["author"], Mailbox(email_address="foo@example.com"))
+
+        # The decoder is rebuilt when fields are added and removed
+        field = TextField("foo", field_uri="Foo")
+        Message.add_field(field, insert_after="subject")
+        try:
+            self.assertIsNot(decoder, Message.FIELDS.decoder)
+            self.assertEqual(
+                Message.FIELDS.decoder.from_xml(elem=to_xml(payload).getroot(), account=None)["foo"], "Bar"
+            )
+            # Fields sharing a tag are read field by field
+            dupe = TextField("dupe", field_uri="Foo")
+            Message.add_field(dupe, insert_after="foo")
+            try:
+                tags = dict((f.name, tag) for f, tag in Message.FIELDS.decoder.fields)
+                self.assertIsNone(tags["foo"])
+                self.assertIsNone(tags["dupe"])
+            finally:
+                Message.remove_field(dupe)
+        finally:
+            Message.remove_field(field)
+        self.assertNotIn("foo", Message.FIELDS.decoder.from_xml(elem=to_xml(payload).getroot(), account=None))
+
+    def test_extended_properties_decoder(self):
+        class PublicProp(ExtendedProperty):
+            distinguished_property_set_id = "PublicStrings"
+            property_name = "Public Prop"
+            property_type = "StringArray"
+
+        payload = b"""\
+<?xml version="1.0" encoding="utf-8"?>
+<t:Message xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+    <t:Subject>Hello</t:Subject>
+    <t:ExtendedProperty>
+        <t:ExtendedFieldURI PropertyTag="0x1090" PropertyType="Integer"/>
+        <t:Value>2</t:Value>
+    </t:ExtendedProperty>
+    <t:ExtendedProperty>
+        <t:ExtendedFieldURI PropertySetId="00020329-0000-0000-c000-000000000046" PropertyName="Public Prop"
+            PropertyType="StringArray"/>
+        <t:Values><t:Value>Foo</t:Value><t:Value>Bar</t:Value></t:Values>
+    </t:ExtendedProperty>
+    <t:ExtendedProperty>
+        <t:ExtendedFieldURI PropertyTag="0x1090" PropertyType="Integer"/>
+        <t:Value>3</t:Value>
+    </t:ExtendedProperty>
+</t:Message>"""
+        Message.register("flag", Flag)
+        Message.register("flag_copy", Flag)
+        Message.register("public_prop", PublicProp)
+        Message.register("extern_id", ExternId)
+        try:
+            # The 'ExtendedProperty' elements are matched to fields by their property definition, in a single pass
+            self.assertEqual(ExternId.match_key(), ExternId.match_key())
+            self.assertNotEqual(ExternId.match_key(), Flag.match_key())
+            kwargs = Message.FIELDS.decoder.from_xml(elem=to_xml(payload).getroot(), account=None)
+            self.assertEqual(kwargs["subject"], "Hello")
+            self.assertEqual(kwargs["flag"], 2)  # The first matching element wins
+            self.assertEqual(kwargs["flag_copy"], 2)
+            self.assertEqual(kwargs["public_prop"], ["Foo", "Bar"])  # The server translated the property set
+            self.assertIsNone(kwargs["extern_id"])
+            # The decoder returns the same values as reading field by field
+            elem = to_xml(payload).getroot()
+            self.assertDictEqual(kwargs, {f.name: f.from_xml(elem=elem, account=None) for f in Message.FIELDS})
+        finally:
+            for attr_name in ("flag", "flag_copy", "public_prop", "extern_id"):
+                Message.deregister(attr_name)
+
+    def test_lazy_item(self):
+        payload = b"""\
+<?xml version="1.0" encoding="utf-8"?>
+<t:Items xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+<t:Message>
+    <t:ItemId Id="XXX" ChangeKey="YYY"/>
+    <t:Subject>Hello</t:Subject>
+    <t:Size>123</t:Size>
+    <t:From><t:Mailbox><t:EmailAddress>foo@example.com</t:EmailAddress></t:Mailbox></t:From>
+</t:Message>
+</t:Items>"""
+        eager_item = Message.from_xml(elem=to_xml(payload).getroot()[0], account=None)
+        container = to_xml(payload).getroot()
+        item = Message.from_xml(elem=container[0], account=None, lazy=True)
+        self.assertEqual(len(container), 0)  # The element is detached from the tree
+        self.assertEqual(item.attachments, [])  # Fields needed by __init__() are read up front
+        self.assertIn("subject", item._lazy_state[-1])
+        self.assertEqual(item.subject, "Hello")
+        self.assertNotIn("subject", item._lazy_state[-1])
+        self.assertEqual(item.id, "XXX")
+        # Values set before they are read are not overwritten
+        item.size = 456
+        self.assertEqual(item.size, 456)
+        item.size = 123
+        with self.assertRaises(AttributeError):
+            item.foo
+        # A field that fails to decode is not marked as read, so the next access tries again
+        with patch.object(type(item._lazy_state[0]), "read_field", side_effect=ValueError("foo")):
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    item.author
+        self.assertIn("author", item._lazy_state[-1])
+        self.assertEqual(item, eager_item)
+        # Copying reads all remaining fields and releases the element
+        item_copy = deepcopy(item)
+        self.assertIsNone(item._lazy_state)
+        self.assertIsNone(item_copy._lazy_state)
+        self.assertEqual(item_copy, eager_item)
+        self.assertEqual(item_copy.author, Mailbox(email_address="foo@example.com"))
+
+    def test_values_from_xml(self):
+        payload = b"""\
+<?xml version="1.0" encoding="utf-8"?>
+<t:Items xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+<t:Message>
+    <t:ItemId Id="XXX" ChangeKey="YYY"/>
+    <t:Subject>Hello</t:Subject>
+    <t:Size>123</t:Size>
+    <t:Categories><t:String>Foo</t:String><t:String>Bar</t:String></t:Categories>
+    <t:From><t:Mailbox><t:EmailAddress>foo@example.com</t:EmailAddress></t:Mailbox></t:From>
+</t:Message>
+</t:Items>"""
+        field_paths = [FieldPath(field=ItemId.get_field_by_fieldname(name)) for name in ("id", "changekey")] + [
+            FieldPath(field=model.get_field_by_fieldname(name))
+            for model, name in (
+                (Message, "subject"),
+                (Message, "size"),
+                (Message, "categories"),
+                (Message, "author"),
+                (Message, "subject"),  # Fields can be requested more than once
+                (Message, "datetime_received"),  # Missing from the response
+                (CalendarItem, "location"),  # Not a Message field
+            )
+        ]
+        item = Message.from_xml(elem=to_xml(payload).getroot()[0], account=None)
+        container = to_xml(payload).getroot()
+        values = Message.values_from_xml(elem=container[0], account=None, field_paths=field_paths)
+        self.assertEqual(len(container), 0)  # The element is detached from the tree
+        self.assertEqual(values, ("XXX", "YYY", "Hello", 123, ["Foo", "Bar"], item.author, "Hello", None, None))
+
+        # Start and end of all-day calendar items are converted to dates. We need the item for that.
+        payload = b"""\
+<?xml version="1.0" encoding="utf-8"?>
+<t:Items xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+<t:CalendarItem>
+    <t:ItemId Id="XXX" ChangeKey="YYY"/>
+    <t:Start>2022-03-01T00:00:00Z</t:Start>
+    <t:End>2022-03-02T00:00:00Z</t:End>
+    <t:IsAllDayEvent>true</t:IsAllDayEvent>
+    <t:StartTimeZone Id="UTC"/>
+    <t:EndTimeZone Id="UTC"/>
+</t:CalendarItem>
+</t:Items>"""
+        field_paths = [FieldPath(field=CalendarItem.get_field_by_fieldname(name)) for name in ("start", "end")]
+        values = CalendarItem.values_from_xml(elem=to_xml(payload).getroot()[0], account=None, field_paths=field_paths)
+        self.assertEqual(values, (EWSDate(2022, 3, 1), EWSDate(2022, 3, 1)))
+
+    def test_intern_pool(self):
+        payload = b"""\
+<?xml version="1.0" encoding="utf-8"?>
+<t:Items xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+%s
+</t:Items>""" % b"".join(
+            b"""\
+<t:Message>
+    <t:ItemId Id="XXX%d" ChangeKey="YYY"/>
+    <t:ParentFolderId Id="ZZZ" ChangeKey="WWW"/>
+    <t:ItemClass>IPM.Note</t:ItemClass>
+    <t:Subject>Hello</t:Subject>
+    <t:Categories><t:String>Foo</t:String><t:String>Bar</t:String></t:Categories>
+    <t:From><t:Mailbox><t:Name>Foo Bar</t:Name><t:EmailAddress>foo@example.com</t:EmailAddress></t:Mailbox></t:From>
+</t:Message>""" % i for i in range(3)
+        )
+        plain_items = [Message.from_xml(elem=e, account=None) for e in to_xml(payload).getroot()]
+        account = SimpleNamespace(intern_pool=InternPool())
+        items = [Message.from_xml(elem=e, account=account) for e in to_xml(payload).getroot()]
+        self.assertEqual(items, plain_items)
+        first, *rest = items
+        for item in rest:
+            self.assertIsNot(item.id, first.id)
+            self.assertIs(item.parent_folder_id.id, first.parent_folder_id.id)
+            self.assertIs(item.item_class, first.item_class)
+            self.assertIs(item.subject, first.subject)
+            self.assertIs(item.categories[0], first.categories[0])
+            self.assertIs(item.author.name, first.author.name)
+            self.assertIs(item.author.email_address, first.author.email_address)
+            # Element objects are not shared, so changing one item does not change the others
+            self.assertIsNot(item.author, first.author)
+            self.assertIsNot(item.parent_folder_id, first.parent_folder_id)
+        first.author.name = "Baz"
+        self.assertEqual(rest[0].author.name, "Foo Bar")
+        stats = account.intern_pool.stats()
+        # Two items times folder ID, folder changekey, item class, subject, two categories, name and email address
+        self.assertEqual(stats["hits"], 2 * 8)
+        self.assertGreater(stats["bytes_saved"], 0)
+        self.assertEqual(stats["size"], len(account.intern_pool))
+        # Only exact strings are pooled
+        self.assertIsInstance(account.intern_pool.intern(Body("Hello")), Body)
+        self.assertEqual(account.intern_pool.intern(123), 123)
+        account.intern_pool.clear()
+        self.assertDictEqual(account.intern_pool.stats(), dict(size=0, hits=0, bytes_saved=0))
+        # A full pool returns new values as-is
+        pool = InternPool(max_size=1)
+        pool.intern("a")
+        b = "".join(["b", "b"])
+        self.assertIs(pool.intern(b), b)
+        self.assertEqual(len(pool), 1)
+        with self.assertRaises(ValueError):
+            InternPool(max_size=0)
+        with self.assertRaises(TypeError):
+            InternPool(max_size="1")
@@ -3,8 +3,10 @@ import os
 import pickle
 import socket
 import tempfile
+import time
 import warnings
 from contextlib import suppress
+from threading import Thread
 from unittest.mock import Mock, patch
 
 try:
@@ -241,6 +243,133 @@ EWS auth: NTLM""",
             protocol.decrease_poolsize()
         self.assertEqual(protocol._session_pool.qsize(), 1)
 
+    def test_decrease_poolsize_busy_scheduler(self):
+        # Decreasing the pool size must not go through the session scheduler while holding the pool lock
+        protocol = self.get_test_protocol(max_connections=4)
+        protocol.increase_poolsize()
+        protocol.increase_poolsize()
+        protocol._session_scheduler.wait_for_turn(key=None, priority=0)  # Another thread is waiting for a session
+        self.assertFalse(protocol._session_scheduler.is_idle)
+        t = Thread(target=protocol.decrease_poolsize, daemon=True)
+        t.start()
+        t.join(timeout=5)
+        self.assertFalse(t.is_alive())
+        self.assertEqual(protocol.session_pool_size, 1)
+        self.assertEqual(protocol._session_pool.qsize(), 1)
+        protocol._session_scheduler.end_turn(key=None)
+
+    def test_decrease_poolsize_no_idle_sessions(self):
+        # Decreasing the pool size must not wait for a session when all sessions are in use
+        protocol = self.get_test_protocol(max_connections=2)
+        sessions = [protocol.get_session(), protocol.get_session()]
+        self.assertEqual(protocol._session_pool.qsize(), 0)
+        t = Thread(target=protocol.decrease_poolsize, daemon=True)
+        t.start()
+        t.join(timeout=5)
+        self.assertFalse(t.is_alive())
+        self.assertEqual(protocol.session_pool_size, 2)
+        for session in sessions:
+            protocol.release_session(session)
+        protocol.decrease_poolsize()
+        self.assertEqual(protocol.session_pool_size, 1)
+
+    def test_session_scheduler(self):
+        # Test that waiting requests are served by priority, then round-robin by key
+        protocol = self.get_test_protocol(max_connections=1)
+        session = protocol.get_session(key="a")
+        order = []
+
+        def get_session(key, priority):
+            s = protocol.get_session(key=key, priority=priority)
+            order.append(key)
+            protocol.release_session(s)
+
+        threads = []
+        for i, (key, priority) in enumerate((("a", 0), ("a", 0), ("a", 0), ("b", 0), ("c", 1)), start=1):
+            t = Thread(target=get_session, args=(key, priority))
+            t.start()
+            threads.append(t)
+            # Make sure threads are queued in a predictable order
+            while sum(v["queued"] for v in protocol.session_queue_stats.values()) < i:
+                time.sleep(0.001)
+        protocol.release_session(session)
+        for t in threads:
+            t.join()
+        # The first "a" already had the turn when the other requests were queued
+        self.assertEqual(order, ["a", "c", "a", "b", "a"])
+        stats = protocol.session_queue_stats
+        self.assertEqual(stats["a"]["requests"], 4)
+        self.assertEqual(stats["a"]["queued"], 0)
+        self.assertGreater(stats["a"]["max_wait_time"], 0)
+        self.assertEqual(stats["b"]["requests"], 1)
+        self.assertTrue(protocol._session_scheduler.is_idle)
+
+    def test_session_pool_ramp_up(self):
+        protocol = self.get_test_protocol(max_connections=3)
+        for _ in range(3):
+            protocol.increase_poolsize()
+        self.assertEqual(protocol.session_pool_target_size, 3)
+        protocol.decrease_poolsize()
+        protocol.decrease_poolsize()
+        self.assertEqual(protocol.session_pool_size, 1)
+        self.assertEqual(protocol.session_pool_target_size, 1)
+        # The pool does not grow back on demand
+        with self.assertRaises(SessionPoolMaxSizeReached):
+            protocol.increase_poolsize()
+        with patch.object(protocol, "SESSION_POOL_RAMP_UP_COUNT", 2), patch.object(
+            protocol, "SESSION_POOL_COOLDOWN", 0
+        ):
+            protocol.record_success()
+            self.assertEqual(protocol.session_pool_target_size, 1)
+            protocol.record_success()
+            self.assertEqual(protocol.session_pool_target_size, 2)
+            protocol.increase_poolsize()
+            self.assertEqual(protocol.session_pool_size, 2)
+            # A decrease resets the count of successful requests
+            protocol.record_success()
+            protocol.decrease_poolsize()
+            protocol.record_success()
+            self.assertEqual(protocol.session_pool_target_size, 1)
+            for _ in range(3):
+                protocol.record_success()
+            self.assertEqual(protocol.session_pool_target_size, 3)
+        # Not before the cooldown period has passed
+        protocol.increase_poolsize()
+        protocol.decrease_poolsize()
+        with patch.object(protocol, "SESSION_POOL_RAMP_UP_COUNT", 1):
+            protocol.record_success()
+            self.assertEqual(protocol.session_pool_target_size, 1)
+
+    def test_chunk_size_controller(self):
+        protocol = self.get_test_protocol()
+        controller = protocol.get_chunk_size_controller(ResolveNames)
+        self.assertIs(controller, protocol.get_chunk_size_controller(ResolveNames))
+        self.assertIsNot(controller, protocol.get_chunk_size_controller(ExpandDL))
+        self.assertEqual(controller.max_size, ResolveNames.CHUNK_SIZE)
+        self.assertEqual(controller.chunk_size(1000), 1000)
+        controller.max_size = 40
+        # Multiplicative decrease
+        self.assertEqual(controller.decrease(40), 20)
+        self.assertEqual(controller.chunk_size(1000), 20)
+        self.assertEqual(controller.chunk_size(5), 5)
+        self.assertEqual(controller.decrease(20), 10)
+        # A timeout in a larger, concurrent chunk does not raise the limit
+        self.assertEqual(controller.decrease(40), 10)
+        # Small chunks don't raise the limit
+        controller.increase(5)
+        self.assertEqual(controller.limit, 10)
+        # Additive increase, until the limit is removed
+        controller.increase(10)
+        self.assertEqual(controller.limit, 11)
+        for _ in range(28):
+            controller.increase(controller.limit)
+        self.assertEqual(controller.limit, 39)
+        controller.increase(controller.limit)
+        self.assertIsNone(controller.limit)
+        self.assertEqual(controller.chunk_size(1000), 1000)
+        # Learned chunk sizes are not pickled
+        self.assertEqual(pickle.loads(pickle.dumps(protocol))._chunk_size_controllers, {})
+
     def test_max_usage_count(self):
         protocol = self.get_test_protocol(max_connections=1)
         session = protocol.get_session()
@@ -1,10 +1,15 @@
 # coding=utf-8
 from collections import namedtuple
+from unittest.mock import patch
 
+from exchangelib.ewsdatetime import UTC, EWSDateTime
+from exchangelib.fields import FieldOrder, FieldPath
 from exchangelib.folders import FolderCollection, Inbox
+from exchangelib.items import Message
 from exchangelib.queryset import Q, QuerySet
+from exchangelib.version import EXCHANGE_2010
 
-from .common import TimedTestCase
+from .common import TimedTestCase, mock_account, mock_version
 
 
 class QuerySetTest(TimedTestCase):
@@ -72,3 +77,178 @@ class QuerySetTest(TimedTestCase):
         self.assertNotEqual(qs.order_fields, new_qs.order_fields)
         self.assertNotEqual(id(qs.return_format), id(new_qs.return_format))
         self.assertNotEqual(qs.return_format, new_qs.return_format)
+
+        # lazy() returns a copy
+        lazy_qs = qs.lazy()
+        self.assertFalse(qs._lazy)
+        self.assertTrue(lazy_qs._lazy)
+        self.assertTrue(lazy_qs.filter(foo=5)._lazy)
+
+    def test_projection(self):
+        qs = QuerySet(folder_collection=FolderCollection(account=None, folders=[Inbox(root="XXX")]))
+        qs.only_fields = ("a", "b")
+        self.assertIsNone(qs._projection())  # We need items
+        qs.return_format = QuerySet.VALUES_LIST
+        self.assertEqual(qs._projection(), ("a", "b"))
+        qs.calendar_view = "XXX"
+        self.assertEqual(qs._projection(), ("a", "b"))
+        qs.order_fields = ("c",)
+        self.assertIsNone(qs._projection())  # We need items for client-side sorting
+        qs.calendar_view = None
+        qs.request_type = QuerySet.PERSONA
+        self.assertIsNone(qs._projection())
+
+        # Projected values are passed through, and exceptions are passed on unaltered
+        Path = namedtuple("Path", ["field", "path"])
+        Field = namedtuple("Field", ["is_attribute"])
+        qs = QuerySet(folder_collection=FolderCollection(account=None, folders=[Inbox(root="XXX")]))
+        qs.only_fields = (
+            Path(field=Field(is_attribute=False), path="a"),
+            Path(field=Field(is_attribute=False), path="b"),
+        )
+        e = ValueError()
+        for return_format, values in (
+            (QuerySet.VALUES, [{"a": 1, "b": 2}, e]),
+            (QuerySet.VALUES_LIST, [(1, 2), e]),
+        ):
+            qs.return_format = return_format
+            self.assertEqual(list(qs._format_items(items=[(1, 2), e], return_format=return_format)), values)
+        qs.only_fields = qs.only_fields[:1]
+        qs.return_format = QuerySet.FLAT
+        self.assertEqual(list(qs._format_items(items=[(1,), e], return_format=QuerySet.FLAT)), [1, e])
+
+    def test_count(self):
+        # The server counts the items in each folder for us
+        folder_collection = FolderCollection(account=None, folders=[Inbox(root="XXX"), Inbox(root="YYY")])
+        qs = QuerySet(folder_collection=folder_collection)
+        with patch.object(FolderCollection, "count_items", return_value=[10, 3]) as count_items:
+            self.assertEqual(qs.count(), 13)
+            self.assertEqual(qs.filter(subject="foo").count(), 13)
+            self.assertEqual(count_items.call_args.args[0], Q(subject="foo"))
+            # The offset applies to each folder, and 'max_items' to the total
+            qs.offset = 5
+            self.assertEqual(qs.count(), 5)
+            qs.max_items = 4
+            self.assertEqual(qs.count(), 4)
+            qs.offset = 0
+            self.assertTrue(qs.exists())
+        with patch.object(FolderCollection, "count_items", return_value=[0, 0]):
+            qs.max_items = None
+            self.assertEqual(qs.count(), 0)
+            self.assertFalse(qs.exists())
+
+    def test_sort_clientside(self):
+        # Items are sorted on a composite key in a single pass. Exceptions sort as default values.
+        qs = QuerySet(folder_collection=FolderCollection(account=None, folders=[Inbox(root="XXX")]))
+        qs.order_fields = [
+            FieldOrder(field_path=FieldPath(field=Message.get_field_by_fieldname("subject"))),
+            FieldOrder(field_path=FieldPath(field=Message.get_field_by_fieldname("size")), reverse=True),
+        ]
+        account = object()
+        items = [Message(subject="abc"[i % 3], size=(i * 7) % 25) for i in range(25)]
+        for i in items:
+            i.account = account
+        e = ValueError("foo")
+        expected = [None] + [(i.subject, i.size) for i in sorted(items, key=lambda i: (i.subject, -i.size))]
+
+        def sort(qs):
+            return [
+                None if isinstance(i, Exception) else (i.subject, i.size)
+                for i in qs._sort_clientside(items=iter(items[:10] + [e] + items[10:]))
+            ]
+
+        # In memory
+        self.assertEqual(sort(qs), expected)
+        # Spilled to disk in sorted runs that are merged. The account is re-attached to the items.
+        qs.SORT_BUFFER_SIZE = 4
+        self.assertEqual(sort(qs), expected)
+        self.assertTrue(all(i.account is account for i in qs._sort_clientside(items=iter(items))))
+        # Only the top items are kept when we know how many items we need, and the offset is applied
+        qs.offset = 2
+        self.assertEqual(sort(qs), expected[2:])
+        qs.max_items = 3
+        self.assertEqual(sort(qs), expected[2:5])
+
+    def test_seek(self):
+        # Pages are requested with a restriction on the last seen value of the seek field. Items with the last seen
+        # value that were returned again are skipped, and values with more items than fit in a page are fetched with an
+        # exact match.
+        account = mock_account(version=mock_version(build=EXCHANGE_2010), protocol=None)
+        qs = QuerySet(folder_collection=FolderCollection(account=account, folders=[Inbox(root="XXX")]))
+        qs = qs.only("subject").seek()
+        qs.page_size = 2
+        items = [
+            Message(
+                id=f"I{i}", changekey="CK", subject=f"S{i}", datetime_received=EWSDateTime(2020, 1, 1, 0, m, tzinfo=UTC)
+            )
+            for i, m in enumerate((1, 2, 2, 2, 3, 4, 4))
+        ]
+        tie_groups = (slice(0, 1), slice(1, 4), slice(4, 5), slice(5, 7))
+        requests = []
+        ops = {
+            Q.EQ: lambda a, b: a == b,
+            Q.GT: lambda a, b: a > b,
+            Q.GTE: lambda a, b: a >= b,
+            Q.LT: lambda a, b: a < b,
+            Q.LTE: lambda a, b: a <= b,
+        }
+
+        def find_items(q, order_fields, max_items, offset, additional_fields, **kwargs):
+            self.assertIn(FieldPath(field=Message.get_field_by_fieldname("datetime_received")), additional_fields)
+            self.assertEqual(offset, 0)
+            leaves = [c for c in q.children if c.op in ops]
+            leaf = leaves[0] if leaves else None
+            requests.append((leaf.op, leaf.value.minute) if leaf else None)
+            matches = [i for i in items if leaf is None or ops[leaf.op](i.datetime_received, leaf.value)]
+            # The server may return items with the same value in any order
+            if len(requests) % 2:
+                matches.reverse()
+            matches = sorted(matches, key=lambda i: i.datetime_received, reverse=order_fields[0].reverse)
+            return [Message(**{f.name: getattr(i, f.name) for f in Message.FIELDS}) for i in matches[:max_items]]
+
+        with patch.object(FolderCollection, "find_items", side_effect=find_items):
+            res = list(qs)
+            # Items with the same value may be returned in any order, but no items are skipped or returned twice
+            self.assertEqual(
+                [{i.subject for i in res[s]} for s in tie_groups], [{"S0"}, {"S1", "S2", "S3"}, {"S4"}, {"S5", "S6"}]
+            )
+            self.assertEqual(len(res), 7)
+            self.assertIsNone(res[0].datetime_received)  # Only requested for seeking
+            self.assertEqual(
+                requests,
+                [None, (Q.GTE, 2), (Q.GTE, 2), (Q.EQ, 2), (Q.GT, 2), (Q.GTE, 4), (Q.GTE, 4), (Q.EQ, 4), (Q.GT, 4)],
+            )
+
+            # Descending order, and items that are added while we iterate are not returned twice
+            res = []
+            for i in qs.reverse():
+                res.append(i.subject)
+                if len(res) == 1:
+                    items.append(
+                        Message(
+                            id="I7",
+                            changekey="CK",
+                            subject="S7",
+                            datetime_received=EWSDateTime(2020, 1, 1, 0, 5, tzinfo=UTC),
+                        )
+                    )
+            self.assertEqual(
+                [set(res[s]) for s in (slice(0, 2), slice(2, 3), slice(3, 6), slice(6, 7))],
+                [{"S5", "S6"}, {"S4"}, {"S1", "S2", "S3"}, {"S0"}],
+            )
+            self.assertEqual(len(res), 7)
+
+            # Slicing is applied to the seeked items
+            res = [i.subject for i in qs[1:3]]
+            self.assertEqual(len(set(res)), 2)
+            self.assertLessEqual(set(res), {"S1", "S2", "S3"})
+
+            # Only requesting attribute fields
+            res = list(qs.only("id"))
+            self.assertEqual(sorted(i.id for i in res), [f"I{i}" for i in range(8)])
+            self.assertIsNone(res[0].changekey)
+            self.assertEqual(sorted(qs.values_list("id", flat=True)), [f"I{i}" for i in range(8)])
+            self.assertEqual(sorted(qs.values_list("id", "changekey")), [(f"I{i}", "CK") for i in range(8)])
+
+        with self.assertRaises(ValueError):
+            list(qs.order_by("subject", "datetime_received"))
@@ -1,5 +1,7 @@
+import time
 from collections import namedtuple
-from unittest.mock import Mock
+from itertools import islice
+from unittest.mock import Mock, patch
 
 import requests_mock
 
@@ -10,20 +12,35 @@ from exchangelib.errors import (
     ErrorInternalServerError,
     ErrorInvalidServerVersion,
     ErrorInvalidValueForProperty,
+    ErrorItemNotFound,
     ErrorNonExistentMailbox,
     ErrorSchemaValidation,
     ErrorServerBusy,
+    ErrorTimeoutExpired,
     ErrorTooManyObjectsOpened,
+    InvalidTypeError,
     MalformedResponseError,
     RateLimitError,
     SOAPError,
     TransportError,
 )
+from exchangelib.fields import FieldOrder, FieldPath
 from exchangelib.folders import FolderCollection
+from exchangelib.items import CalendarItem, Message
+from exchangelib.properties import FolderId
 from exchangelib.protocol import FailFast, FaultTolerance
-from exchangelib.services import DeleteItem, FindFolder, GetRoomLists, GetRooms, GetServerTimeZones, ResolveNames
+from exchangelib.services import (
+    DeleteItem,
+    FindFolder,
+    FindItem,
+    GetItem,
+    GetRoomLists,
+    GetRooms,
+    GetServerTimeZones,
+    ResolveNames,
+)
 from exchangelib.services.common import EWSAccountService, EWSService
-from exchangelib.util import PrettyXmlHandler, create_element
+from exchangelib.util import MNS, TNS, DummyResponse, PrettyXmlHandler, add_xml_child, create_element, to_xml
 from exchangelib.version import EXCHANGE_2007, EXCHANGE_2010
 
 from .common import EWSTest, get_random_string, mock_account, mock_protocol, mock_version
@@ -292,6 +309,75 @@ class ServicesTest(EWSTest):
             list(ws.parse(xml))
         self.assertIn("ResolutionSet elements in ResponseMessage", e.exception.args[0])
 
+    def test_incremental_parsing(self):
+        ws = GetItem(account=self.account)
+        self.assertTrue(ws.incremental_parsing)
+        xml = b"""\
+<?xml version="1.0" encoding="utf-8" ?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:GetItemResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
+                       xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>
+        <m:GetItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Items>
+            <t:Message><t:Subject>AAA</t:Subject></t:Message>
+            <t:Message><t:Subject>BBB</t:Subject></t:Message>
+          </m:Items>
+        </m:GetItemResponseMessage>
+        <m:GetItemResponseMessage ResponseClass="Error">
+          <m:MessageText>The specified object was not found in the store.</m:MessageText>
+          <m:ResponseCode>ErrorItemNotFound</m:ResponseCode>
+          <m:DescriptiveLinkKey>0</m:DescriptiveLinkKey>
+          <m:Items />
+        </m:GetItemResponseMessage>
+        <m:GetItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Items>
+            <t:CalendarItem><t:Subject>CCC</t:Subject></t:CalendarItem>
+          </m:Items>
+        </m:GetItemResponseMessage>
+      </m:ResponseMessages>
+    </m:GetItemResponse>
+  </s:Body>
+</s:Envelope>"""
+        res = list(ws.parse(xml))
+        self.assertEqual(len(res), 4)
+        self.assertEqual([res[0].subject, res[1].subject, res[3].subject], ["AAA", "BBB", "CCC"])
+        self.assertIsInstance(res[0], Message)
+        self.assertIsInstance(res[2], ErrorItemNotFound)
+        self.assertIsInstance(res[3], CalendarItem)
+
+        # Elements are returned as soon as they are complete, and are detached from the rest of the tree
+        _, body = ws._get_soap_parts(response=DummyResponse(content=xml))
+        elems = ws._get_soap_messages(body=body)
+        elem = next(elems)
+        self.assertEqual(elem.tag, "{http://schemas.microsoft.com/exchange/services/2006/types}Message")
+        self.assertIsNone(elem.getparent())
+        self.assertEqual(len(list(elems)), 3)
+
+        # SOAP faults are raised before any elements are returned
+        xml = b"""\
+<?xml version="1.0" encoding="utf-8" ?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <s:Fault>
+      <faultcode>ErrorNonExistentMailbox</faultcode>
+      <faultstring>AAA</faultstring>
+    </s:Fault>
+  </s:Body>
+</s:Envelope>"""
+        with self.assertRaises(ErrorNonExistentMailbox):
+            ws.parse(xml)
+        with self.assertRaises(SOAPError) as e:
+            ws.parse(xml.replace(b"Fault", b"XXX"))
+        self.assertIn("Unknown SOAP response", e.exception.args[0])
+        with self.assertRaises(MalformedResponseError):
+            ws.parse(xml.replace(b"Body", b"XXX"))
+        with self.assertRaises(SOAPError):
+            ws.parse(b"XXX")
+
     def test_get_elements(self):
         # Test that we can handle SOAP-level error messages
         # TODO: The request actually raises ErrorInvalidRequest, but we interpret that to mean a wrong API version and
@@ -300,6 +386,74 @@ class ServicesTest(EWSTest):
         with self.assertRaises(ErrorInvalidServerVersion):
             list(svc._get_elements(create_element("XXX")))
 
+    def test_concurrent_chunked_get_elements(self):
+        with self.assertRaises(InvalidTypeError):
+            ResolveNames(self.account.protocol, concurrency="XXX")
+        with self.assertRaises(ValueError):
+            ResolveNames(self.account.protocol, concurrency=-1)
+
+        def get_elements(payload):
+            # Make early chunks finish last, to test that results are still returned in input order
+            chunk = [int(e.text) for e in payload]
+            time.sleep(0.01 * (5 - chunk[0] % 5))
+            return iter(chunk)
+
+        def payload_func(chunk):
+            payload = create_element("XXX")
+            for i in chunk:
+                elem = create_element("YYY")
+                elem.text = str(i)
+                payload.append(elem)
+            return payload
+
+        svc = ResolveNames(self.account.protocol, chunk_size=2, concurrency=4)
+        # Concurrency is capped by the session pool size
+        with patch.object(svc, "_get_elements", side_effect=get_elements), patch.object(
+            svc.protocol, "_session_pool_maxsize", 3
+        ), patch.object(svc, "_concurrent_chunked_get_elements", wraps=svc._concurrent_chunked_get_elements) as m:
+            self.assertEqual(list(svc._chunked_get_elements(payload_func, items=range(17))), list(range(17)))
+            # Test that we can stop iterating early
+            self.assertEqual(list(islice(svc._chunked_get_elements(payload_func, items=range(17)), 3)), [0, 1, 2])
+            self.assertEqual(m.call_args[0][2], 3)
+
+    def test_adaptive_chunk_size(self):
+        # Test that chunks are split when they time out, and that later chunks use the lowered chunk size
+        chunk_sizes = []
+
+        def get_elements(payload):
+            chunk = [int(e.text) for e in payload]
+            chunk_sizes.append(len(chunk))
+            if len(chunk) > 3:
+                raise ErrorTimeoutExpired("XXX")
+            return iter(chunk)
+
+        def payload_func(chunk):
+            payload = create_element("XXX")
+            for i in chunk:
+                elem = create_element("YYY")
+                elem.text = str(i)
+                payload.append(elem)
+            return payload
+
+        svc = ResolveNames(self.account.protocol, chunk_size=8)
+        controllers = self.account.protocol._chunk_size_controllers
+        try:
+            with patch.object(svc, "_get_elements", side_effect=get_elements):
+                self.assertEqual(list(svc._chunked_get_elements(payload_func, items=range(20))), list(range(20)))
+                # The first chunk is split until it succeeds. The chunk size is then raised until we hit a timeout.
+                self.assertEqual(chunk_sizes, [8, 4, 2, 2, 4, 2, 2, 3, 4, 2, 2, 3, 2])
+                self.assertEqual(self.account.protocol.get_chunk_size_controller(ResolveNames).limit, 4)
+
+                # New service instances start at the learned chunk size
+                svc = ResolveNames(self.account.protocol, chunk_size=8)
+                self.assertEqual([len(chunk) for chunk in svc._chunkify(range(10))], [4, 4, 2])
+
+                # Chunks of size 1 cannot be split
+                with self.assertRaises(ErrorTimeoutExpired):
+                    list(svc._get_chunk_elements(lambda chunk: create_element("XXX"), [1]))
+        finally:
+            controllers.pop(ResolveNames, None)
+
     def test_handle_backoff(self):
         # Test that we can handle backoff messages
         svc = ResolveNames(self.account.protocol)
@@ -335,6 +489,183 @@ class ServicesTest(EWSTest):
         with self.assertRaises(SOAPError):
             self.account.inbox.all().count()
 
+    def test_paging_payload_reuse(self):
+        # Test that the paging payload is built once, and that only the offset is changed for each page
+        version = mock_version(build=EXCHANGE_2010)
+        account = mock_account(version=version, protocol=mock_protocol(version=version, service_endpoint="example.com"))
+        svc = FindFolder(account=account, page_size=2)
+        folder_ids = [FolderId(id="XXX", changekey="YYY"), FolderId(id="ZZZ", changekey="WWW")]
+
+        def page(num):
+            elem = create_element("m:RootFolder")
+            folders = create_element("t:Folders")
+            for _ in range(num):
+                folders.append(create_element("t:Folder"))
+            elem.append(folders)
+            return elem
+
+        # The second folder is done paging after the second page
+        pages = iter(([(page(2), 2), (page(2), 2)], [(page(2), 4), (page(1), None)], [(page(1), None)]))
+        offsets = []
+
+        def get_pages(payload, expected_message_count):
+            offsets.append(payload.find(f"{{{MNS}}}IndexedPageFolderView").get("Offset"))
+            return next(pages)
+
+        payload_func = Mock(wraps=svc.get_payload)
+        with patch.object(svc, "_get_pages", side_effect=get_pages):
+            elems = list(
+                svc._paged_call(
+                    payload_func=payload_func,
+                    max_items=None,
+                    folders=folder_ids,
+                    additional_fields=None,
+                    restriction=None,
+                    shape="IdOnly",
+                    depth="Shallow",
+                    page_size=2,
+                    offset=0,
+                )
+            )
+        self.assertEqual(len(elems), 8)
+        self.assertEqual(offsets, ["0", "2", "4"])
+        # The payload is rebuilt when a folder is done paging
+        self.assertEqual(payload_func.call_count, 2)
+
+    def test_count_items(self):
+        # Test that we count items with a single request for a page with a single item, and read the total count
+        version = mock_version(build=EXCHANGE_2010)
+        account = mock_account(version=version, protocol=mock_protocol(version=version, service_endpoint="example.com"))
+        svc = FindItem(account=account)
+        folder_ids = [
+            FolderId(id="XXX", changekey="YYY"),
+            FolderId(id="ZZZ", changekey="WWW"),
+            FolderId(id="VVV", changekey="UUU"),
+        ]
+        messages = to_xml(f"""\
+<m:ResponseMessages xmlns:m="{MNS}" xmlns:t="{TNS}">
+  <m:FindItemResponseMessage ResponseClass="Success">
+    <m:ResponseCode>NoError</m:ResponseCode>
+    <m:RootFolder IndexedPagingOffset="1" TotalItemsInView="123456" IncludesLastItemInRange="false">
+      <t:Items><t:Message><t:ItemId Id="AAA" ChangeKey="BBB"/></t:Message></t:Items>
+    </m:RootFolder>
+  </m:FindItemResponseMessage>
+  <m:FindItemResponseMessage ResponseClass="Error">
+    <m:MessageText>Foo</m:MessageText>
+    <m:ResponseCode>ErrorItemNotFound</m:ResponseCode>
+    <m:DescriptiveLinkKey>0</m:DescriptiveLinkKey>
+  </m:FindItemResponseMessage>
+  <m:FindItemResponseMessage ResponseClass="Success">
+    <m:ResponseCode>NoError</m:ResponseCode>
+    <m:RootFolder IndexedPagingOffset="0" TotalItemsInView="0" IncludesLastItemInRange="true">
+      <t:Items/>
+    </m:RootFolder>
+  </m:FindItemResponseMessage>
+</m:ResponseMessages>""".encode()).getroot()
+        payloads = []
+
+        def get_response_xml(payload, **kwargs):
+            payloads.append(payload)
+            return list(messages)
+
+        with patch.object(svc, "_get_response_xml", side_effect=get_response_xml), patch.object(
+            svc, "_get_elements", side_effect=lambda payload: svc._response_generator(payload=payload)
+        ):
+            counts = svc.count(folders=folder_ids, restriction=None, query_string=None, depth="Shallow")
+        self.assertEqual(len(payloads), 1)
+        self.assertEqual(payloads[0].find(f"{{{MNS}}}IndexedPageItemView").get("MaxEntriesReturned"), "1")
+        self.assertEqual(counts[0], 123456)
+        self.assertIsInstance(counts[1], ErrorItemNotFound)
+        self.assertEqual(counts[2], 0)
+
+    def test_concurrent_paging(self):
+        # Test that we page multiple folders on independent cursors, and merge the items by sort order if requested
+        version = mock_version(build=EXCHANGE_2010)
+        protocol = Mock(version=version, service_endpoint="example.com", _session_pool_maxsize=4)
+        account = mock_account(version=version, protocol=protocol)
+        folder_ids = [FolderId(id="XXX", changekey="YYY"), FolderId(id="ZZZ", changekey="WWW")]
+        # Folder XXX has 5 items and folder ZZZ has 2 items. Each folder is sorted by DateTimeReceived
+        minutes = {"XXX": [1, 2, 4, 5, 8], "ZZZ": [3, 6]}
+        requests = []
+
+        def get_pages(payload, expected_message_count):
+            folder_ids = [f.get("Id") for f in payload.findall(f".//{{{TNS}}}FolderId")]
+            self.assertEqual(expected_message_count, len(folder_ids))
+            offset = int(payload.find(f"{{{MNS}}}IndexedPageItemView").get("Offset"))
+            requests.append((folder_ids[0], offset) if len(folder_ids) == 1 else (tuple(folder_ids), offset))
+            return [get_page(folder_id, offset) for folder_id in folder_ids]
+
+        def get_page(folder_id, offset):
+            page = minutes[folder_id][offset : offset + 2]
+            next_offset = offset + len(page)
+            items = "".join(
+                f'<t:Message><t:ItemId Id="{folder_id}{m}" ChangeKey="CK"/>'
+                f"<t:DateTimeReceived>2020-01-01T00:0{m}:00Z</t:DateTimeReceived></t:Message>"
+                for m in page
+            )
+            last = "true" if next_offset >= len(minutes[folder_id]) else "false"
+            message = to_xml(f"""\
+<m:FindItemResponseMessage xmlns:m="{MNS}" xmlns:t="{TNS}" ResponseClass="Success">
+  <m:ResponseCode>NoError</m:ResponseCode>
+  <m:RootFolder IndexedPagingOffset="{next_offset}" TotalItemsInView="{len(minutes[folder_id])}"
+      IncludesLastItemInRange="{last}">
+    <t:Items>{items}</t:Items>
+  </m:RootFolder>
+</m:FindItemResponseMessage>""".encode()).getroot()
+            return svc._get_page(message)
+
+        order_fields = [FieldOrder(field_path=FieldPath(field=Message.get_field_by_fieldname("datetime_received")))]
+        kwargs = dict(
+            folders=folder_ids,
+            additional_fields=None,
+            restriction=None,
+            order_fields=order_fields,
+            shape="IdOnly",
+            query_string=None,
+            depth="Shallow",
+            calendar_view=None,
+            max_items=None,
+            offset=0,
+        )
+        svc = FindItem(account=account, page_size=2, concurrency=2)
+        with patch.object(svc, "_get_pages", side_effect=get_pages):
+            res = list(svc.call(**kwargs))
+        # Each folder is paged on its own cursor
+        self.assertEqual(sorted(requests), [("XXX", 0), ("XXX", 2), ("XXX", 4), ("ZZZ", 0)])
+        # Items are merged by sort order, and returned as (id, changekey) tuples as requested
+        self.assertEqual(
+            res,
+            [(f"{f}{m}", "CK") for f, m in sorted(((f, m) for f in minutes for m in minutes[f]), key=lambda i: i[1])],
+        )
+        # The service is not changed by the merge
+        self.assertIsNone(svc.additional_fields)
+        self.assertIsNone(svc.projection)
+
+        # Test reverse order and max_items
+        order_fields[0].reverse = True
+        for m in minutes.values():
+            m.reverse()  # The server returns the items of each folder in reverse order
+        requests.clear()
+        with patch.object(svc, "_get_pages", side_effect=get_pages):
+            res = list(svc.call(**dict(kwargs, max_items=3)))
+        self.assertEqual(res, [("XXX8", "CK"), ("ZZZ6", "CK"), ("XXX5", "CK")])
+
+        # Test unordered paging
+        requests.clear()
+        with patch.object(svc, "_get_pages", side_effect=get_pages):
+            res = list(svc.call(**dict(kwargs, order_fields=None)))
+        self.assertEqual(sorted(requests), [("XXX", 0), ("XXX", 2), ("XXX", 4), ("ZZZ", 0)])
+        self.assertEqual(sorted(res), sorted((f"{f}{m}", "CK") for f in minutes for m in minutes[f]))
+
+        # Items are only merged if all folders can be paged at once. Otherwise, folders are paged in lock-step.
+        protocol._session_pool_maxsize = 1
+        requests.clear()
+        with patch.object(svc, "_get_pages", side_effect=get_pages), patch.object(svc, "_merge_sorted") as merge:
+            res = list(svc.call(**kwargs))
+        merge.assert_not_called()
+        self.assertEqual(requests, [(("XXX", "ZZZ"), 0), ("XXX", 2), ("XXX", 4)])
+        self.assertEqual(res, [(i, "CK") for i in ("XXX8", "XXX5", "ZZZ6", "ZZZ3", "XXX4", "XXX2", "XXX1")])
+
     def test_version_renegotiate(self):
         # Test that we can recover from a wrong API version. This is needed in version guessing and when the
         # autodiscover response returns a wrong server version for the account
@@ -412,3 +743,26 @@ class ServicesTest(EWSTest):
 </s:Envelope>
 """.encode(),
             )
+
+    def test_wrap_cache(self):
+        # The envelope is cached, but the body must be serialized for each request, without the redundant namespace
+        # declarations that serializing the body element on its own would add.
+        svc = EWSService(protocol=None)
+        for subject in ("XXX", "YYY"):
+            content = create_element("m:CreateItem")
+            add_xml_child(content, "t:Subject", subject)
+            self.assertEqual(
+                svc.wrap(content=content, api_version="BBB"),
+                b"<?xml version='1.0' encoding='utf-8'?>\n"
+                b'<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/" '
+                b'xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" '
+                b'xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">'
+                b'<s:Header><t:RequestServerVersion Version="BBB"/></s:Header>'
+                b"<s:Body><m:CreateItem><t:Subject>%s</t:Subject></m:CreateItem></s:Body></s:Envelope>"
+                % subject.encode(),
+            )
+        # Changing the API version must not reuse the cached envelope
+        self.assertIn(
+            b'<t:RequestServerVersion Version="CCC"/>', svc.wrap(content=create_element("AAA"), api_version="CCC")
+        )
+        self.assertNotIn(b"<s:Header>", svc.wrap(content=create_element("AAA")))
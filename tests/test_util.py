@@ -1,5 +1,7 @@
 import io
 import logging
+import time
+from base64 import b64encode
 from contextlib import suppress
 from itertools import chain
 from unittest.mock import patch
@@ -16,20 +18,25 @@ from exchangelib.errors import (
     TransportError,
     UnauthorizedError,
 )
-from exchangelib.protocol import FailFast, FaultTolerance
+from exchangelib.protocol import FailFast, FaultTolerance, RateLimiter
 from exchangelib.util import (
     BOM_UTF8,
     CONNECTION_ERRORS,
+    TNS,
     AnonymizingXmlHandler,
     DocumentYielder,
+    ElementNotFound,
     ParseError,
     PrettyXmlHandler,
+    StreamingBase64Parser,
+    StreamingContentHandler,
     chunkify,
     get_domain,
     get_redirect_url,
     is_xml,
     peek,
     post_ratelimited,
+    prefetch,
     safe_b64decode,
     to_xml,
     xml_to_str,
@@ -62,6 +69,49 @@ class UtilTest(EWSTest):
         seq = (i for i in range(5))
         self.assertEqual(list(chunkify(seq, chunksize=2)), [[0, 1], [2, 3], [4]])
 
+    def test_prefetch(self):
+        # Values are passed on in order, and exception instances are passed on unaltered
+        e = ValueError("foo")
+        self.assertEqual(list(prefetch(iter([1, e, 3]), size=2)), [1, e, 3])
+        self.assertEqual(list(prefetch(iter([]), size=2)), [])
+
+        # Exceptions raised by the iterable are re-raised
+        def fail():
+            yield 1
+            raise ValueError("bar")
+
+        values = prefetch(fail(), size=2)
+        self.assertEqual(next(values), 1)
+        with self.assertRaises(ValueError) as e:
+            next(values)
+        self.assertEqual(e.exception.args[0], "bar")
+
+        # The producer fetches at most 'size' values ahead of the consumer, and stops when the consumer stops
+        consumed = []
+        produced = []
+
+        def produce():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        values = prefetch(produce(), size=3)
+        consumed.append(next(values))
+        time.sleep(0.2)
+        self.assertLessEqual(len(produced), len(consumed) + 3 + 1)
+        values.close()
+        time.sleep(0.2)
+        self.assertLess(len(produced), 100)
+
+        # The producer starts right away, and stops when the generator is discarded before it was started
+        produced.clear()
+        values = prefetch(produce(), size=3)
+        time.sleep(0.2)
+        self.assertEqual(len(produced), 4)
+        del values
+        time.sleep(0.2)
+        self.assertEqual(len(produced), 4)
+
     def test_peek(self):
         # Test peeking into various sequence types
 
@@ -243,6 +293,18 @@ class UtilTest(EWSTest):
             r, session = post_ratelimited(protocol=protocol, session=session, url="http://", headers=None, data="")
             self.assertEqual(r.content, b"foo")
 
+            # Test that the rate limiter is consulted, and released on both success and failure
+            protocol.config.rate_limiter = RateLimiter(max_concurrent_requests=1, scope=RateLimiter.MAILBOX)
+            headers = {"X-AnchorMailbox": "foo@example.com"}
+            r, session = post_ratelimited(protocol=protocol, session=session, url="http://", headers=headers, data="")
+            session.post = mock_post(url, 401, {})
+            with self.assertRaises(UnauthorizedError):
+                post_ratelimited(protocol=protocol, session=session, url="http://", headers=headers, data="")
+            bucket = protocol.config.rate_limiter.get_bucket(protocol=protocol, mailbox="foo@example.com")
+            self.assertEqual(bucket.budget()["in_flight"], 0)
+            self.assertEqual(len(protocol.config.rate_limiter.budgets()), 1)
+            protocol.config.rate_limiter = None
+
             # Test exceptions raises by the POST request
             for err_cls in CONNECTION_ERRORS:
                 session.post = mock_session_exception(err_cls)
@@ -312,6 +374,7 @@ class UtilTest(EWSTest):
             protocol.retire_session(session)  # We have patched the session, so discard it
             # Restore patched attributes and functions
             protocol.config.retry_policy = orig_policy
+            protocol.config.rate_limiter = None
             protocol.RETRY_WAIT = orig_wait
 
             with suppress(AttributeError):
@@ -361,6 +424,44 @@ class UtilTest(EWSTest):
             list(DocumentYielder(_bytes_to_iter(b"<ns:XXX a='>b'></ns:XXX>"), "XXX")),
             [b"<?xml version='1.0' encoding='utf-8'?>\n<ns:XXX a='>b'></ns:XXX>"],
         )
+        # Test content arriving in chunks of any size, with tags and documents split across chunks
+        content = b"<?xml?><ns:XXX a='b'><YYY>a</YYY></ns:XXX>\r\n<ns:XXX><YYY>b</YYY></ns:XXX><ns:X"
+        for chunk_size in (1, 2, 3, 5, 8, 13, len(content)):
+            chunks = iter(content[i : i + chunk_size] for i in range(0, len(content), chunk_size))
+            self.assertListEqual(
+                list(DocumentYielder(chunks, "XXX")),
+                [
+                    b"<?xml version='1.0' encoding='utf-8'?>\n<ns:XXX a='b'><YYY>a</YYY></ns:XXX>",
+                    b"<?xml version='1.0' encoding='utf-8'?>\n<ns:XXX><YYY>b</YYY></ns:XXX>",
+                ],
+            )
+
+    def test_streaming_base64_parser(self):
+        class DummyRawResponse:
+            def __init__(self, content):
+                self.raw = io.BytesIO(content)
+
+        def parse(content, bufsize):
+            parser = StreamingBase64Parser(bufsize=bufsize)
+            parser.setContentHandler(StreamingContentHandler(parser=parser, ns=TNS, element_name="Content"))
+            return list(parser.parse(DummyRawResponse(content)))
+
+        data = bytes(range(256)) * 10
+        content = (
+            f'<?xml version="1.0" encoding="utf-8"?><Envelope xmlns:t="{TNS}"><Body><t:Content>'.encode()
+            + b64encode(data)
+            + b"</t:Content></Body></Envelope>"
+        )
+        # The content is decoded correctly regardless of how the input is split
+        for bufsize in (1, 5, 100, len(content)):
+            chunks = parse(content, bufsize=bufsize)
+            self.assertEqual(b"".join(chunks), data)
+            self.assertNotIn(b"", chunks)
+        # The full response is available for error handling if the element is not found
+        content = f'<?xml version="1.0" encoding="utf-8"?><Envelope xmlns:t="{TNS}"><Body/></Envelope>'.encode()
+        with self.assertRaises(ElementNotFound) as e:
+            parse(content, bufsize=7)
+        self.assertEqual(e.exception.data, content)
 
 
 def _bytes_to_iter(content):